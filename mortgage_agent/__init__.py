@@ -11,14 +11,26 @@
 2) 生成一份示例 PDF 到 output/ 目录
 """
 
-from .calculator import LoanParams, Prepayment, SimulationResult, ScheduleRow, simulate
+from .calculator import LoanParams, LoanState, Prepayment, SimulationResult, SimulationSummary, loan_state, simulate, simulate_summary
+from .schedule import Schedule, ScheduleRow
+from .batch import BatchSimulationResult, simulate_batch
+from .plan import PlanEvent, RepaymentPlan
 
 __all__ = [
+    "BatchSimulationResult",
     "LoanParams",
+    "LoanState",
+    "PlanEvent",
     "Prepayment",
+    "RepaymentPlan",
     "SimulationResult",
+    "SimulationSummary",
+    "Schedule",
     "ScheduleRow",
+    "loan_state",
     "simulate",
+    "simulate_batch",
+    "simulate_summary",
 ]
 
 
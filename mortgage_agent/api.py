@@ -1,38 +1,64 @@
 from __future__ import annotations
 
 import os
-from datetime import date
-from io import BytesIO
-from typing import Optional
-import zipfile
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from datetime import date, datetime, timezone
+from typing import Annotated, Any, Callable, Dict, List, Optional
 from urllib.parse import quote
 import calendar
 
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
-from openpyxl.utils import get_column_letter
-from fastapi import FastAPI, HTTPException, Request, Depends
-from fastapi.responses import JSONResponse, StreamingResponse
-from pydantic import BaseModel, Field, field_validator, model_validator
+from fastapi import FastAPI, HTTPException, Query, Request, Depends
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi.util import get_remote_address
 
-from mortgage_agent.calculator import LoanParams, Prepayment, ScheduleRow, build_schedule, monthly_rate, normalize_method, simulate, simulate_recurring_extra, simulate_annual_recurring_extra
-from mortgage_agent.report import generate_pdf
+from mortgage_agent.batch import simulate_batch
+from mortgage_agent.cache import cache_stats
+from mortgage_agent.downsample import downsample_schedule
+from mortgage_agent.export_jobs import SUCCEEDED, ExportJob, ExportJobQueue, JobQueueFull
+from mortgage_agent.export_store import ExportStore, StoredExport
+from mortgage_agent.exports import combined_schedule_to_xlsx, report_pdf, schedule_to_xlsx, schedules_to_xlsx
+from mortgage_agent.calculator import SCHEDULE_SCENARIOS, LoanParams, Prepayment, Schedule, base_schedule, compute_paid_periods, monthly_rate, normalize_method, schedule_window, simulate, simulate_summary, simulate_recurring_extra, simulate_annual_recurring_extra
+from mortgage_agent.render_pool import EXPORT_PROCESS_WORKERS, RenderPool
+from mortgage_agent.response_cache import ResponseCache, request_key
+from mortgage_agent.singleflight import Flight, SingleFlight
+from mortgage_agent.zipstream import stream_zip
 
 
 API_KEY = os.getenv("API_KEY")
 
 DEFAULT_RATE_LIMIT = os.getenv("RATE_LIMIT_DEFAULT", "60/minute")
 EXPORT_RATE_LIMIT = os.getenv("RATE_LIMIT_EXPORT", "15/minute")
+BATCH_RATE_LIMIT = os.getenv("RATE_LIMIT_BATCH", "10/minute")
 MAX_TERM_MONTHS = int(os.getenv("MAX_TERM_MONTHS", "600"))
 MAX_PRINCIPAL = float(os.getenv("MAX_PRINCIPAL", "30000000"))
 MAX_ANNUAL_RATE = float(os.getenv("MAX_ANNUAL_RATE", "30"))
 MAX_PREPAY_RATIO = float(os.getenv("MAX_PREPAY_RATIO", "1.0"))
 MAX_SCHEDULE_ROWS = int(os.getenv("MAX_SCHEDULE_ROWS", "2000"))
+MAX_CHART_POINTS = int(os.getenv("MAX_CHART_POINTS", "1000"))
 MAX_EXPORT_BYTES = int(os.getenv("MAX_EXPORT_BYTES", str(6 * 1024 * 1024)))
+MAX_BATCH_ITEMS = int(os.getenv("MAX_BATCH_ITEMS", "10000"))
+OUTPUT_DIR = os.getenv("OUTPUT_DIR", "output")
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", os.path.join(OUTPUT_DIR, "response_cache.sqlite3"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "50000"))
+EXPORT_CACHE_DIR = os.getenv("EXPORT_CACHE_DIR", os.path.join(OUTPUT_DIR, "exports"))
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Nginx internal location 前缀（对应输出目录），如 /_protected_exports/；为空时由本进程直接发送文件
+EXPORT_ACCEL_REDIRECT_PREFIX = os.getenv("EXPORT_ACCEL_REDIRECT_PREFIX", "").strip()
+if EXPORT_ACCEL_REDIRECT_PREFIX and not EXPORT_ACCEL_REDIRECT_PREFIX.endswith("/"):
+    EXPORT_ACCEL_REDIRECT_PREFIX = f"{EXPORT_ACCEL_REDIRECT_PREFIX}/"
+EXPORT_COALESCE_WAIT_SECONDS = float(os.getenv("EXPORT_COALESCE_WAIT_SECONDS", "60"))
+EXPORT_JOBS_DB_PATH = os.getenv("EXPORT_JOBS_DB_PATH", os.path.join(OUTPUT_DIR, "export_jobs.sqlite3"))
+EXPORT_JOBS_DIR = os.getenv("EXPORT_JOBS_DIR", os.path.join(OUTPUT_DIR, "jobs"))
+EXPORT_JOB_WORKERS = int(os.getenv("EXPORT_JOB_WORKERS", "2"))
+EXPORT_JOB_MAX_PENDING = int(os.getenv("EXPORT_JOB_MAX_PENDING", "100"))
+EXPORT_JOB_TTL_SECONDS = float(os.getenv("EXPORT_JOB_TTL_SECONDS", "3600"))
+EXPORT_JOB_LEASE_SECONDS = float(os.getenv("EXPORT_JOB_LEASE_SECONDS", "300"))
 ALLOWED_METHODS = {"equal_payment", "equal_principal"}
 ROOT_PATH = os.getenv("ROOT_PATH", "").strip()
 if ROOT_PATH and not ROOT_PATH.startswith("/"):
@@ -52,13 +78,42 @@ def _client_ip(request: Request) -> str:
     return get_remote_address(request)
 
 
+response_cache = ResponseCache(
+    RESPONSE_CACHE_PATH,
+    ttl_seconds=RESPONSE_CACHE_TTL_SECONDS,
+    max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+)
+
+export_store = ExportStore(EXPORT_CACHE_DIR, max_bytes=EXPORT_CACHE_MAX_BYTES)
+render_pool = RenderPool(EXPORT_PROCESS_WORKERS)
+export_flights = SingleFlight("export", stale_after=EXPORT_COALESCE_WAIT_SECONDS)
+export_jobs = ExportJobQueue(
+    EXPORT_JOBS_DB_PATH,
+    EXPORT_JOBS_DIR,
+    workers=EXPORT_JOB_WORKERS,
+    max_pending=EXPORT_JOB_MAX_PENDING,
+    ttl_seconds=EXPORT_JOB_TTL_SECONDS,
+    lease_seconds=EXPORT_JOB_LEASE_SECONDS,
+)
+
 limiter = Limiter(key_func=_client_ip, default_limits=[DEFAULT_RATE_LIMIT])
 
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    # 启动时拉起导出任务线程（继续执行重启前遗留的任务）；停机时放回未完成的任务并关闭渲染进程池
+    export_jobs.start()
+    yield
+    export_jobs.shutdown()
+    render_pool.shutdown()
+
+
 app = FastAPI(
     title="息策 Agent",
     description="不只是计算器，是帮你省下一辆车的房贷管家。",
     version="0.1.0",
     root_path=ROOT_PATH,
+    lifespan=_lifespan,
 )
 app.state.limiter = limiter
 app.add_middleware(SlowAPIMiddleware)
@@ -110,12 +165,68 @@ class LoanRequest(BaseModel):
         return self
 
 
+class ExportRequest(LoanRequest):
+    # 导出选项
+    single_workbook: bool = Field(False, description="为 true 时三份明细合并为一个工作簿（三个工作表），否则各一份 Excel")
+
+
+class ChartDataRequest(LoanRequest):
+    points: int = Field(120, ge=3, le=MAX_CHART_POINTS, description="每条曲线降采样（LTTB）后的最多点数")
+
+
+class ScheduleRowsRequest(LoanRequest):
+    # 分页查询某一方案的还款明细：offset/limit 或贷款年度范围二选一，单页行数不超过 MAX_SCHEDULE_ROWS
+    scenario: str = Field("base", description="方案：base(原方案剩余期) / reduced(减少月供) / shorten(缩短年限)")
+    offset: int = Field(0, ge=0, description="从该方案明细的第几行开始（0 起）")
+    limit: int = Field(120, ge=1, le=MAX_SCHEDULE_ROWS, description="本页最多返回行数")
+    year_from: Optional[int] = Field(None, ge=1, description="可选：按贷款年度取行的起始年度（含，第 y 年度为期数序号 12(y-1)+1 ~ 12y）")
+    year_to: Optional[int] = Field(None, ge=1, description="可选：结束年度（含），不填时等于 year_from")
+
+    @field_validator("scenario")
+    @classmethod
+    def _validate_scenario(cls, value: str) -> str:
+        if value not in SCHEDULE_SCENARIOS:
+            raise ValueError(f"scenario must be one of {list(SCHEDULE_SCENARIOS)}")
+        return value
+
+    @model_validator(mode="after")
+    def _validate_years(self) -> "ScheduleRowsRequest":
+        if self.year_to is not None and self.year_from is None:
+            raise ValueError("year_to requires year_from")
+        if self.year_from is not None:
+            year_to = self.year_to if self.year_to is not None else self.year_from
+            if year_to < self.year_from:
+                raise ValueError("year_to cannot be earlier than year_from")
+            if (year_to - self.year_from + 1) * 12 > MAX_SCHEDULE_ROWS:
+                raise ValueError(f"year range exceeds {MAX_SCHEDULE_ROWS} rows limit")
+        return self
+
+
 class CalcResponse(BaseModel):
     # 仅返回：缩短年限方案 & 减少月供方案的节省利息
     savings_shorten_interest: float
     savings_reduce_payment_interest: float
 
 
+class BatchLoanRequest(BaseModel):
+    # 批量测算：每一项与 LoanRequest 结构相同，逐项校验，单项出错不影响其它项
+    items: List[Any] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS, description="贷款列表，每项字段同 LoanRequest")
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    savings_shorten_interest: Optional[float] = None
+    savings_reduce_payment_interest: Optional[float] = None
+    error: Optional[str] = None
+
+
+class BatchCalcResponse(BaseModel):
+    # results 与请求 items 一一对应、顺序一致
+    results: List[BatchItemResult]
+    succeeded: int
+    failed: int
+
+
 class CombinedLoanRequest(BaseModel):
     fund_principal: float = Field(..., ge=0, le=MAX_PRINCIPAL, description="公积金贷款本金（元）；0 表示无公积金贷款")
     fund_annual_rate: float = Field(..., ge=0, le=MAX_ANNUAL_RATE, description="公积金贷款年利率（%）")
@@ -222,12 +333,112 @@ class AnnualRecurringResponse(BaseModel):
     first_annual_extra_date: Optional[date]
 
 
+class ChartSeries(BaseModel):
+    # 列式曲线：month 与 value 一一对应
+    month: List[int] = Field(..., description="距今第几个月（1 起）")
+    value: List[float] = Field(..., description="金额（元）")
+
+
+class ChartScenario(BaseModel):
+    months: int = Field(..., description="该方案剩余期数（降采样前的点数）")
+    balance: ChartSeries
+    interest: ChartSeries
+    principal: ChartSeries
+
+
+class ChartDataResponse(BaseModel):
+    paid_periods: int
+    points: int
+    base: ChartScenario
+    reduced: ChartScenario
+    shorten: ChartScenario
+
+
+class ScheduleRowsResponse(BaseModel):
+    # 列式明细：各列一一对应，金额保留两位小数
+    scenario: str
+    paid_periods: int
+    total_rows: int = Field(..., description="该方案明细总行数")
+    offset: int = Field(..., description="本页第一行在明细中的下标（0 起）")
+    next_offset: Optional[int] = Field(None, description="下一页的 offset；已到末尾时为空")
+    month_index: List[int] = Field(..., description="期数序号（原方案接续已还期数，其余两方案从 1 开始）")
+    payment: List[float]
+    principal: List[float]
+    interest: List[float]
+    balance: List[float]
+
+
+class CacheStatsResponse(BaseModel):
+    entries: int
+    bytes: int
+    max_entries: int
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    hit_rate: float
+
+
+class ExportJobResponse(BaseModel):
+    job_id: str
+    status: str = Field(..., description="queued / running / succeeded / failed")
+    created_at: datetime
+    updated_at: datetime
+    expires_at: Optional[datetime] = Field(None, description="产物（及任务记录）的清理时间，任务结束后才有")
+    size: Optional[int] = None
+    error: Optional[str] = None
+    download_url: Optional[str] = None
+
+
+class CoalescingKeyStats(BaseModel):
+    key: str
+    leaders: int
+    coalesced: int
+    fallbacks: int
+
+
+class CoalescingStatsResponse(BaseModel):
+    in_flight: int
+    leaders: int
+    coalesced: int
+    fallbacks: int
+    coalesce_rate: float
+    top_keys: List[CoalescingKeyStats]
+
+
 @app.get("/health", tags=["health"])
 @limiter.exempt
 def health() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/v1/mortgages/cache:stats", tags=["health"])
+def get_cache_stats(_=Depends(require_api_key)) -> Dict[str, CacheStatsResponse]:
+    """进程内计算缓存（基准计划、loan_state）的命中统计，用于评估容量设置。每个 worker 进程独立统计。"""
+    return {
+        name: CacheStatsResponse(hit_rate=stats.hit_rate, **asdict(stats))
+        for name, stats in cache_stats().items()
+    }
+
+
+@app.get("/v1/mortgages/response-cache:stats", tags=["health"])
+def get_response_cache_stats(_=Depends(require_api_key)) -> Dict[str, Any]:
+    """calc 接口响应缓存（SQLite，所有 worker 共享）的条数与命中率。"""
+    return response_cache.stats()
+
+
+@app.get("/v1/mortgages/export-coalescing:stats", tags=["health"])
+def get_export_coalescing_stats(_=Depends(require_api_key)) -> CoalescingStatsResponse:
+    """相同导出请求的并发合并统计（合计 + 合并次数最多的键）。每个 worker 进程独立统计。"""
+    total = export_flights.total()
+    return CoalescingStatsResponse(
+        in_flight=export_flights.in_flight,
+        coalesce_rate=total.coalesce_rate,
+        top_keys=[CoalescingKeyStats(key=str(key), **asdict(stats)) for key, stats in export_flights.top_keys()],
+        **asdict(total),
+    )
+
+
 @app.post(
     "/v1/mortgages/prepayment:calc",
     tags=["mortgage"],
@@ -235,6 +446,12 @@ def health() -> dict:
 )
 @limiter.limit(DEFAULT_RATE_LIMIT)
 def calc_prepayment(request: Request, body: LoanRequest, _=Depends(require_api_key)) -> CalcResponse:
+    as_of = _effective_as_of(body.paid_periods, body.first_payment_date)
+    cache_key = request_key("prepayment:calc", body.model_dump(mode="json"), as_of)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return CalcResponse.model_validate(cached)
+
     try:
         params = LoanParams(
             principal=body.principal,
@@ -245,23 +462,31 @@ def calc_prepayment(request: Request, body: LoanRequest, _=Depends(require_api_k
             first_payment_date=body.first_payment_date,
         )
         prepay = Prepayment(amount=body.prepay_amount, invest_annual_rate=body.invest_annual_rate)
-        result = simulate(params, prepay)
+        # 只返回汇总数字，走闭式解快速路径，不生成明细表
+        result = simulate_summary(params, prepay, as_of_date=as_of)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    return CalcResponse(
+    response = CalcResponse(
         savings_shorten_interest=float(result.savings_shorten),
         savings_reduce_payment_interest=float(result.savings_reduce),
     )
+    response_cache.put(cache_key, "prepayment:calc", response.model_dump(mode="json"))
+    return response
 
 @app.post(
-    "/v1/mortgages/prepayment:export-zip",
+    "/v1/mortgages/prepayment:chart-data",
     tags=["mortgage"],
     responses={400: {"description": "Invalid loan or prepayment parameters"}},
 )
-@limiter.limit(EXPORT_RATE_LIMIT)
-def export_zip(request: Request, body: LoanRequest, _=Depends(require_api_key)):
-    """导出还款明细 ZIP（原方案/减少月供/缩短年限，各一份 Excel）。"""
+@limiter.limit(DEFAULT_RATE_LIMIT)
+def prepayment_chart_data(request: Request, body: ChartDataRequest, _=Depends(require_api_key)) -> ChartDataResponse:
+    as_of = _effective_as_of(body.paid_periods, body.first_payment_date)
+    cache_key = request_key("prepayment:chart-data", body.model_dump(mode="json"), as_of)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return ChartDataResponse.model_validate(cached)
+
     try:
         params = LoanParams(
             principal=body.principal,
@@ -272,108 +497,203 @@ def export_zip(request: Request, body: LoanRequest, _=Depends(require_api_key)):
             first_payment_date=body.first_payment_date,
         )
         prepay = Prepayment(amount=body.prepay_amount, invest_annual_rate=body.invest_annual_rate)
-        result = simulate(params, prepay)
+        # 与分页接口相同的闭式解 / numpy 内核取整张表（缩短年限方案最多 2 倍剩余期数），两接口的行数与数值一致
+        limit = max(body.term_months, 1) * 2
+        windows = {
+            scenario: schedule_window(params, prepay, scenario, 0, limit, as_of_date=as_of)
+            for scenario in SCHEDULE_SCENARIOS
+        }
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    _ensure_row_limit(len(result.base_schedule), "base_schedule")
-    _ensure_row_limit(len(result.reduced_schedule), "reduced_schedule")
-    _ensure_row_limit(len(result.shorten_schedule), "shorten_schedule")
-
-    pdf_bytes = generate_pdf(
-        result=result,
-        prepayment=prepay,
-        original_principal=body.principal,
-        original_annual_rate=body.annual_rate,
-        original_term_months=body.term_months,
-        original_method=body.method,
+    # 只返回降采样后的曲线，不受 MAX_SCHEDULE_ROWS 限制
+    response = ChartDataResponse(
+        paid_periods=windows["base"].paid_periods,
+        points=body.points,
+        **{scenario: _chart_scenario(window.rows, body.points) for scenario, window in windows.items()},
     )
+    response_cache.put(cache_key, "prepayment:chart-data", response.model_dump(mode="json"))
+    return response
 
-    zip_buf = BytesIO()
-    with zipfile.ZipFile(zip_buf, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-        zf.writestr("原方案月供明细.xlsx", _schedule_to_xlsx(result.base_schedule))
-        zf.writestr("提前还款-减少月供-月供明细.xlsx", _schedule_to_xlsx(result.reduced_schedule))
-        zf.writestr("提前还款-缩短年限-月供明细.xlsx", _schedule_to_xlsx(result.shorten_schedule))
-        zf.writestr("提前还款-分析报告.pdf", pdf_bytes)
-    zip_buf.seek(0)
 
-    zip_bytes = zip_buf.getvalue()
-    _ensure_export_size(len(zip_bytes))
+@app.post(
+    "/v1/mortgages/prepayment:schedule",
+    tags=["mortgage"],
+    responses={400: {"description": "Invalid loan or prepayment parameters"}},
+)
+@limiter.limit(DEFAULT_RATE_LIMIT)
+def prepayment_schedule(request: Request, body: ScheduleRowsRequest, _=Depends(require_api_key)) -> ScheduleRowsResponse:
+    return _schedule_rows(body)
 
-    return StreamingResponse(
-        BytesIO(zip_bytes),
-        media_type="application/zip",
-        headers={
-            "Content-Disposition": "attachment; filename=prepayment_report.zip; "
-            f"filename*=UTF-8''{quote('提前还款分析报告.zip')}",
-            "X-Savings-Reduce": f"{float(result.savings_reduce):.2f}",
-            "X-Savings-Shorten": f"{float(result.savings_shorten):.2f}",
-        },
-    )
+
+@app.get(
+    "/v1/mortgages/prepayment:schedule",
+    tags=["mortgage"],
+    responses={400: {"description": "Invalid loan or prepayment parameters"}},
+)
+@limiter.limit(DEFAULT_RATE_LIMIT)
+def get_prepayment_schedule(
+    request: Request,
+    query: Annotated[ScheduleRowsRequest, Query()],
+    _=Depends(require_api_key),
+) -> ScheduleRowsResponse:
+    # 与 POST 相同，参数放在查询字符串中（便于浏览器 / CDN 缓存分页结果）
+    return _schedule_rows(query)
 
 @app.post(
-    "/v1/mortgages/combined:export-xlsx",
+    "/v1/mortgages/prepayment:batch-calc",
     tags=["mortgage"],
-    responses={400: {"description": "Invalid loan parameters"}},
+    responses={422: {"description": "Malformed batch body"}},
+)
+@limiter.limit(BATCH_RATE_LIMIT)
+def batch_calc_prepayment(request: Request, body: BatchLoanRequest, _=Depends(require_api_key)) -> BatchCalcResponse:
+    """批量计算提前还款节省利息：逐项校验后整批交给向量化计算。"""
+    errors: Dict[int, str] = {}
+    valid_index: List[int] = []
+    columns: Dict[str, list] = {name: [] for name in ("principal", "annual_rate", "term_months", "method", "paid_periods", "prepay_amount")}
+
+    for idx, item in enumerate(body.items):
+        try:
+            loan = LoanRequest.model_validate(item)
+            paid_periods = compute_paid_periods(
+                LoanParams(
+                    principal=loan.principal,
+                    annual_rate=loan.annual_rate,
+                    term_months=loan.term_months,
+                    method=loan.method,
+                    paid_periods=loan.paid_periods,
+                    first_payment_date=loan.first_payment_date,
+                )
+            )
+        except ValidationError as e:
+            errors[idx] = _format_validation_error(e)
+            continue
+        except ValueError as e:
+            errors[idx] = str(e)
+            continue
+        valid_index.append(idx)
+        columns["principal"].append(loan.principal)
+        columns["annual_rate"].append(loan.annual_rate)
+        columns["term_months"].append(loan.term_months)
+        columns["method"].append(loan.method)
+        columns["paid_periods"].append(paid_periods)
+        columns["prepay_amount"].append(loan.prepay_amount)
+
+    results: List[BatchItemResult] = [None] * len(body.items)
+    if valid_index:
+        batch = simulate_batch(**columns)
+        savings_shorten = batch.savings_shorten.tolist()
+        savings_reduce = batch.savings_reduce.tolist()
+        for pos, idx in enumerate(valid_index):
+            results[idx] = BatchItemResult(
+                index=idx,
+                savings_shorten_interest=savings_shorten[pos],
+                savings_reduce_payment_interest=savings_reduce[pos],
+            )
+    for idx, message in errors.items():
+        results[idx] = BatchItemResult(index=idx, error=message)
+
+    return BatchCalcResponse(results=results, succeeded=len(valid_index), failed=len(errors))
+
+@app.post(
+    "/v1/mortgages/prepayment:export-zip",
+    tags=["mortgage"],
+    responses={400: {"description": "Invalid loan or prepayment parameters"}},
 )
 @limiter.limit(EXPORT_RATE_LIMIT)
-def export_combined_schedule(request: Request, body: CombinedLoanRequest, _=Depends(require_api_key)):
-    """组合贷（公积金 + 商贷）还款计划导出 Excel，响应头返回总利息。"""
-    include_fund = body.fund_principal > 0
-    include_commercial = body.commercial_principal > 0
+def export_zip(request: Request, body: ExportRequest, _=Depends(require_api_key)):
+    """导出还款明细 ZIP（原方案/减少月供/缩短年限，各一份 Excel，或合并为一个多工作表的 Excel）。"""
+    as_of = _effective_as_of(body.paid_periods, body.first_payment_date)
+    # PDF 页眉页脚印有生成日期，缓存键总是带上今天的日期，跨天不复用旧文件
+    cache_key = request_key("prepayment:export-zip", body.model_dump(mode="json"), as_of or date.today())
+    return _coalesced_export(request, cache_key, lambda: _prepayment_export_members(body, as_of))
 
+@app.post(
+    "/v1/mortgages/prepayment:export-jobs",
+    tags=["mortgage"],
+    status_code=202,
+    responses={400: {"description": "Invalid loan or prepayment parameters"}, 503: {"description": "Export job queue is full"}},
+)
+@limiter.limit(EXPORT_RATE_LIMIT)
+def submit_export_job(request: Request, body: ExportRequest, _=Depends(require_api_key)) -> JSONResponse:
+    """异步导出：立即返回任务号，轮询状态接口，完成后从 download_url 下载（内容同 prepayment:export-zip）。"""
+    if not export_jobs.enabled:
+        raise HTTPException(status_code=503, detail="export jobs are disabled")
+    as_of = _effective_as_of(body.paid_periods, body.first_payment_date)
+    payload = body.model_dump(mode="json")
+    # 入队前先做一次闭式解计算，参数错误当场返回 400，而不是变成一个失败的任务
     try:
-        method = normalize_method(body.method)
-        fund_schedule = build_schedule(
-            body.fund_principal,
-            monthly_rate(body.fund_annual_rate),
-            body.term_months,
-            method,
-        ) if include_fund else []
-        commercial_schedule = build_schedule(
-            body.commercial_principal,
-            monthly_rate(body.commercial_annual_rate),
-            body.term_months,
-            method,
-        ) if include_commercial else []
+        params = LoanParams(
+            principal=body.principal,
+            annual_rate=body.annual_rate,
+            term_months=body.term_months,
+            method=body.method,
+            paid_periods=body.paid_periods,
+            first_payment_date=body.first_payment_date,
+        )
+        simulate_summary(params, Prepayment(amount=body.prepay_amount), as_of_date=as_of)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    _ensure_row_limit(max(len(fund_schedule), len(commercial_schedule)), "combined_schedule")
-
-    max_len = max(len(fund_schedule), len(commercial_schedule))
-    combined: list[ScheduleRow] = []
-    total_interest = 0.0
-
-    for idx in range(max_len):
-        fund = fund_schedule[idx] if idx < len(fund_schedule) else ScheduleRow(idx + 1, 0, 0, 0, 0)
-        commercial = commercial_schedule[idx] if idx < len(commercial_schedule) else ScheduleRow(idx + 1, 0, 0, 0, 0)
-        payment = fund.payment + commercial.payment
-        principal = fund.principal + commercial.principal
-        interest = fund.interest + commercial.interest
-        balance = fund.balance + commercial.balance
-        combined.append(ScheduleRow(idx + 1, payment, principal, interest, balance))
-        total_interest += interest
-
-    zip_bytes = _combined_schedule_to_xlsx(
-        combined,
-        commercial_schedule,
-        fund_schedule,
-        include_commercial=include_commercial,
-        include_fund=include_fund,
+    try:
+        # 计算日期在提交时确定，任务晚些执行或重试时结果不变
+        job = export_jobs.submit("prepayment:export-zip", {
+            "body": payload,
+            "as_of": as_of.isoformat() if as_of else None,
+            "cache_key": request_key("prepayment:export-zip", payload, as_of or date.today()),
+        })
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    status_url = f"{ROOT_PATH}/v1/mortgages/export-jobs/{job.job_id}"
+    return JSONResponse(
+        status_code=202,
+        content=_export_job_response(job).model_dump(mode="json"),
+        headers={"Location": status_url},
     )
 
-    _ensure_export_size(len(zip_bytes))
 
-    return StreamingResponse(
-        BytesIO(zip_bytes),
-        media_type="application/zip",
-        headers={
-            "Content-Disposition": "attachment; filename=loan_schedules.zip; "
-            f"filename*=UTF-8''{quote('房贷月供明细.zip')}",
-            "X-Total-Interest": f"{float(total_interest):.2f}",
-        },
-    )
+@app.get(
+    "/v1/mortgages/export-jobs/{job_id}:download",
+    tags=["mortgage"],
+    responses={404: {"description": "Unknown or expired job"}, 409: {"description": "Job not finished"}},
+)
+@limiter.limit(EXPORT_RATE_LIMIT)
+def download_export_job(request: Request, job_id: str, _=Depends(require_api_key)):
+    """下载已完成的导出任务产物。"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="export job not found")
+    if job.status != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"export job is {job.status}")
+    if not job.path or not os.path.exists(job.path):
+        raise HTTPException(status_code=404, detail="export artifact has expired")
+    return _file_response(request, job.path, "application/zip", job.headers)
+
+
+@app.get(
+    "/v1/mortgages/export-jobs/{job_id}",
+    tags=["mortgage"],
+    responses={404: {"description": "Unknown or expired job"}},
+)
+@limiter.limit(DEFAULT_RATE_LIMIT)
+def get_export_job(request: Request, job_id: str, _=Depends(require_api_key)) -> ExportJobResponse:
+    """查询导出任务状态。"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="export job not found")
+    return _export_job_response(job)
+
+
+@app.post(
+    "/v1/mortgages/combined:export-xlsx",
+    tags=["mortgage"],
+    responses={400: {"description": "Invalid loan parameters"}},
+)
+@limiter.limit(EXPORT_RATE_LIMIT)
+def export_combined_schedule(request: Request, body: CombinedLoanRequest, _=Depends(require_api_key)):
+    """组合贷（公积金 + 商贷）还款计划导出 Excel，响应头返回总利息。"""
+    cache_key = request_key("combined:export-xlsx", body.model_dump(mode="json"))
+    return _coalesced_export(request, cache_key, lambda: _combined_export_members(body))
 
 @app.post(
     "/v1/mortgages/recurring:calc",
@@ -382,6 +702,12 @@ def export_combined_schedule(request: Request, body: CombinedLoanRequest, _=Depe
 )
 @limiter.limit(DEFAULT_RATE_LIMIT)
 def calc_recurring_extra(request: Request, body: RecurringInvestmentRequest, _=Depends(require_api_key)) -> RecurringCalcResponse:
+    as_of = _effective_as_of(body.paid_periods, body.first_payment_date)
+    cache_key = request_key("recurring:calc", body.model_dump(mode="json"), as_of)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return RecurringCalcResponse.model_validate(cached)
+
     try:
         params = LoanParams(
             principal=body.principal,
@@ -391,11 +717,17 @@ def calc_recurring_extra(request: Request, body: RecurringInvestmentRequest, _=D
             paid_periods=body.paid_periods,
             first_payment_date=body.first_payment_date,
         )
-        result = simulate_recurring_extra(params, recurring_extra=body.recurring_extra_amount)
+        # 只返回汇总数字，走闭式解求还清期数与利息，不生成明细表
+        result = simulate_recurring_extra(
+            params,
+            recurring_extra=body.recurring_extra_amount,
+            as_of_date=as_of,
+            include_schedule=False,
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    return RecurringCalcResponse(
+    response = RecurringCalcResponse(
         months_to_payoff=result.months_with_recurring,
         total_interest_with_recurring=float(result.total_interest_with_recurring),
         base_total_interest=float(result.base_total_interest),
@@ -405,6 +737,8 @@ def calc_recurring_extra(request: Request, body: RecurringInvestmentRequest, _=D
         base_monthly_payment=float(result.base_monthly_payment),
         recurring_extra_amount=float(result.recurring_extra_payment),
     )
+    response_cache.put(cache_key, "recurring:calc", response.model_dump(mode="json"))
+    return response
 
 
 @app.post(
@@ -414,6 +748,12 @@ def calc_recurring_extra(request: Request, body: RecurringInvestmentRequest, _=D
 )
 @limiter.limit(DEFAULT_RATE_LIMIT)
 def calc_annual_recurring(request: Request, body: AnnualRecurringRequest, _=Depends(require_api_key)) -> AnnualRecurringResponse:
+    # 已还期数按 recurring_start_date 推算，结果完全由请求体决定
+    cache_key = request_key("recurring:annual", body.model_dump(mode="json"))
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return AnnualRecurringResponse.model_validate(cached)
+
     try:
         params = LoanParams(
             principal=body.principal,
@@ -436,13 +776,14 @@ def calc_annual_recurring(request: Request, body: AnnualRecurringRequest, _=Depe
             annual_extra=body.annual_extra_amount,
             as_of_date=as_of_date,
             months_until_first_extra=start_offset,
+            include_schedule=False,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
     payoff_date = _add_months(as_of_date, result.months_with_recurring) if as_of_date else None
 
-    return AnnualRecurringResponse(
+    response = AnnualRecurringResponse(
         months_to_payoff=result.months_with_recurring,
         payoff_date=payoff_date,
         total_interest_with_recurring=float(result.total_interest_with_recurring),
@@ -455,6 +796,15 @@ def calc_annual_recurring(request: Request, body: AnnualRecurringRequest, _=Depe
         start_offset_months=start_offset,
         first_annual_extra_date=first_extra_date,
     )
+    response_cache.put(cache_key, "recurring:annual", response.model_dump(mode="json"))
+    return response
+
+
+def _effective_as_of(paid_periods: Optional[int], first_payment_date: Optional[date]) -> Optional[date]:
+    # 只有“未给已还期数、按首次还款日期推算”时结果才依赖今天的日期。
+    if paid_periods is None and first_payment_date is not None:
+        return date.today()
+    return None
 
 
 def _months_between(start: date, end: date) -> int:
@@ -486,178 +836,287 @@ def _add_months(src: date, months: int) -> date:
     return date(year, month, day)
 
 
-def _schedule_to_xlsx(schedule) -> bytes:
-    """将还款计划列表导出为 Excel（xlsx），返回二进制。"""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Schedule"
-
-    headers = ["期数", "月供", "本金", "利息", "余额", "利息占比"]
-    ws.append(headers)
-
-    header_font = Font(bold=True, name="Arial", size=11, color="FFFFFF")
-    body_font = Font(name="Arial", size=10)
-    header_fill = PatternFill("solid", fgColor="0F172A")
-    alt_fill = PatternFill("solid", fgColor="F8FAFC")
-    border = Border(bottom=Side(style="thin", color="E2E8F0"))
-    align_right = Alignment(horizontal="right")
-    align_center = Alignment(horizontal="center")
-
-    for cell in ws[1]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = align_center
-
-    for idx, row in enumerate(schedule, start=2):
-        ratio = (row.interest / row.payment) if row.payment else 0.0
-        ws.append([
-            row.month_index,
-            round(row.payment, 2),
-            round(row.principal, 2),
-            round(row.interest, 2),
-            round(row.balance, 2),
-            f"{ratio*100:.2f}%",
-        ])
-        for col_idx in range(1, 7):
-            cell = ws.cell(row=idx, column=col_idx)
-            cell.font = body_font
-            cell.alignment = align_right if col_idx > 1 else align_center
-            if idx % 2 == 0:
-                cell.fill = alt_fill
-            cell.border = border
-        # 利息占比<50% 标红
-        ratio_cell = ws.cell(row=idx, column=6)
-        if ratio < 0.5:
-            ratio_cell.font = Font(name="Arial", size=10, color="EF4444")
-
-    # 列宽
-    widths = [8, 14, 14, 14, 16, 12]
-    for i, w in enumerate(widths, start=1):
-        ws.column_dimensions[get_column_letter(i)].width = w
-
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return buf.getvalue()
-
-
-def _combined_schedule_to_xlsx(
-    combined: list[ScheduleRow],
-    commercial_schedule: list[ScheduleRow],
-    fund_schedule: list[ScheduleRow],
-    include_commercial: bool,
-    include_fund: bool,
-) -> bytes:
-    """组合贷专用：动态输出商贷/公积金列，含各自利息占比与总利息占比。"""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Combined"
-
-    headers = ["期数", "月供总额"]
-    if include_commercial:
-        headers += [
-            "商贷月供总额",
-            "商贷本金",
-            "商贷利息",
-            "商贷余额",
-            "商贷利息占比",
-        ]
-    if include_fund:
-        headers += [
-            "公积金月供总额",
-            "公积金本金",
-            "公积金利息",
-            "公积金余额",
-            "公积金利息占比",
+def _prepayment_export_members(body: ExportRequest, as_of: Optional[date]):
+    # 计算并提交渲染任务，返回 (ZIP 成员, 响应头)；同步导出与异步导出任务共用。
+    try:
+        params = LoanParams(
+            principal=body.principal,
+            annual_rate=body.annual_rate,
+            term_months=body.term_months,
+            method=body.method,
+            paid_periods=body.paid_periods,
+            first_payment_date=body.first_payment_date,
+        )
+        prepay = Prepayment(amount=body.prepay_amount, invest_annual_rate=body.invest_annual_rate)
+        result = simulate(params, prepay, as_of_date=as_of)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    _ensure_row_limit(len(result.base_schedule), "base_schedule")
+    _ensure_row_limit(len(result.reduced_schedule), "reduced_schedule")
+    _ensure_row_limit(len(result.shorten_schedule), "shorten_schedule")
+
+    # 渲染任务一次性提交：启用进程池时并行生成；否则按顺序在发送到该成员时才生成，内存中同一时刻只保留一个成员
+    if body.single_workbook:
+        tasks = [
+            ("提前还款-月供明细.xlsx", render_pool.submit(schedules_to_xlsx, [
+                ("原方案", result.base_schedule),
+                ("减少月供", result.reduced_schedule),
+                ("缩短年限", result.shorten_schedule),
+            ])),
         ]
-    headers.append("利息总占比")
-    ws.append(headers)
-
-    header_font = Font(bold=True, name="Arial", size=11, color="FFFFFF")
-    body_font = Font(name="Arial", size=10)
-    header_fill_base = PatternFill("solid", fgColor="0F172A")
-    header_fill_commercial = PatternFill("solid", fgColor="1D4ED8")
-    header_fill_fund = PatternFill("solid", fgColor="047857")
-    body_fill_commercial = PatternFill("solid", fgColor="EFF6FF")
-    body_fill_fund = PatternFill("solid", fgColor="ECFDF3")
-    alt_fill = PatternFill("solid", fgColor="F8FAFC")
-    border = Border(bottom=Side(style="thin", color="E2E8F0"))
-    align_right = Alignment(horizontal="right")
-    align_center = Alignment(horizontal="center")
-
-    commercial_cols = [idx for idx, h in enumerate(headers, start=1) if h.startswith("商贷")]
-    fund_cols = [idx for idx, h in enumerate(headers, start=1) if h.startswith("公积金")]
-
-    for idx, cell in enumerate(ws[1], start=1):
-        cell.font = header_font
-        if idx in commercial_cols:
-            cell.fill = header_fill_commercial
-        elif idx in fund_cols:
-            cell.fill = header_fill_fund
-        else:
-            cell.fill = header_fill_base
-        cell.alignment = align_center
-
-    max_len = len(combined)
-    for idx in range(max_len):
-        combined_row = combined[idx]
-        row_values = [
-            combined_row.month_index,
-            round(combined_row.payment, 2),
+    else:
+        tasks = [
+            ("原方案月供明细.xlsx", render_pool.submit(schedule_to_xlsx, result.base_schedule)),
+            ("提前还款-减少月供-月供明细.xlsx", render_pool.submit(schedule_to_xlsx, result.reduced_schedule)),
+            ("提前还款-缩短年限-月供明细.xlsx", render_pool.submit(schedule_to_xlsx, result.shorten_schedule)),
         ]
+    tasks.append(
+        ("提前还款-分析报告.pdf", render_pool.submit(
+            report_pdf,
+            result=result,
+            prepayment=prepay,
+            original_principal=body.principal,
+            original_annual_rate=body.annual_rate,
+            original_term_months=body.term_months,
+            original_method=body.method,
+        ))
+    )
+    members = [(name, task.result) for name, task in tasks]
+    headers = {
+        "Content-Disposition": "attachment; filename=prepayment_report.zip; "
+        f"filename*=UTF-8''{quote('提前还款分析报告.zip')}",
+        "X-Savings-Reduce": f"{float(result.savings_reduce):.2f}",
+        "X-Savings-Shorten": f"{float(result.savings_shorten):.2f}",
+    }
+    return members, headers
+
+
+def _run_prepayment_export_job(payload: Dict[str, Any]):
+    # 导出任务处理函数（在后台线程中执行）：与同步导出共用导出缓存和并发合并。
+    cache_key = payload["cache_key"]
+    stored = export_store.get(cache_key)
+    flight = export_flights.join(cache_key) if stored is None and export_store.enabled else None
+    if flight is not None and not flight.leader:
+        stored = flight.wait(EXPORT_COALESCE_WAIT_SECONDS)
+        flight = None
+    if stored is not None:
+        return _read_chunks(stored.path), stored.headers
+
+    try:
+        body = ExportRequest.model_validate(payload["body"])
+        as_of = date.fromisoformat(payload["as_of"]) if payload.get("as_of") else None
+        members, headers = _prepayment_export_members(body, as_of)
+    except BaseException as e:
+        # 任何失败都要放行等待中的相同请求，否则它们会一直等到 EXPORT_COALESCE_WAIT_SECONDS
+        if flight is not None:
+            flight.finish(None)
+        if isinstance(e, HTTPException):
+            raise ValueError(e.detail)
+        raise
+    return _export_chunks(cache_key, members, headers, flight), headers
+
+
+export_jobs.register("prepayment:export-zip", _run_prepayment_export_job)
+
+
+def _read_chunks(path: str, chunk_size: int = 1024 * 1024):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _export_job_response(job: ExportJob) -> ExportJobResponse:
+    expires_at = export_jobs.expires_at(job)
+    return ExportJobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        created_at=datetime.fromtimestamp(job.created_at, timezone.utc),
+        updated_at=datetime.fromtimestamp(job.updated_at, timezone.utc),
+        expires_at=datetime.fromtimestamp(expires_at, timezone.utc) if expires_at is not None else None,
+        size=job.size,
+        error=job.error,
+        download_url=f"{ROOT_PATH}/v1/mortgages/export-jobs/{job.job_id}:download" if job.status == SUCCEEDED else None,
+    )
+
+
+def _combined_export_members(body: CombinedLoanRequest):
+    # 计算组合贷明细并提交渲染任务，返回 (ZIP 成员, 响应头)。
+    include_fund = body.fund_principal > 0
+    include_commercial = body.commercial_principal > 0
+
+    try:
+        method = normalize_method(body.method)
+        fund_schedule = base_schedule(
+            body.fund_principal,
+            monthly_rate(body.fund_annual_rate),
+            body.term_months,
+            method,
+        ) if include_fund else Schedule.empty()
+        commercial_schedule = base_schedule(
+            body.commercial_principal,
+            monthly_rate(body.commercial_annual_rate),
+            body.term_months,
+            method,
+        ) if include_commercial else Schedule.empty()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    max_len = max(len(fund_schedule), len(commercial_schedule))
+    _ensure_row_limit(max_len, "combined_schedule")
+
+    # 两笔贷款按期对齐（较短的一笔末尾补零），逐列相加得到组合月供
+    fund_schedule = fund_schedule.pad_to(max_len)
+    commercial_schedule = commercial_schedule.pad_to(max_len)
+    combined = Schedule(
+        fund_schedule.payment + commercial_schedule.payment,
+        fund_schedule.principal + commercial_schedule.principal,
+        fund_schedule.interest + commercial_schedule.interest,
+        fund_schedule.balance + commercial_schedule.balance,
+    )
+    total_interest = combined.total_interest()
+
+    headers = {
+        "Content-Disposition": "attachment; filename=loan_schedules.zip; "
+        f"filename*=UTF-8''{quote('房贷月供明细.zip')}",
+        "X-Total-Interest": f"{float(total_interest):.2f}",
+    }
+    # 将 xlsx 打包为 zip，便于前端统一处理
+    task = render_pool.submit(
+        combined_schedule_to_xlsx,
+        combined,
+        commercial_schedule,
+        fund_schedule,
+        include_commercial=include_commercial,
+        include_fund=include_fund,
+    )
+    members = [("房贷月供明细.xlsx", task.result)]
+    return members, headers
+
+
+def _coalesced_export(request: Request, cache_key: str, render: Callable[[], tuple]):
+    # 导出缓存命中直接返回文件；否则同一键的并发请求只生成一次，其余请求等待生成完成后从导出缓存返回。
+    stored = export_store.get(cache_key)
+    if stored is not None:
+        return _stored_export_response(request, stored)
+    if not export_store.enabled:
+        # 结果只能经由导出缓存共享；缓存关闭时合并没有意义
+        members, headers = render()
+        return _streaming_export(cache_key, members, headers)
+
+    flight = export_flights.join(cache_key)
+    if not flight.leader:
+        stored = flight.wait(EXPORT_COALESCE_WAIT_SECONDS)
+        if stored is not None:
+            return _stored_export_response(request, stored)
+        members, headers = render()
+        return _streaming_export(cache_key, members, headers)
+    try:
+        members, headers = render()
+    except BaseException:
+        flight.finish(None)
+        raise
+    return _streaming_export(cache_key, members, headers, flight=flight)
+
+
+def _export_chunks(cache_key: str, members, headers: Dict[str, str], flight: Optional[Flight] = None):
+    # 生成 ZIP 数据块，同时写入导出缓存（完整生成后才提交）。
+    # 缓存文件一提交就把结果交给等待中的相同请求，不必等本次响应传输完毕；失败或中断时在 finally 中放行。
+    try:
+        # 开始发送时才打开缓存文件，响应未被消费时不会留下临时文件
+        tee = export_store.open_writer(cache_key, media_type="application/zip", headers=headers)
+        yield from stream_zip(members, max_bytes=MAX_EXPORT_BYTES, tee=tee, on_commit=flight.finish if flight is not None else None)
+    finally:
+        if flight is not None:
+            flight.finish(export_store.get(cache_key))
+
+
+def _streaming_export(cache_key: str, members, headers: Dict[str, str], flight: Optional[Flight] = None) -> StreamingResponse:
+    # 流式返回 ZIP；累计体积超过 MAX_EXPORT_BYTES 时中止传输。
+    return StreamingResponse(
+        _export_chunks(cache_key, members, headers, flight),
+        media_type="application/zip",
+        headers=headers,
+    )
 
-        if include_commercial:
-            c = commercial_schedule[idx] if idx < len(commercial_schedule) else ScheduleRow(idx + 1, 0, 0, 0, 0)
-            c_ratio = (c.interest / c.payment * 100) if c.payment else 0.0
-            row_values += [
-                round(c.payment, 2),
-                round(c.principal, 2),
-                round(c.interest, 2),
-                round(c.balance, 2),
-                f"{c_ratio:.2f}%",
-            ]
-
-        if include_fund:
-            f = fund_schedule[idx] if idx < len(fund_schedule) else ScheduleRow(idx + 1, 0, 0, 0, 0)
-            f_ratio = (f.interest / f.payment * 100) if f.payment else 0.0
-            row_values += [
-                round(f.payment, 2),
-                round(f.principal, 2),
-                round(f.interest, 2),
-                round(f.balance, 2),
-                f"{f_ratio:.2f}%",
-            ]
-
-        total_ratio = (combined_row.interest / combined_row.payment * 100) if combined_row.payment else 0.0
-        row_values.append(f"{total_ratio:.2f}%")
-
-        ws.append(row_values)
-
-        for col_idx in range(1, len(row_values) + 1):
-            cell = ws.cell(row=idx + 2, column=col_idx)
-            cell.font = body_font
-            cell.alignment = align_right if col_idx > 1 else align_center
-            if col_idx in commercial_cols:
-                cell.fill = body_fill_commercial
-            elif col_idx in fund_cols:
-                cell.fill = body_fill_fund
-            elif (idx + 2) % 2 == 0:
-                cell.fill = alt_fill
-            cell.border = border
-
-    for i in range(1, len(headers) + 1):
-        ws.column_dimensions[get_column_letter(i)].width = 14
-
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-
-    zip_buf = BytesIO()
-    with zipfile.ZipFile(zip_buf, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-        # 将 xlsx 打包为 zip，便于前端统一处理
-        zf.writestr("房贷月供明细.xlsx", buf.getvalue())
-    zip_buf.seek(0)
-    return zip_buf.getvalue()
+
+def _stored_export_response(request: Request, stored: StoredExport) -> Response:
+    # 直接从磁盘返回已生成的导出文件（与首次生成时的响应头一致）。
+    return _file_response(request, stored.path, stored.media_type, stored.headers)
+
+
+def _file_response(request: Request, path: str, media_type: str, headers: Dict[str, str]) -> Response:
+    # 经 Nginx 访问（请求头 X-Accel-Enabled: 1）且配置了 EXPORT_ACCEL_REDIRECT_PREFIX 时，
+    # 只返回 X-Accel-Redirect 头，由 Nginx 从共享的输出目录以 sendfile 发送文件；否则由本进程发送。
+    if EXPORT_ACCEL_REDIRECT_PREFIX and request.headers.get("x-accel-enabled") == "1":
+        relative = os.path.relpath(os.path.abspath(path), os.path.abspath(OUTPUT_DIR))
+        if not relative.startswith(".."):
+            location = EXPORT_ACCEL_REDIRECT_PREFIX + quote(relative.replace(os.sep, "/"))
+            return Response(media_type=media_type, headers={**headers, "X-Accel-Redirect": location})
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+def _chart_scenario(schedule: Schedule, points: int) -> ChartScenario:
+    series = downsample_schedule(schedule, points)
+    return ChartScenario(
+        months=len(schedule),
+        **{name: ChartSeries(month=month, value=value) for name, (month, value) in series.items()},
+    )
+
+
+def _schedule_rows(body: ScheduleRowsRequest) -> ScheduleRowsResponse:
+    as_of = _effective_as_of(body.paid_periods, body.first_payment_date)
+    cache_key = request_key("prepayment:schedule", body.model_dump(mode="json"), as_of)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return ScheduleRowsResponse.model_validate(cached)
+
+    years = None
+    if body.year_from is not None:
+        years = (body.year_from, body.year_to if body.year_to is not None else body.year_from)
+    try:
+        params = LoanParams(
+            principal=body.principal,
+            annual_rate=body.annual_rate,
+            term_months=body.term_months,
+            method=body.method,
+            paid_periods=body.paid_periods,
+            first_payment_date=body.first_payment_date,
+        )
+        prepay = Prepayment(amount=body.prepay_amount, invest_annual_rate=body.invest_annual_rate)
+        # 只计算本页的行（闭式解直接定位），与整张表的长度无关
+        window = schedule_window(params, prepay, body.scenario, body.offset, body.limit, years=years, as_of_date=as_of)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rows = window.rows
+    end = window.offset + len(rows)
+    response = ScheduleRowsResponse(
+        scenario=window.scenario,
+        paid_periods=window.paid_periods,
+        total_rows=window.total_rows,
+        offset=window.offset,
+        next_offset=end if years is None and end < window.total_rows else None,
+        month_index=list(range(rows.start, rows.start + len(rows))),
+        payment=[round(v, 2) for v in rows.payment.tolist()],
+        principal=[round(v, 2) for v in rows.principal.tolist()],
+        interest=[round(v, 2) for v in rows.interest.tolist()],
+        balance=[round(v, 2) for v in rows.balance.tolist()],
+    )
+    response_cache.put(cache_key, "prepayment:schedule", response.model_dump(mode="json"))
+    return response
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    # 批量接口的单项错误：压缩成一行“字段: 原因”
+    parts = []
+    for err in exc.errors():
+        loc = ".".join(str(p) for p in err.get("loc", ()))
+        parts.append(f"{loc}: {err.get('msg')}" if loc else str(err.get("msg")))
+    return "; ".join(parts)
 
 
 def _ensure_row_limit(rows: int, label: str) -> None:
@@ -665,11 +1124,6 @@ def _ensure_row_limit(rows: int, label: str) -> None:
         raise HTTPException(status_code=413, detail=f"{label} too large, exceeds {MAX_SCHEDULE_ROWS} rows limit")
 
 
-def _ensure_export_size(size_bytes: int) -> None:
-    if size_bytes > MAX_EXPORT_BYTES:
-        raise HTTPException(status_code=413, detail="export file too large")
-
-
 def _resolve_first_annual_date(
     as_of: date,
     *,
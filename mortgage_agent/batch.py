@@ -0,0 +1,191 @@
+"""批量提前还款测算：一次调用对成千上万笔贷款做向量化计算。
+
+simulate_batch 与 calculator.simulate_summary 使用同一套闭式解
+（年金余额公式、等差数列求和、对数倒推还清期数），只是把每个量都换成按贷款排列的 NumPy 数组，
+整批计算没有任何按贷款或按月的 Python 循环。逐笔结果与 simulate_summary 的差异在浮点舍入量级。
+
+与 simulate_summary 的区别：已还期数必须直接给出（不支持按首次还款日期推算）。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence, Union
+
+import numpy as np
+
+from mortgage_agent.calculator import METHOD_EQUAL_PRINCIPAL, SimulationSummary, _PAYOFF_EPS, normalize_method
+
+
+ArrayLike = Union[np.ndarray, Sequence[float]]
+
+
+@dataclass
+class BatchSimulationResult:
+    """simulate_batch 的列式结果：每个字段都是长度为贷款笔数的数组。
+
+    字段含义与 SimulationSummary 中同名字段一致。
+    """
+
+    paid_periods: np.ndarray
+    remaining_months: np.ndarray
+    remaining_principal: np.ndarray
+    original_monthly_payment: np.ndarray
+    reduced_monthly_payment: np.ndarray
+    shorten_months: np.ndarray
+    base_remaining_interest: np.ndarray
+    reduced_remaining_interest: np.ndarray
+    shorten_remaining_interest: np.ndarray
+    savings_reduce: np.ndarray
+    savings_shorten: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.paid_periods.shape[0])
+
+    def summary(self, i: int) -> SimulationSummary:
+        # 取出第 i 笔贷款的结果（便于与单笔接口对照）。
+        return SimulationSummary(
+            paid_periods=int(self.paid_periods[i]),
+            remaining_months=int(self.remaining_months[i]),
+            remaining_principal=float(self.remaining_principal[i]),
+            original_monthly_payment=float(self.original_monthly_payment[i]),
+            reduced_monthly_payment=float(self.reduced_monthly_payment[i]),
+            shorten_months=int(self.shorten_months[i]),
+            base_remaining_interest=float(self.base_remaining_interest[i]),
+            reduced_remaining_interest=float(self.reduced_remaining_interest[i]),
+            shorten_remaining_interest=float(self.shorten_remaining_interest[i]),
+            savings_reduce=float(self.savings_reduce[i]),
+            savings_shorten=float(self.savings_shorten[i]),
+        )
+
+
+def _equal_principal_mask(method: Union[str, ArrayLike], size: int) -> np.ndarray:
+    # 还款方式列 -> “是否等额本金”布尔数组；只对去重后的取值做一次校验。
+    values = np.asarray(method)
+    if values.ndim == 0:
+        return np.full(size, normalize_method(str(values)) == METHOD_EQUAL_PRINCIPAL)
+    uniques, inverse = np.unique(values, return_inverse=True)
+    flags = np.array([normalize_method(str(v)) == METHOD_EQUAL_PRINCIPAL for v in uniques], dtype=bool)
+    return flags[inverse.reshape(-1)]
+
+
+def _growth(rate: np.ndarray, months: np.ndarray) -> np.ndarray:
+    # (1 + r)^n - 1，用 expm1/log1p 保证小利率时的精度。
+    return np.expm1(months * np.log1p(rate))
+
+
+def _annuity_payment(principal: np.ndarray, rate: np.ndarray, months: np.ndarray) -> np.ndarray:
+    growth = _growth(rate, months)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = np.where(rate == 0, principal / months, principal * rate * (growth + 1) / growth)
+    return np.where(months > 0, payment, 0.0)
+
+
+def _first_payment_and_interest(principal, rate, months, equal_principal):
+    # build_schedule(principal, rate, months, method) 的首期月供与总利息（向量化）。
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = _annuity_payment(principal, rate, months)
+        ep_first = principal / months + principal * rate
+    first = np.where(equal_principal, ep_first, annuity)
+    interest = np.where(equal_principal, principal * rate * (months + 1) / 2.0, annuity * months - principal)
+    valid = (months > 0) & (principal > 0)
+    return np.where(valid, first, 0.0), np.where(valid, interest, 0.0)
+
+
+def _fixed_payment_payoff(principal, rate, payment, max_months):
+    # calculator.solve_fixed_payment_payoff 的向量化版本：返回（还清期数, 总利息）。
+    valid = (principal > 0) & (payment > 0) & (max_months > 0) & (payment - principal * rate > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exact = np.where(
+            rate == 0,
+            principal / payment,
+            -np.log1p(-principal * rate / payment) / np.log1p(rate),
+        )
+        exact = np.where(valid, exact, 1.0)
+        months = np.minimum(np.maximum(np.ceil(exact - _PAYOFF_EPS), 1.0), max_months)
+
+        # 前 months-1 期按整月供还款，最后一期只还剩余本息
+        growth = _growth(rate, months - 1)
+        before_last = np.where(
+            rate == 0,
+            principal - payment * (months - 1),
+            principal * (growth + 1) - payment * growth / rate,
+        )
+    due = before_last * (1 + rate)
+    last_payment = np.minimum(payment, due)
+    ending = np.maximum(due - last_payment, 0.0)
+    interest = payment * (months - 1) + last_payment - (principal - ending)
+    return np.where(valid, months, 0).astype(np.int64), np.where(valid, interest, 0.0)
+
+
+def simulate_batch(
+    principal: ArrayLike,
+    annual_rate: ArrayLike,
+    term_months: ArrayLike,
+    method: Union[str, ArrayLike],
+    paid_periods: ArrayLike,
+    prepay_amount: ArrayLike,
+) -> BatchSimulationResult:
+    """批量计算提前还款两种方案的节省利息、新月供与缩短后的期数。
+
+    参数均为等长的一维数组（method 也可以是单个字符串，表示整批相同），
+    单位与 LoanParams / Prepayment 相同：年利率为百分比，期数为月。
+    """
+    principal = np.asarray(principal, dtype=np.float64).reshape(-1)
+    size = principal.shape[0]
+    annual_rate = np.broadcast_to(np.asarray(annual_rate, dtype=np.float64), (size,))
+    term = np.broadcast_to(np.asarray(term_months, dtype=np.int64), (size,))
+    paid = np.broadcast_to(np.asarray(paid_periods, dtype=np.int64), (size,))
+    prepay = np.broadcast_to(np.asarray(prepay_amount, dtype=np.float64), (size,))
+    equal_principal = _equal_principal_mask(method, size)
+
+    loan_ok = (principal > 0) & (term > 0)
+    n = np.where(loan_ok, term, 1).astype(np.float64)
+    paid = np.where(loan_ok, np.clip(paid, 0, np.maximum(term, 0)), 0)
+    k = paid.astype(np.float64)
+    rate = annual_rate / 100.0 / 12.0
+
+    # 第 k 期后的剩余本金
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = _annuity_payment(principal, rate, n)
+        annuity_balance = np.where(
+            rate == 0,
+            principal - payment * k,
+            principal * (_growth(rate, k) + 1) - payment * _growth(rate, k) / rate,
+        )
+    balance = np.where(equal_principal, principal - principal / n * k, annuity_balance)
+    balance = np.where(k >= n, 0.0, np.maximum(balance, 0.0))
+    balance = np.where(k <= 0, principal, balance)
+
+    remaining = np.where(loan_ok, n - k, 0.0)
+    active = loan_ok & (remaining > 0) & (balance > 0)
+    remaining = np.where(active, remaining, 0.0)
+    balance = np.where(active, balance, 0.0)
+
+    original_payment, base_interest = _first_payment_and_interest(balance, rate, remaining, equal_principal)
+
+    new_principal = np.maximum(balance - np.minimum(prepay, balance), 0.0)
+    reduced_payment, reduced_interest = _first_payment_and_interest(new_principal, rate, remaining, equal_principal)
+
+    shorten_months, shorten_interest = _fixed_payment_payoff(
+        new_principal,
+        rate,
+        original_payment,
+        np.maximum(remaining, 1.0) * 2,
+    )
+    shorten_months = np.where(active, shorten_months, 0)
+    shorten_interest = np.where(active, shorten_interest, 0.0)
+
+    return BatchSimulationResult(
+        paid_periods=paid.astype(np.int64),
+        remaining_months=remaining.astype(np.int64),
+        remaining_principal=balance,
+        original_monthly_payment=original_payment,
+        reduced_monthly_payment=reduced_payment,
+        shorten_months=shorten_months,
+        base_remaining_interest=base_interest,
+        reduced_remaining_interest=reduced_interest,
+        shorten_remaining_interest=shorten_interest,
+        savings_reduce=base_interest - reduced_interest,
+        savings_shorten=base_interest - shorten_interest,
+    )
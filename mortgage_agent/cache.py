@@ -0,0 +1,148 @@
+"""进程内 LRU 缓存：记忆化基准还款计划与 loan_state 查询。
+
+同一组（本金、利率、期限、还款方式）在不同请求之间反复出现（用户往往只改提前还款金额），
+基准计划只需生成一次。Schedule 各列只读，缓存的对象可以被多个请求安全共享。
+
+容量由环境变量控制（设为 0 关闭对应缓存）：
+    SCHEDULE_CACHE_MAX_ENTRIES   基准计划最多条数（默认 256）
+    SCHEDULE_CACHE_MAX_BYTES     基准计划数据总字节数上限（默认 64 MiB）
+    LOAN_STATE_CACHE_MAX_ENTRIES loan_state 结果最多条数（默认 4096）
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+@dataclass
+class CacheStats:
+    """缓存运行统计（用于评估容量设置）。
+
+    字段说明：
+        entries / bytes: 当前条数与估算字节数。
+        max_entries / max_bytes: 容量上限（max_bytes 为 0 表示不限字节数）。
+        hits / misses / evictions: 命中、未命中与淘汰次数（进程启动以来累计）。
+    """
+
+    entries: int
+    bytes: int
+    max_entries: int
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def _sizeof(value: Any) -> int:
+    # Schedule / ndarray 按数据字节数计，其它对象按 sys.getsizeof 粗略估计。
+    nbytes = getattr(value, "nbytes", None)
+    return int(nbytes) if nbytes is not None else sys.getsizeof(value)
+
+
+class LRUCache:
+    """线程安全的 LRU 缓存，同时限制条数与总字节数，超出时淘汰最久未使用的条目。"""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        max_bytes: int = 0,
+        sizeof: Callable[[Any], int] = _sizeof,
+    ):
+        self.name = name
+        self.max_entries = max(max_entries, 0)
+        self.max_bytes = max(max_bytes, 0)
+        self._sizeof = sizeof
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+        _REGISTRY[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.max_entries == 0:
+            return
+        size = self._sizeof(value)
+        if self.max_bytes and size > self.max_bytes:
+            # 单个对象超过字节上限：不缓存，也不挤掉已有条目
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        # 命中直接返回；未命中时在锁外计算再写入（并发未命中可能重复计算，但结果一致）。
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                entries=len(self._data),
+                bytes=self._bytes,
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+            )
+
+
+_REGISTRY: Dict[str, LRUCache] = {}
+
+
+def cache_stats(name: Optional[str] = None) -> Dict[str, CacheStats]:
+    # 所有（或指定名称的）缓存的统计信息。
+    return {n: c.stats() for n, c in _REGISTRY.items() if name is None or n == name}
+
+
+SCHEDULE_CACHE = LRUCache(
+    "schedule",
+    max_entries=int(os.getenv("SCHEDULE_CACHE_MAX_ENTRIES", "256")),
+    max_bytes=int(os.getenv("SCHEDULE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+LOAN_STATE_CACHE = LRUCache(
+    "loan_state",
+    max_entries=int(os.getenv("LOAN_STATE_CACHE_MAX_ENTRIES", "4096")),
+)
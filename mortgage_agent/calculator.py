@@ -2,14 +2,28 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import date
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Optional, Tuple
 import math
 
+import numpy as np
+
+from mortgage_agent import kernels
+from mortgage_agent.cache import LOAN_STATE_CACHE, SCHEDULE_CACHE
+from mortgage_agent.schedule import Schedule, ScheduleBuilder, ScheduleRow
+
 
 # 还款方式常量：等额本息 / 等额本金
 METHOD_ANNUITY = "equal_payment"
 METHOD_EQUAL_PRINCIPAL = "equal_principal"
 
+# 还款计划计算后端：python 为逐月循环；numpy 为向量化内核（误差约定见 kernels 模块说明）。
+# 两者都返回列式 Schedule。
+BACKEND_PYTHON = "python"
+BACKEND_NUMPY = "numpy"
+
+# 提前还款后的三种方案：原方案剩余期 / 减少月供 / 缩短年限
+SCHEDULE_SCENARIOS = ("base", "reduced", "shorten")
+
 
 @dataclass
 class LoanParams:
@@ -45,25 +59,6 @@ class Prepayment:
     invest_annual_rate: Optional[float] = None
 
 
-@dataclass
-class ScheduleRow:
-    """单期（月）还款计划明细。
-
-    字段说明：
-        month_index: 期数序号（从 1 开始）。
-        payment: 本期实际还款额（单位：元）。
-        principal: 本期归还本金（单位：元）。
-        interest: 本期支付利息（单位：元）。
-        balance: 本期还款后剩余本金余额（单位：元）。
-    """
-
-    month_index: int
-    payment: float
-    principal: float
-    interest: float
-    balance: float
-
-
 @dataclass
 class SimulationResult:
     """模拟结果汇总（基准 + 两种提前还款方案）。
@@ -107,14 +102,70 @@ class SimulationResult:
     shorten_remaining_interest: float
     savings_reduce: float
     savings_shorten: float
-    base_schedule: List[ScheduleRow]
-    reduced_schedule: List[ScheduleRow]
-    shorten_schedule: List[ScheduleRow]
+    base_schedule: Schedule
+    reduced_schedule: Schedule
+    shorten_schedule: Schedule
     interest_by_year: Dict[int, float]
     critical_month_index: Optional[int]
     critical_reason: Optional[str]
 
 
+@dataclass
+class SimulationSummary:
+    """simulate_summary 的聚合结果：只含汇总数字，不含任何明细表。
+
+    字段含义与 SimulationResult 中同名字段一致。
+    """
+
+    paid_periods: int
+    remaining_months: int
+    remaining_principal: float
+    original_monthly_payment: float
+    reduced_monthly_payment: float
+    shorten_months: int
+    base_remaining_interest: float
+    reduced_remaining_interest: float
+    shorten_remaining_interest: float
+    savings_reduce: float
+    savings_shorten: float
+
+
+@dataclass(frozen=True)
+class LoanState:
+    """贷款在第 k 期还款后的状态（按原计划还款、无提前还款）。
+
+    字段说明：
+        month_index: 已还期数 k（0 表示尚未还款）。
+        balance: 第 k 期还款后的剩余本金。
+        cumulative_interest: 第 1~k 期累计支付利息。
+        cumulative_payment: 第 1~k 期累计还款额（本金 + 利息）。
+    """
+
+    month_index: int
+    balance: float
+    cumulative_interest: float
+    cumulative_payment: float
+
+
+@dataclass
+class PayoffSummary:
+    """固定月供（可分段）还款直至还清的汇总结果，由闭式解直接求得。
+
+    字段说明：
+        months: 还清所需期数（达到 max_months 上限仍未还清时为 max_months）。
+        final_payment: 最后一期的实际还款额（通常小于月供）。
+        total_interest: 全部期数的利息合计。
+        total_payment: 全部期数的还款合计（本金 + 利息）。
+        ending_balance: 最后一期后的剩余本金（已还清为 0）。
+    """
+
+    months: int
+    final_payment: float
+    total_interest: float
+    total_payment: float
+    ending_balance: float
+
+
 @dataclass
 class RecurringExtraResult:
     paid_periods: int
@@ -128,8 +179,27 @@ class RecurringExtraResult:
     total_payment_with_recurring: float
     base_monthly_payment: float
     recurring_extra_payment: float
-    schedule_with_recurring: List[ScheduleRow]
-    base_schedule: List[ScheduleRow]
+    schedule_with_recurring: Schedule
+    base_schedule: Schedule
+
+
+@dataclass
+class ScheduleWindow:
+    """某一方案还款计划中连续的一段行（分页查询用），只计算这些行。
+
+    字段说明：
+        scenario: 方案（base 原方案剩余期 / reduced 减少月供 / shorten 缩短年限）。
+        paid_periods: 已还期数。
+        total_rows: 该方案整张表的行数。
+        offset: rows 第一行在整张表中的下标（0 起）；超出末尾时等于 total_rows。
+        rows: 这一段行，期数序号与 simulate 返回的对应计划一致（原方案接续已还期数，其余两方案从 1 开始）。
+    """
+
+    scenario: str
+    paid_periods: int
+    total_rows: int
+    offset: int
+    rows: Schedule
 
 
 def monthly_rate(annual_rate: float) -> float:
@@ -173,12 +243,32 @@ def compute_paid_periods(params: LoanParams, today: Optional[date] = None) -> in
     return min(max(months, 0), params.term_months)
 
 
-def build_schedule(principal: float, rate: float, months: int, method: str) -> List[ScheduleRow]:
+def _check_backend(backend: str) -> None:
+    if backend not in (BACKEND_PYTHON, BACKEND_NUMPY):
+        raise ValueError(f"unsupported schedule backend: {backend}")
+
+
+def build_schedule(
+    principal: float,
+    rate: float,
+    months: int,
+    method: str,
+    *,
+    backend: str = BACKEND_PYTHON,
+) -> Schedule:
     # 生成完整（或剩余）还款计划：支持等额本息 / 等额本金。
-    rows: List[ScheduleRow] = []
+    _check_backend(backend)
+    if backend == BACKEND_NUMPY:
+        if method == METHOD_EQUAL_PRINCIPAL:
+            return kernels.equal_principal_arrays(principal, rate, months)
+        if months <= 0 or principal <= 0:
+            return Schedule.empty()
+        return kernels.fixed_payment_arrays(principal, rate, annuity_payment(principal, rate, months), months)
+
+    rows = ScheduleBuilder()
     balance = principal
     if months <= 0 or principal <= 0:
-        return rows
+        return rows.build()
 
     # 等额本金：每月固定归还本金；利息按剩余本金计算，因此月供逐月递减
     if method == METHOD_EQUAL_PRINCIPAL:
@@ -188,8 +278,8 @@ def build_schedule(principal: float, rate: float, months: int, method: str) -> L
             principal_payment = min(principal_part, balance)
             payment = principal_payment + interest
             balance -= principal_payment
-            rows.append(ScheduleRow(i, payment, principal_payment, interest, balance))
-        return rows
+            rows.append(payment, principal_payment, interest, balance)
+        return rows.build()
 
     # 等额本息：月供固定；本金占比逐月上升、利息占比逐月下降
     payment = annuity_payment(principal, rate, months)
@@ -198,8 +288,23 @@ def build_schedule(principal: float, rate: float, months: int, method: str) -> L
         principal_payment = min(payment - interest, balance)
         payment_effective = principal_payment + interest
         balance -= principal_payment
-        rows.append(ScheduleRow(i, payment_effective, principal_payment, interest, balance))
-    return rows
+        rows.append(payment_effective, principal_payment, interest, balance)
+    return rows.build()
+
+
+def base_schedule(
+    principal: float,
+    rate: float,
+    months: int,
+    method: str,
+    *,
+    backend: str = BACKEND_PYTHON,
+) -> Schedule:
+    # build_schedule 的记忆化版本（进程内 LRU，见 cache 模块）：用于会被反复请求的基准计划。
+    # 返回的 Schedule 只读、可能被多个调用方共享。
+    method = normalize_method(method)
+    key = (float(principal), float(rate), int(months), method, backend)
+    return SCHEDULE_CACHE.get_or_create(key, lambda: build_schedule(principal, rate, months, method, backend=backend))
 
 
 def build_fixed_payment_schedule(
@@ -207,12 +312,18 @@ def build_fixed_payment_schedule(
     rate: float,
     payment: float,
     max_months: int,
-) -> List[ScheduleRow]:
+    *,
+    backend: str = BACKEND_PYTHON,
+) -> Schedule:
     # “缩短年限方案”：保持月供不变（payment 固定），倒推需要多少期还清（期限可变）。
-    rows: List[ScheduleRow] = []
+    _check_backend(backend)
+    if backend == BACKEND_NUMPY:
+        return kernels.fixed_payment_arrays(principal, rate, payment, max_months)
+
+    rows = ScheduleBuilder()
     balance = principal
     if principal <= 0 or payment <= 0:
-        return rows
+        return rows.build()
 
     for i in range(1, max_months + 1):
         interest = balance * rate
@@ -221,13 +332,15 @@ def build_fixed_payment_schedule(
         if principal_payment <= 0:
             break
 
-        principal_payment = min(principal_payment, balance)
+        if balance - principal_payment <= payment * _PAYOFF_EPS:
+            # 本期即可还清：剩余不足 _PAYOFF_EPS 期月供的浮点零头一并结清，期数与闭式解 / numpy 内核一致
+            principal_payment = balance
         payment_effective = principal_payment + interest
         balance -= principal_payment
-        rows.append(ScheduleRow(i, payment_effective, principal_payment, interest, balance))
+        rows.append(payment_effective, principal_payment, interest, balance)
         if balance <= 0:
             break
-    return rows
+    return rows.build()
 
 
 def build_recurring_extra_schedule(
@@ -237,12 +350,18 @@ def build_recurring_extra_schedule(
     extra_payment: float,
     max_months: int,
     extra_start_offset: int = 0,
-) -> List[ScheduleRow]:
+    *,
+    backend: str = BACKEND_PYTHON,
+) -> Schedule:
     # 在原月供基础上追加固定“定投”金额，直至还清。
-    rows: List[ScheduleRow] = []
+    _check_backend(backend)
+    if backend == BACKEND_NUMPY:
+        return kernels.recurring_extra_arrays(principal, rate, base_payment, extra_payment, max_months, extra_start_offset)
+
+    rows = ScheduleBuilder()
     balance = principal
     if principal <= 0 or (base_payment + extra_payment) <= 0:
-        return rows
+        return rows.build()
 
     for i in range(1, max_months + 1):
         interest = balance * rate
@@ -253,13 +372,15 @@ def build_recurring_extra_schedule(
             # 定投金额与月供之和不足覆盖利息，无法摊还
             raise ValueError("recurring payment too low to reduce principal")
 
-        principal_payment = min(principal_payment, balance)
+        if balance - principal_payment <= payment * _PAYOFF_EPS:
+            # 本期即可还清（含浮点零头），与闭式解 / numpy 内核的期数一致
+            principal_payment = balance
         payment_effective = principal_payment + interest
         balance -= principal_payment
-        rows.append(ScheduleRow(i, payment_effective, principal_payment, interest, balance))
+        rows.append(payment_effective, principal_payment, interest, balance)
         if balance <= 0:
             break
-    return rows
+    return rows.build()
 
 
 def build_annual_recurring_schedule(
@@ -269,12 +390,18 @@ def build_annual_recurring_schedule(
     extra_payment: float,
     max_months: int,
     first_extra_offset: int = 0,
-) -> List[ScheduleRow]:
+    *,
+    backend: str = BACKEND_PYTHON,
+) -> Schedule:
     # 按年追加固定“定投”金额：从第 first_extra_offset+1 期开始，每 12 期追加一次。
-    rows: List[ScheduleRow] = []
+    _check_backend(backend)
+    if backend == BACKEND_NUMPY:
+        return kernels.annual_recurring_arrays(principal, rate, base_payment, extra_payment, max_months, first_extra_offset)
+
+    rows = ScheduleBuilder()
     balance = principal
     if principal <= 0 or base_payment <= 0:
-        return rows
+        return rows.build()
 
     for i in range(1, max_months + 1):
         interest = balance * rate
@@ -285,49 +412,251 @@ def build_annual_recurring_schedule(
         if principal_payment <= 0:
             raise ValueError("recurring payment too low to reduce principal")
 
-        principal_payment = min(principal_payment, balance)
+        if balance - principal_payment <= payment * _PAYOFF_EPS:
+            # 本期即可还清（含浮点零头），与闭式解 / numpy 内核的期数一致
+            principal_payment = balance
         balance -= principal_payment
-        rows.append(ScheduleRow(i, principal_payment + interest, principal_payment, interest, balance))
+        rows.append(principal_payment + interest, principal_payment, interest, balance)
         if balance <= 0:
             break
-    return rows
+    return rows.build()
 
 
-def aggregate_interest_by_year(schedule: List[ScheduleRow]) -> Dict[int, float]:
+def aggregate_interest_by_year(schedule: Schedule) -> Dict[int, float]:
     # 按“贷款年度”汇总利息（第1年=1~12期，第2年=13~24期 ...）。
-    totals: Dict[int, float] = {}
-    for row in schedule:
-        year = (row.month_index - 1) // 12 + 1
-        totals[year] = totals.get(year, 0.0) + row.interest
-    return totals
+    if not len(schedule):
+        return {}
+    years = (schedule.month_index - 1) // 12 + 1
+    totals = np.bincount(years, weights=schedule.interest)
+    return {int(year): float(totals[year]) for year in np.unique(years)}
 
 
-def find_critical_point(schedule: List[ScheduleRow]) -> Tuple[Optional[int], Optional[str]]:
+def find_critical_point(schedule: Schedule) -> Tuple[Optional[int], Optional[str]]:
     # 临界点：
     # 1) 单月利息 < 单月本金（说明已进入“本金还款期”）
     # 2) 或者剩余总利息 / 剩余总还款 < 10%（说明后续利息占比极低）
-    if not schedule:
+    if not len(schedule):
+        return None, None
+
+    # “从第 i 期到最后一期”的利息与还款额后缀和（反向累加）
+    suffix_interest = np.cumsum(schedule.interest[::-1])[::-1]
+    suffix_payment = np.cumsum(schedule.payment[::-1])[::-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        remaining_ratio = np.where(suffix_payment != 0, suffix_interest / suffix_payment, 0.0)
+
+    below_principal = schedule.interest < schedule.principal
+    hits = np.flatnonzero(below_principal | (remaining_ratio < 0.10))
+    if not hits.size:
         return None, None
+    i = int(hits[0])
+    if below_principal[i]:
+        return schedule.start + i, "monthly_interest_below_principal"
+    return schedule.start + i, "remaining_interest_below_10_percent"
+
+
+# 判断“已还清”时的期数容差（闭式解与逐月循环共用）：避免浮点误差让恰好整期还清的贷款多出一期零头
+_PAYOFF_EPS = 1e-6
+
+
+def loan_state(principal: float, rate: float, months: int, method: str, k: int) -> LoanState:
+    # 常数时间求第 k 期后的剩余本金、累计利息与累计还款，不需要回放前 k 期。
+    # - 等额本息：余额 B_k = L(1+r)^k - P((1+r)^k - 1)/r，累计利息 = P*k - (L - B_k)
+    # - 等额本金：余额线性递减，累计利息为等差数列求和
+    # 结果按归一化后的输入记忆化（LOAN_STATE_CACHE），LoanState 不可变，可在请求与线程间安全共享。
+    if months <= 0 or principal <= 0:
+        return LoanState(0, 0.0, 0.0, 0.0)
+    k = min(max(k, 0), months)
+    key = (float(principal), float(rate), int(months), method, k)
+    return LOAN_STATE_CACHE.get_or_create(key, lambda: _loan_state(principal, rate, months, method, k))
+
+
+def _loan_state(principal: float, rate: float, months: int, method: str, k: int) -> LoanState:
+    if k == 0:
+        return LoanState(0, principal, 0.0, 0.0)
+
+    if method == METHOD_EQUAL_PRINCIPAL:
+        principal_part = principal / months
+        balance = 0.0 if k == months else max(principal - principal_part * k, 0.0)
+        interest = rate * (principal * k - principal_part * k * (k - 1) / 2.0)
+        return LoanState(k, balance, interest, (principal - balance) + interest)
+
+    payment = annuity_payment(principal, rate, months)
+    if k == months:
+        balance = 0.0
+    elif rate == 0:
+        balance = max(principal - payment * k, 0.0)
+    else:
+        factor = math.pow(1 + rate, k)
+        balance = max(principal * factor - payment * (factor - 1) / rate, 0.0)
+    paid = payment * k
+    return LoanState(k, balance, paid - (principal - balance), paid)
+
+
+def _first_payment(principal: float, rate: float, months: int, method: str) -> float:
+    # build_schedule(principal, rate, months, method) 第一期的月供。
+    if months <= 0 or principal <= 0:
+        return 0.0
+    if method == METHOD_EQUAL_PRINCIPAL:
+        return principal / months + principal * rate
+    return annuity_payment(principal, rate, months)
 
-    # 预先计算“从第 i 期到最后一期”的利息与还款额后缀和，方便 O(n) 判断
-    suffix_interest = [0.0] * (len(schedule) + 1)
-    suffix_payment = [0.0] * (len(schedule) + 1)
-    for i in range(len(schedule) - 1, -1, -1):
-        suffix_interest[i] = suffix_interest[i + 1] + schedule[i].interest
-        suffix_payment[i] = suffix_payment[i + 1] + schedule[i].payment
 
-    for i, row in enumerate(schedule):
-        if row.interest < row.principal:
-            return row.month_index, "monthly_interest_below_principal"
-        remaining_ratio = suffix_interest[i] / suffix_payment[i] if suffix_payment[i] else 0.0
-        if remaining_ratio < 0.10:
-            return row.month_index, "remaining_interest_below_10_percent"
-    return None, None
+def _schedule_interest(principal: float, rate: float, months: int, method: str) -> float:
+    # build_schedule(principal, rate, months, method) 的总利息（闭式解）。
+    if months <= 0 or principal <= 0:
+        return 0.0
+    if method == METHOD_EQUAL_PRINCIPAL:
+        # 等差数列：每期利息 = (principal - i * principal / months) * rate
+        return principal * rate * (months + 1) / 2.0
+    # 等额本息：总还款 - 本金
+    return annuity_payment(principal, rate, months) * months - principal
+
+
+def _fixed_payment_phase(balance: float, rate: float, payment: float, max_months: int) -> PayoffSummary:
+    # 固定月供最多还 max_months 期：期数由对数闭式解 n = -ln(1 - B*r/p) / ln(1+r) 向上取整得到。
+    # 调用方需保证首期月供能覆盖利息（payment > balance * rate）。
+    if rate == 0:
+        exact = balance / payment
+    else:
+        exact = -math.log(1 - balance * rate / payment) / math.log1p(rate)
+    needed = max(math.ceil(exact - _PAYOFF_EPS), 1)
+    months = min(needed, max_months)
+
+    # 前 months-1 期按整月供还款；若在上限内还清，最后一期结清全部剩余本息（吸收浮点残差）
+    if rate == 0:
+        balance_before_last = balance - payment * (months - 1)
+    else:
+        factor = math.pow(1 + rate, months - 1)
+        balance_before_last = balance * factor - payment * (factor - 1) / rate
+    due = balance_before_last * (1 + rate)
+    final_payment = due if needed <= max_months else min(payment, due)
+    ending_balance = max(due - final_payment, 0.0)
+    total_payment = payment * (months - 1) + final_payment
+    return PayoffSummary(months, final_payment, total_payment - (balance - ending_balance), total_payment, ending_balance)
+
+
+def solve_fixed_payment_payoff(principal: float, rate: float, payment: float, max_months: int) -> PayoffSummary:
+    # build_fixed_payment_schedule 的闭式版本：不逐月迭代即可得到还清期数、末期还款与总利息。
+    if principal <= 0 or payment <= 0 or max_months <= 0 or payment - principal * rate <= 0:
+        # 首期月供即覆盖不了利息时，循环版本同样不会产生任何行
+        return PayoffSummary(0, 0.0, 0.0, 0.0, max(principal, 0.0))
+    return _fixed_payment_phase(principal, rate, payment, max_months)
+
+
+def solve_recurring_extra_payoff(
+    principal: float,
+    rate: float,
+    base_payment: float,
+    extra_payment: float,
+    max_months: int,
+    extra_start_offset: int = 0,
+) -> PayoffSummary:
+    # build_recurring_extra_schedule 的闭式版本：前 extra_start_offset 期按原月供，之后按“原月供 + 定投”，
+    # 每一段都是固定月供，分别用闭式解推进。
+    if principal <= 0 or (base_payment + extra_payment) <= 0 or max_months <= 0:
+        return PayoffSummary(0, 0.0, 0.0, 0.0, max(principal, 0.0))
+
+    phases = []
+    if extra_start_offset > 0:
+        phases.append((base_payment, extra_start_offset))
+    phases.append((base_payment + extra_payment, max_months))
+
+    balance = principal
+    months = 0
+    total_interest = 0.0
+    total_payment = 0.0
+    final_payment = 0.0
+    for payment, count in phases:
+        count = min(count, max_months - months)
+        if count <= 0 or balance <= 0:
+            break
+        if payment - balance * rate <= 0:
+            # 定投金额与月供之和不足覆盖利息，无法摊还
+            raise ValueError("recurring payment too low to reduce principal")
+        phase = _fixed_payment_phase(balance, rate, payment, count)
+        months += phase.months
+        total_interest += phase.total_interest
+        total_payment += phase.total_payment
+        final_payment = phase.final_payment
+        balance = phase.ending_balance
+    return PayoffSummary(months, final_payment, total_interest, total_payment, balance)
+
+
+def solve_annual_recurring_payoff(
+    principal: float,
+    rate: float,
+    base_payment: float,
+    extra_payment: float,
+    max_months: int,
+    first_extra_offset: int = 0,
+) -> PayoffSummary:
+    # build_annual_recurring_schedule 的按年推进版本。
+    # 定投生效后每 12 期为一个周期：第 1 期还“月供 + 定投”，其余 11 期还月供。
+    # 周期内余额满足固定的仿射递推，整年可合成一步：B' = g^12 * B - c，其中 g = 1 + r，
+    # c = (p + e) * g^11 + p * (g^11 - 1) / r。整年还款额固定为 12p + e，利息 = 还款额 - 本金减少额。
+    # 只有还清所在的最后一年（或触及 max_months 的残年）才按月供分段求解，计算量与年数成正比。
+    if principal <= 0 or base_payment <= 0 or max_months <= 0:
+        return PayoffSummary(0, 0.0, 0.0, 0.0, max(principal, 0.0))
+
+    balance = principal
+    months = 0
+    total_interest = 0.0
+    total_payment = 0.0
+    final_payment = 0.0
+
+    def advance(payment: float, count: int) -> None:
+        nonlocal balance, months, total_interest, total_payment, final_payment
+        if payment - balance * rate <= 0:
+            raise ValueError("recurring payment too low to reduce principal")
+        phase = _fixed_payment_phase(balance, rate, payment, count)
+        months += phase.months
+        total_interest += phase.total_interest
+        total_payment += phase.total_payment
+        final_payment = phase.final_payment
+        balance = phase.ending_balance
+
+    # 首次定投之前：按原月供还款
+    if first_extra_offset > 0:
+        advance(base_payment, min(first_extra_offset, max_months))
+
+    growth = 1 + rate
+    g11 = math.pow(growth, 11)
+    year_factor = g11 * growth
+    year_offset = (base_payment + extra_payment) * g11 + (base_payment * (g11 - 1) / rate if rate else base_payment * 11)
+    year_payment = base_payment * 12 + extra_payment
+
+    while balance > 0 and months < max_months:
+        if (base_payment + extra_payment) - balance * rate <= 0:
+            raise ValueError("recurring payment too low to reduce principal")
+        next_balance = year_factor * balance - year_offset
+        if months + 12 <= max_months and next_balance > base_payment * _PAYOFF_EPS:
+            # 整年合成一步；余额单调下降，年末仍为正说明年内不会还清
+            if base_payment - (balance * growth - base_payment - extra_payment) * rate <= 0:
+                raise ValueError("recurring payment too low to reduce principal")
+            total_interest += year_payment - (balance - next_balance)
+            total_payment += year_payment
+            final_payment = base_payment
+            balance = next_balance
+            months += 12
+            continue
+
+        # 还清所在的最后一年（或残年）：定投月单独一期，其余按原月供分段求解
+        advance(base_payment + extra_payment, 1)
+        if balance > 0 and months < max_months:
+            advance(base_payment, min(11, max_months - months))
+        break
+
+    return PayoffSummary(months, final_payment, total_interest, total_payment, balance)
+
+
+def _remaining_base_schedule(balance: float, rate: float, remaining_months: int, method: str, paid_periods: int) -> Schedule:
+    # 基准方案剩余期明细：以剩余本金、剩余期数重新摊还（两种还款方式下与原计划一致），期数序号接续原计划。
+    return base_schedule(balance, rate, remaining_months, method).renumbered(paid_periods + 1)
 
 
 def simulate(params: LoanParams, prepayment: Prepayment, *, as_of_date: Optional[date] = None) -> SimulationResult:
     # 主流程：
-    # 1) 先生成基准方案完整还款表，并切出“剩余期”部分
+    # 1) 由常数时间的 loan_state 得到剩余本金，只生成基准方案“剩余期”部分
     # 2) 提前还款后得到 new_principal
     # 3) 方案A：减少月供（期限不变）=> 重新按剩余期数摊还
     # 4) 方案B：缩短年限（月供不变）=> 以原月供倒推剩余期数
@@ -345,9 +674,9 @@ def simulate(params: LoanParams, prepayment: Prepayment, *, as_of_date: Optional
             shorten_remaining_interest=0.0,
             savings_reduce=0.0,
             savings_shorten=0.0,
-            base_schedule=[],
-            reduced_schedule=[],
-            shorten_schedule=[],
+            base_schedule=Schedule.empty(),
+            reduced_schedule=Schedule.empty(),
+            shorten_schedule=Schedule.empty(),
             interest_by_year={},
             critical_month_index=None,
             critical_reason=None,
@@ -357,16 +686,8 @@ def simulate(params: LoanParams, prepayment: Prepayment, *, as_of_date: Optional
     rate = monthly_rate(params.annual_rate)
     paid_periods = compute_paid_periods(params, today=as_of_date)
 
-    base_schedule_full = build_schedule(params.principal, rate, params.term_months, method)
-    base_remaining = base_schedule_full[paid_periods:]
-    remaining_months = len(base_remaining)
-
-    if paid_periods <= 0:
-        remaining_principal = params.principal
-    else:
-        remaining_principal = base_schedule_full[paid_periods - 1].balance
-
-    original_monthly_payment = base_remaining[0].payment if base_remaining else 0.0
+    remaining_months = params.term_months - paid_periods
+    remaining_principal = loan_state(params.principal, rate, params.term_months, method, paid_periods).balance
 
     if remaining_months == 0 or remaining_principal <= 0:
         # 已还清或无剩余
@@ -382,14 +703,17 @@ def simulate(params: LoanParams, prepayment: Prepayment, *, as_of_date: Optional
             shorten_remaining_interest=0.0,
             savings_reduce=0.0,
             savings_shorten=0.0,
-            base_schedule=[],
-            reduced_schedule=[],
-            shorten_schedule=[],
+            base_schedule=Schedule.empty(),
+            reduced_schedule=Schedule.empty(),
+            shorten_schedule=Schedule.empty(),
             interest_by_year={},
             critical_month_index=None,
             critical_reason=None,
         )
 
+    base_remaining = _remaining_base_schedule(remaining_principal, rate, remaining_months, method, paid_periods)
+    original_monthly_payment = base_remaining[0].payment
+
     prepay_amount = min(prepayment.amount, remaining_principal)
     new_principal = max(remaining_principal - prepay_amount, 0.0)
 
@@ -404,9 +728,9 @@ def simulate(params: LoanParams, prepayment: Prepayment, *, as_of_date: Optional
     )
 
     # 计算三种方案“剩余总利息”
-    base_remaining_interest = sum(row.interest for row in base_remaining)
-    reduced_remaining_interest = sum(row.interest for row in reduced_schedule)
-    shorten_remaining_interest = sum(row.interest for row in shorten_schedule)
+    base_remaining_interest = base_remaining.total_interest()
+    reduced_remaining_interest = reduced_schedule.total_interest()
+    shorten_remaining_interest = shorten_schedule.total_interest()
 
     # 计算节省利息
     savings_reduce = base_remaining_interest - reduced_remaining_interest
@@ -437,8 +761,120 @@ def simulate(params: LoanParams, prepayment: Prepayment, *, as_of_date: Optional
     )
 
 
-def simulate_recurring_extra(params: LoanParams, recurring_extra: float, *, as_of_date: Optional[date] = None, start_offset_months: int = 0) -> RecurringExtraResult:
+def simulate_summary(params: LoanParams, prepayment: Prepayment, *, as_of_date: Optional[date] = None) -> SimulationSummary:
+    # simulate 的快速版本：只需要汇总数字（如 calc 接口）时使用，全程不生成明细表。
+    # 1) 剩余本金：等额本息用年金余额公式，等额本金用线性递减
+    # 2) 剩余利息：等额本息 = 月供 * 期数 - 本金；等额本金为等差数列求和
+    # 3) 缩短年限：固定月供下的还清期数用对数闭式解倒推
+    if params.principal <= 0 or params.term_months <= 0:
+        return SimulationSummary(0, 0, 0.0, 0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+    method = normalize_method(params.method)
+    rate = monthly_rate(params.annual_rate)
+    paid_periods = compute_paid_periods(params, today=as_of_date)
+
+    remaining_months = params.term_months - paid_periods
+    remaining_principal = loan_state(params.principal, rate, params.term_months, method, paid_periods).balance
+    if remaining_months <= 0 or remaining_principal <= 0:
+        return SimulationSummary(paid_periods, 0, 0.0, 0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+    # 剩余期的还款计划等价于“以剩余本金、剩余期数重新摊还”，两种还款方式均成立
+    original_monthly_payment = _first_payment(remaining_principal, rate, remaining_months, method)
+    base_remaining_interest = _schedule_interest(remaining_principal, rate, remaining_months, method)
+
+    prepay_amount = min(prepayment.amount, remaining_principal)
+    new_principal = max(remaining_principal - prepay_amount, 0.0)
+
+    reduced_monthly_payment = _first_payment(new_principal, rate, remaining_months, method)
+    reduced_remaining_interest = _schedule_interest(new_principal, rate, remaining_months, method)
+
+    shorten = solve_fixed_payment_payoff(
+        new_principal,
+        rate,
+        original_monthly_payment,
+        max_months=max(remaining_months, 1) * 2,
+    )
+    shorten_months = shorten.months
+    shorten_remaining_interest = shorten.total_interest
+
+    return SimulationSummary(
+        paid_periods=paid_periods,
+        remaining_months=remaining_months,
+        remaining_principal=remaining_principal,
+        original_monthly_payment=original_monthly_payment,
+        reduced_monthly_payment=reduced_monthly_payment,
+        shorten_months=shorten_months,
+        base_remaining_interest=base_remaining_interest,
+        reduced_remaining_interest=reduced_remaining_interest,
+        shorten_remaining_interest=shorten_remaining_interest,
+        savings_reduce=base_remaining_interest - reduced_remaining_interest,
+        savings_shorten=base_remaining_interest - shorten_remaining_interest,
+    )
+
+
+def schedule_window(
+    params: LoanParams,
+    prepayment: Prepayment,
+    scenario: str,
+    offset: int = 0,
+    limit: int = 120,
+    *,
+    years: Optional[Tuple[int, int]] = None,
+    as_of_date: Optional[date] = None,
+) -> ScheduleWindow:
+    # simulate 中某一方案计划的第 offset+1 ~ offset+limit 行：期初余额由闭式解直接求出，
+    # 耗时只与 limit 有关，不生成整张表。结果与 numpy 后端的整表切片逐位相同（与循环版本的误差约定见 kernels）。
+    # years=(起始年度, 结束年度) 时按贷款年度取行（第 y 年度为期数序号 12(y-1)+1 ~ 12y），忽略 offset/limit。
+    if scenario not in SCHEDULE_SCENARIOS:
+        raise ValueError(f"unknown scenario: {scenario}")
+    if offset < 0 or limit < 0:
+        raise ValueError("offset and limit cannot be negative")
+
+    paid_periods = 0
+    remaining_months = 0
+    remaining_principal = 0.0
+    if params.principal > 0 and params.term_months > 0:
+        method = normalize_method(params.method)
+        rate = monthly_rate(params.annual_rate)
+        paid_periods = compute_paid_periods(params, today=as_of_date)
+        remaining_months = params.term_months - paid_periods
+        remaining_principal = loan_state(params.principal, rate, params.term_months, method, paid_periods).balance
+
+    # 期数序号起点：原方案接续已还期数，其余两方案从 1 开始
+    start = paid_periods + 1 if scenario == "base" else 1
+    if years is not None:
+        year_from, year_to = years
+        offset = max((year_from - 1) * 12 + 1 - start, 0)
+        limit = max(year_to * 12 + 1 - start - offset, 0)
+
+    if remaining_months <= 0 or remaining_principal <= 0:
+        return ScheduleWindow(scenario, paid_periods, 0, 0, Schedule.empty(start=start))
+
+    new_principal = max(remaining_principal - min(prepayment.amount, remaining_principal), 0.0)
+    if scenario == "shorten":
+        payment = _first_payment(remaining_principal, rate, remaining_months, method)
+        rows, total = kernels.fixed_payment_rows(new_principal, rate, payment, max(remaining_months, 1) * 2, offset, limit)
+    else:
+        principal = remaining_principal if scenario == "base" else new_principal
+        if method == METHOD_EQUAL_PRINCIPAL:
+            rows, total = kernels.equal_principal_rows(principal, rate, remaining_months, offset, limit)
+        else:
+            payment = annuity_payment(principal, rate, remaining_months)
+            rows, total = kernels.fixed_payment_rows(principal, rate, payment, remaining_months, offset, limit)
+    offset = min(offset, total)
+    return ScheduleWindow(scenario, paid_periods, total, offset, rows.renumbered(start + offset))
+
+
+def simulate_recurring_extra(
+    params: LoanParams,
+    recurring_extra: float,
+    *,
+    as_of_date: Optional[date] = None,
+    start_offset_months: int = 0,
+    include_schedule: bool = True,
+) -> RecurringExtraResult:
     # 定投式提前还款：在原月供基础上追加固定金额，计算提早还清所需期数与节省利息。
+    # include_schedule=False 时不生成任何明细表（结果中的两张表为空），汇总数字全部由闭式解求得。
     if recurring_extra <= 0:
         raise ValueError("recurring_extra must be greater than 0")
     if start_offset_months < 0:
@@ -448,17 +884,14 @@ def simulate_recurring_extra(params: LoanParams, recurring_extra: float, *, as_o
     rate = monthly_rate(params.annual_rate)
     paid_periods = compute_paid_periods(params, today=as_of_date)
 
-    base_schedule_full = build_schedule(params.principal, rate, params.term_months, method)
-    base_remaining = base_schedule_full[paid_periods:]
-    remaining_months = len(base_remaining)
-    base_total_interest = sum(row.interest for row in base_schedule_full)
-    base_paid_interest = sum(row.interest for row in base_schedule_full[:paid_periods])
-    base_paid_payment = sum(row.payment for row in base_schedule_full[:paid_periods])
-
-    if paid_periods <= 0:
-        remaining_principal = params.principal
-    else:
-        remaining_principal = base_schedule_full[paid_periods - 1].balance if base_schedule_full else 0.0
+    # 已还部分与原计划全程的汇总都由 loan_state 直接求得，不回放历史
+    paid_state = loan_state(params.principal, rate, params.term_months, method, paid_periods)
+    full_state = loan_state(params.principal, rate, params.term_months, method, params.term_months)
+    remaining_months = params.term_months - paid_periods if params.principal > 0 else 0
+    remaining_principal = paid_state.balance
+    base_total_interest = full_state.cumulative_interest
+    base_paid_interest = paid_state.cumulative_interest
+    base_paid_payment = paid_state.cumulative_payment
 
     if remaining_months == 0 or remaining_principal <= 0:
         total_interest_with_recurring = base_paid_interest
@@ -474,30 +907,49 @@ def simulate_recurring_extra(params: LoanParams, recurring_extra: float, *, as_o
             total_payment_with_recurring=base_paid_payment,
             base_monthly_payment=0.0,
             recurring_extra_payment=recurring_extra,
-            schedule_with_recurring=[],
-            base_schedule=[],
+            schedule_with_recurring=Schedule.empty(),
+            base_schedule=Schedule.empty(),
         )
 
-    base_monthly_payment = base_remaining[0].payment if base_remaining else 0.0
-    schedule_with_recurring = build_recurring_extra_schedule(
-        remaining_principal,
-        rate,
-        base_monthly_payment,
-        recurring_extra,
-        max_months=max(remaining_months, 1) * 2,
-        extra_start_offset=start_offset_months,
-    )
+    base_monthly_payment = _first_payment(remaining_principal, rate, remaining_months, method)
+    base_remaining_interest = base_total_interest - base_paid_interest
+    max_months = max(remaining_months, 1) * 2
+
+    if include_schedule:
+        base_remaining = _remaining_base_schedule(remaining_principal, rate, remaining_months, method, paid_periods)
+        schedule_with_recurring = build_recurring_extra_schedule(
+            remaining_principal,
+            rate,
+            base_monthly_payment,
+            recurring_extra,
+            max_months=max_months,
+            extra_start_offset=start_offset_months,
+        )
+        months_with_recurring = len(schedule_with_recurring)
+        recurring_interest = schedule_with_recurring.total_interest()
+        recurring_payment = schedule_with_recurring.total_payment()
+    else:
+        base_remaining = schedule_with_recurring = Schedule.empty()
+        payoff = solve_recurring_extra_payoff(
+            remaining_principal,
+            rate,
+            base_monthly_payment,
+            recurring_extra,
+            max_months=max_months,
+            extra_start_offset=start_offset_months,
+        )
+        months_with_recurring = payoff.months
+        recurring_interest = payoff.total_interest
+        recurring_payment = payoff.total_payment
 
-    base_remaining_interest = sum(row.interest for row in base_remaining)
-    recurring_interest = sum(row.interest for row in schedule_with_recurring)
     total_interest_with_recurring = base_paid_interest + recurring_interest
     interest_savings = base_total_interest - total_interest_with_recurring
-    total_payment_with_recurring = base_paid_payment + sum(row.payment for row in schedule_with_recurring)
+    total_payment_with_recurring = base_paid_payment + recurring_payment
 
     return RecurringExtraResult(
         paid_periods=paid_periods,
         remaining_months=remaining_months,
-        months_with_recurring=len(schedule_with_recurring),
+        months_with_recurring=months_with_recurring,
         base_remaining_interest=base_remaining_interest,
         base_total_interest=base_total_interest,
         total_interest_with_recurring=total_interest_with_recurring,
@@ -517,8 +969,10 @@ def simulate_annual_recurring_extra(
     *,
     as_of_date: Optional[date] = None,
     months_until_first_extra: int = 0,
+    include_schedule: bool = True,
 ) -> RecurringExtraResult:
     # 年度定投式提前还款：每年固定月份/日期追加一次额外还款。
+    # include_schedule=False 时按年合成推进（solve_annual_recurring_payoff），不生成任何明细表。
     if annual_extra <= 0:
         raise ValueError("annual_extra must be greater than 0")
     if months_until_first_extra < 0:
@@ -528,14 +982,14 @@ def simulate_annual_recurring_extra(
     rate = monthly_rate(params.annual_rate)
     paid_periods = compute_paid_periods(params, today=as_of_date)
 
-    base_schedule_full = build_schedule(params.principal, rate, params.term_months, method)
-    base_remaining = base_schedule_full[paid_periods:]
-    remaining_months = len(base_remaining)
-    base_total_interest = sum(row.interest for row in base_schedule_full)
-    base_paid_interest = sum(row.interest for row in base_schedule_full[:paid_periods])
-    base_paid_payment = sum(row.payment for row in base_schedule_full[:paid_periods])
-
-    remaining_principal = params.principal if paid_periods <= 0 else (base_schedule_full[paid_periods - 1].balance if base_schedule_full else 0.0)
+    # 已还部分与原计划全程的汇总都由 loan_state 直接求得，不回放历史
+    paid_state = loan_state(params.principal, rate, params.term_months, method, paid_periods)
+    full_state = loan_state(params.principal, rate, params.term_months, method, params.term_months)
+    remaining_months = params.term_months - paid_periods if params.principal > 0 else 0
+    remaining_principal = paid_state.balance
+    base_total_interest = full_state.cumulative_interest
+    base_paid_interest = paid_state.cumulative_interest
+    base_paid_payment = paid_state.cumulative_payment
 
     if remaining_months == 0 or remaining_principal <= 0:
         total_interest_with_recurring = base_paid_interest
@@ -551,30 +1005,49 @@ def simulate_annual_recurring_extra(
             total_payment_with_recurring=base_paid_payment,
             base_monthly_payment=0.0,
             recurring_extra_payment=annual_extra,
-            schedule_with_recurring=[],
-            base_schedule=[],
+            schedule_with_recurring=Schedule.empty(),
+            base_schedule=Schedule.empty(),
         )
 
-    base_monthly_payment = base_remaining[0].payment if base_remaining else 0.0
-    schedule_with_recurring = build_annual_recurring_schedule(
-        remaining_principal,
-        rate,
-        base_monthly_payment,
-        annual_extra,
-        max_months=max(remaining_months, 1) * 3,
-        first_extra_offset=months_until_first_extra,
-    )
+    base_monthly_payment = _first_payment(remaining_principal, rate, remaining_months, method)
+    base_remaining_interest = base_total_interest - base_paid_interest
+    max_months = max(remaining_months, 1) * 3
+
+    if include_schedule:
+        base_remaining = _remaining_base_schedule(remaining_principal, rate, remaining_months, method, paid_periods)
+        schedule_with_recurring = build_annual_recurring_schedule(
+            remaining_principal,
+            rate,
+            base_monthly_payment,
+            annual_extra,
+            max_months=max_months,
+            first_extra_offset=months_until_first_extra,
+        )
+        months_with_recurring = len(schedule_with_recurring)
+        recurring_interest = schedule_with_recurring.total_interest()
+        recurring_payment = schedule_with_recurring.total_payment()
+    else:
+        base_remaining = schedule_with_recurring = Schedule.empty()
+        payoff = solve_annual_recurring_payoff(
+            remaining_principal,
+            rate,
+            base_monthly_payment,
+            annual_extra,
+            max_months=max_months,
+            first_extra_offset=months_until_first_extra,
+        )
+        months_with_recurring = payoff.months
+        recurring_interest = payoff.total_interest
+        recurring_payment = payoff.total_payment
 
-    base_remaining_interest = sum(row.interest for row in base_remaining)
-    recurring_interest = sum(row.interest for row in schedule_with_recurring)
     total_interest_with_recurring = base_paid_interest + recurring_interest
     interest_savings = base_total_interest - total_interest_with_recurring
-    total_payment_with_recurring = base_paid_payment + sum(row.payment for row in schedule_with_recurring)
+    total_payment_with_recurring = base_paid_payment + recurring_payment
 
     return RecurringExtraResult(
         paid_periods=paid_periods,
         remaining_months=remaining_months,
-        months_with_recurring=len(schedule_with_recurring),
+        months_with_recurring=months_with_recurring,
         base_remaining_interest=base_remaining_interest,
         base_total_interest=base_total_interest,
         total_interest_with_recurring=total_interest_with_recurring,
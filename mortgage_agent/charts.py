@@ -0,0 +1,252 @@
+"""PDF 报告中的还款走势图：曲线以 PDF 矢量路径绘制，绘制指令按计划哈希缓存。
+
+一张图分上下两部分：上方是三种方案的剩余本金曲线，下方三个小图分别是各方案每月的利息与本金。
+- 每条曲线先用 LTTB 降采样（见 downsample.py）：最多 CHART_MAX_POINTS 个点，且每 4 点（约 1.4mm）宽度最多一个点，
+  绘制指令（进而 PDF 内容流的压缩与 ASCII85 编码）的大小与计划期数无关；
+- 版式（坐标区位置、刻度格数）固定，数据缩放到取“整齐”步长的坐标范围，网格与边框与数据无关；
+- 网格、边框与全部曲线一次生成为 PDF 路径绘制指令（m / l / S 等），报告通过公开的 Canvas.addLiteral 写入，
+  不经过逐点的 PDFPathObject（每个点约 6 µs），也不栅格化、压缩图片；
+  按三份计划的内容哈希缓存在 CHART_CACHE，相同计划不再生成。
+刻度数字由报告按 ChartDrawing.axes 以 PDF 文字绘制，图例与单位由报告里的中文说明给出。
+
+环境变量：
+    REPORT_CHARTS            PDF 报告是否包含走势图（默认 1；设为 0 关闭）
+    CHART_MAX_POINTS         每条曲线降采样后的最多点数（默认 200，另受坐标区宽度限制；0 表示不降采样）
+    CHART_CACHE_MAX_ENTRIES  走势图缓存条数（默认 128，0 表示关闭）
+    CHART_CACHE_MAX_BYTES    走势图缓存总字节数上限（默认 16 MiB）
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+from dataclasses import dataclass
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+
+from mortgage_agent.cache import LRUCache
+from mortgage_agent.downsample import lttb_indices
+from mortgage_agent.schedule import Schedule
+
+
+REPORT_CHARTS = os.getenv("REPORT_CHARTS", "1").strip().lower() in ("1", "true", "yes", "on")
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "200"))
+
+# 图表尺寸（点，1/72 英寸）：宽度与报告版心一致（约 160mm），高度约 90mm
+CHART_SIZE = (6.3 * 72, 3.55 * 72)
+
+# 三种方案：(键, 中文名, 颜色)；颜色与报告配色一致
+SCENARIOS = (
+    ("base", "原方案", "#64748B"),
+    ("reduced", "减少月供", "#3B82F6"),
+    ("shorten", "缩短年限", "#10B981"),
+)
+
+# 图表版式变化时递增，避免命中旧版式的缓存
+_CHART_VERSION = 2
+
+# 网格与边框
+_GRID_COLOR = "#E2E8F0"
+_GRID_WIDTH = 0.6
+_FRAME_WIDTH = 0.8
+# 曲线线宽：上方剩余本金 / 下方小图；本金曲线用虚线
+_BALANCE_LINE_WIDTH = 1.4
+_SPLIT_LINE_WIDTH = 1.2
+_DASH = "[4.4 1.9] 0 d"
+# 曲线相邻两点的最小水平间距（点），决定每个坐标区最多保留多少个点
+_POINT_SPACING = 4.0
+
+# 坐标区版式（以图表宽高为 1 的比例）：上方一个通栏坐标区，下方三个并排小图
+_LEFT, _RIGHT, _TOP, _BOTTOM = 0.08, 0.985, 0.97, 0.08
+_ROW_GAP = 0.116
+_COL_GAP = 0.028
+_TOP_ROW_SHARE = 1.25 / 2.25
+
+
+@dataclass(frozen=True)
+class ChartAxes:
+    """一个坐标区在图表中的位置与刻度（刻度文字由 PDF 绘制）。
+
+    字段说明：
+        bounds: (x0, y0, 宽, 高)，以图表宽高为 1 的比例，原点在左下角。
+        x_ticks / y_ticks: ((坐标区内的比例位置, 刻度文字), ...)；共享纵轴的小图 y_ticks 为空。
+    """
+
+    bounds: Tuple[float, float, float, float]
+    x_ticks: Tuple[Tuple[float, str], ...]
+    y_ticks: Tuple[Tuple[float, str], ...]
+
+
+@dataclass(frozen=True)
+class ChartDrawing:
+    """生成好的走势图。
+
+    字段说明：
+        key: 缓存键（三份计划的内容哈希 + 生成参数）。
+        width / height: 图表尺寸（点）。
+        ops: PDF 内容流绘制指令（网格、边框与曲线，坐标以图表左下角为原点，单位为点），自带 q / Q。
+        axes: 各坐标区的位置与刻度（第一个为剩余本金，之后依次为三种方案的利息 / 本金小图）。
+    """
+
+    key: str
+    width: float
+    height: float
+    ops: str
+    axes: Tuple[ChartAxes, ...]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.ops)
+
+
+CHART_CACHE = LRUCache(
+    "chart",
+    max_entries=int(os.getenv("CHART_CACHE_MAX_ENTRIES", "128")),
+    max_bytes=int(os.getenv("CHART_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+)
+
+
+def chart_key(schedules: Sequence[Schedule]) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{_CHART_VERSION}:{CHART_MAX_POINTS}".encode())
+    for schedule in schedules:
+        h.update(schedule.digest().encode())
+    return h.hexdigest()
+
+
+# 坐标轴刻度格数固定（横轴 5 格、纵轴 4 格），网格线因此与数据无关
+_X_INTERVALS = 5
+_Y_INTERVALS = 4
+_NICE_STEPS = (1, 1.5, 2, 2.5, 3, 4, 5, 6, 8, 10)
+
+
+def _nice_step(top: float, intervals: int) -> float:
+    # 每格步长：{1, 1.5, 2, 2.5, ...} × 10^k 中使 步长 × 格数 ≥ top 的最小值
+    if top <= 0:
+        return 1.0
+    raw = top / intervals
+    base = 10 ** math.floor(math.log10(raw))
+    for m in _NICE_STEPS:
+        if m * base >= raw * (1 - 1e-9):
+            return m * base
+    return 10 * base
+
+
+def _ticks(step: float, intervals: int, fmt: Callable[[float], str]) -> Tuple[Tuple[float, str], ...]:
+    return tuple((i / intervals, fmt(i * step)) for i in range(intervals + 1))
+
+
+def _fmt_number(value: float) -> str:
+    return f"{round(value, 6):g}"
+
+
+def _fmt_wan(value: float) -> str:
+    return _fmt_number(value / 10000)
+
+
+def _fmt_yuan(value: float) -> str:
+    return f"{value:,.0f}"
+
+
+def _layout() -> Tuple[Tuple[float, float, float, float], ...]:
+    # (剩余本金, 小图 1, 小图 2, 小图 3) 的 bounds
+    span = _RIGHT - _LEFT
+    rows = _TOP - _BOTTOM - _ROW_GAP
+    top_height = rows * _TOP_ROW_SHARE
+    bottom_height = rows - top_height
+    col_width = (span - 2 * _COL_GAP) / 3
+    bounds = [(_LEFT, _TOP - top_height, span, top_height)]
+    for col in range(3):
+        bounds.append((_LEFT + col * (col_width + _COL_GAP), _BOTTOM, col_width, bottom_height))
+    return tuple(bounds)
+
+
+_BOUNDS = _layout()
+
+
+def _stroke_color(hex_color: str) -> str:
+    r, g, b = (int(hex_color[i:i + 2], 16) / 255 for i in (1, 3, 5))
+    return f"{r:.3f} {g:.3f} {b:.3f} RG"
+
+
+def _grid_ops() -> str:
+    # 网格与边框与数据无关，进程内只生成一次
+    width, height = CHART_SIZE
+    ops = [_stroke_color(_GRID_COLOR), f"{_GRID_WIDTH} w"]
+    for x0, y0, w, h in _BOUNDS:
+        left, bottom, right, top = x0 * width, y0 * height, (x0 + w) * width, (y0 + h) * height
+        for i in range(1, _X_INTERVALS):
+            x = left + (right - left) * i / _X_INTERVALS
+            ops.append(f"{x:.2f} {bottom:.2f} m {x:.2f} {top:.2f} l")
+        for i in range(1, _Y_INTERVALS):
+            y = bottom + (top - bottom) * i / _Y_INTERVALS
+            ops.append(f"{left:.2f} {y:.2f} m {right:.2f} {y:.2f} l")
+    ops.append("S")
+    ops.append(f"{_FRAME_WIDTH} w")
+    for x0, y0, w, h in _BOUNDS:
+        ops.append(f"{x0 * width:.2f} {y0 * height:.2f} {w * width:.2f} {h * height:.2f} re")
+    ops.append("S")
+    return "\n".join(ops)
+
+
+_GRID_OPS = _grid_ops()
+
+
+def _polyline(bounds: Tuple[float, float, float, float], x: np.ndarray, y: np.ndarray, x_top: float, y_top: float) -> str:
+    # 降采样后缩放到坐标区内（单位为点，保留 1 位小数），返回 m / l 路径指令
+    width, height = CHART_SIZE
+    x0, y0, w, h = bounds
+    threshold = min(CHART_MAX_POINTS, int(w * width / _POINT_SPACING)) if CHART_MAX_POINTS > 0 else 0
+    idx = lttb_indices(x, y, threshold)
+    px = (x0 + x[idx] / x_top * w) * width
+    py = (y0 + y[idx] / y_top * h) * height
+    points = [f"{a:.1f} {b:.1f}" for a, b in zip(px.tolist(), py.tolist())]
+    return points[0] + " m\n" + " l\n".join(points[1:]) + (" l" if len(points) > 1 else "")
+
+
+def render_chart(schedules: Sequence[Schedule], key: str = "") -> ChartDrawing:
+    """不经缓存生成一张走势图（schedules 依次为原方案、减少月供、缩短年限）。"""
+    longest = max((len(s) for s in schedules), default=0)
+    top_balance = 0.0
+    top_split = 0.0
+    for schedule in schedules:
+        if len(schedule):
+            top_balance = max(top_balance, float(schedule.balance[0] + schedule.principal[0]))
+            top_split = max(top_split, float(schedule.interest.max()), float(schedule.principal.max()))
+
+    # 横轴为距今年数（剩余期的第 1 期记为 1/12 年）；纵轴上方留出少量空白
+    x_step = _nice_step(max(longest, 1) / 12, _X_INTERVALS)
+    balance_step = _nice_step(top_balance * 1.02, _Y_INTERVALS)
+    split_step = _nice_step(top_split * 1.05, _Y_INTERVALS)
+    x_top = x_step * _X_INTERVALS
+
+    ops: List[str] = ["q", "1 j 1 J", _GRID_OPS]
+    for i, schedule in enumerate(schedules):
+        if not len(schedule):
+            continue
+        color = _stroke_color(SCENARIOS[i][2])
+        x = np.arange(1, len(schedule) + 1, dtype=np.float64) / 12
+        ops.append(f"{color} {_BALANCE_LINE_WIDTH} w")
+        ops.append(_polyline(_BOUNDS[0], x, schedule.balance, x_top, balance_step * _Y_INTERVALS) + " S")
+        ops.append(f"{_SPLIT_LINE_WIDTH} w")
+        ops.append(_polyline(_BOUNDS[i + 1], x, schedule.interest, x_top, split_step * _Y_INTERVALS) + " S")
+        ops.append(_DASH)
+        ops.append(_polyline(_BOUNDS[i + 1], x, schedule.principal, x_top, split_step * _Y_INTERVALS) + " S")
+        ops.append("[] 0 d")
+    ops.append("Q")
+
+    x_ticks = _ticks(x_step, _X_INTERVALS, _fmt_number)
+    axes = [ChartAxes(_BOUNDS[0], x_ticks, _ticks(balance_step, _Y_INTERVALS, _fmt_wan))]
+    for col, bounds in enumerate(_BOUNDS[1:]):
+        axes.append(ChartAxes(bounds, x_ticks, _ticks(split_step, _Y_INTERVALS, _fmt_yuan) if col == 0 else ()))
+    width, height = CHART_SIZE
+    return ChartDrawing(key=key or chart_key(schedules), width=width, height=height, ops="\n".join(ops), axes=tuple(axes))
+
+
+def amortization_chart(base: Schedule, reduced: Schedule, shorten: Schedule) -> ChartDrawing:
+    """三种方案的走势图，按计划内容哈希缓存。"""
+    schedules = (base, reduced, shorten)
+    key = chart_key(schedules)
+    return CHART_CACHE.get_or_create(key, lambda: render_chart(schedules, key))
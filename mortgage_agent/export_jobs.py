@@ -0,0 +1,362 @@
+"""异步导出任务：提交后立即返回任务号，后台生成 ZIP，客户端轮询状态后下载。
+
+同步导出接口在生成 PDF 时占用一个 worker 线程直到传输结束，慢客户端会把它拖满 Nginx 给的 60 秒。
+任务模式下请求只做校验与入队，生成在本进程的后台线程（数量有限）中完成，产物落盘到 artifact_dir，
+下载时直接以文件返回。
+
+任务状态存放在本地 SQLite 文件（与响应缓存一样，所有 uvicorn worker 共享）：
+    queued    已入队，等待任意一个 worker 的后台线程领取；
+    running   已被领取，lease_until 之前由领取者负责；
+    succeeded 产物已写入 artifact_dir，可下载；
+    failed    生成失败，error 为原因。
+领取是一条带条件的 UPDATE，多个 worker 不会重复执行同一任务。worker 重启后：
+排队中的任务由任意存活的 worker 继续领取；执行中的任务在租约到期后重新排队（最多 max_attempts 次）；
+正常停机时本进程领取的任务立即放回队列。
+已结束的任务（及其产物）在结束 ttl_seconds 后清理，清理由后台线程顺带完成。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_until REAL,
+    error TEXT,
+    artifact TEXT,
+    size INTEGER,
+    headers TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+"""
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# 后台线程空闲时轮询数据库的间隔（秒）；本进程提交的任务会立即唤醒，不必等待
+_POLL_SECONDS = 1.0
+# 两次过期清理之间的最小间隔（秒）
+_SWEEP_EVERY = 60.0
+
+# 任务处理函数：payload -> (ZIP 数据块序列, 响应头)
+JobHandler = Callable[[Dict[str, Any]], Tuple[Iterable[bytes], Dict[str, str]]]
+
+
+class JobQueueFull(RuntimeError):
+    """排队与执行中的任务数已达上限。"""
+
+
+@dataclass
+class ExportJob:
+    """一条导出任务记录。
+
+    字段说明：
+        job_id: 任务号。
+        kind: 任务类型（对应注册的处理函数）。
+        status: queued / running / succeeded / failed。
+        attempts: 已被领取执行的次数。
+        error: 失败原因。
+        path: 产物文件路径（succeeded 时）。
+        size: 产物字节数。
+        headers: 下载时返回的响应头（Content-Disposition、X-* 等）。
+        created_at / updated_at / finished_at: Unix 时间戳（秒）。
+    """
+
+    job_id: str
+    kind: str
+    status: str
+    attempts: int
+    error: Optional[str]
+    path: Optional[str]
+    size: Optional[int]
+    headers: Dict[str, str]
+    created_at: float
+    updated_at: float
+    finished_at: Optional[float]
+
+
+class ExportJobQueue:
+    """SQLite 持久化的导出任务队列 + 本进程的有界后台线程池。"""
+
+    def __init__(
+        self,
+        db_path: str,
+        artifact_dir: str,
+        *,
+        workers: int,
+        max_pending: int,
+        ttl_seconds: float,
+        lease_seconds: float,
+        max_attempts: int = 3,
+    ):
+        self.db_path = db_path
+        self.artifact_dir = artifact_dir
+        self.workers = max(workers, 0)
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, JobHandler] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._last_sweep = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.db_path) and self.workers > 0
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    def _connect(self) -> sqlite3.Connection:
+        # 每个线程一条连接（接口线程与后台线程都会访问）。
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # ---- 接口侧 ----
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> ExportJob:
+        if kind not in self._handlers:
+            raise ValueError(f"unknown export job kind: {kind}")
+        self.start()
+        conn = self._connect()
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchone()[0]
+            if pending >= self.max_pending:
+                raise JobQueueFull("too many pending export jobs")
+            conn.execute(
+                "INSERT INTO jobs (job_id, kind, payload, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload, separators=(",", ":"), ensure_ascii=False), QUEUED, now, now),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._wakeup.set()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        row = self._connect().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return ExportJob(
+            job_id=row["job_id"],
+            kind=row["kind"],
+            status=row["status"],
+            attempts=row["attempts"],
+            error=row["error"],
+            path=os.path.join(self.artifact_dir, row["artifact"]) if row["artifact"] else None,
+            size=row["size"],
+            headers=json.loads(row["headers"]) if row["headers"] else {},
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            finished_at=row["finished_at"],
+        )
+
+    def expires_at(self, job: ExportJob) -> Optional[float]:
+        return job.finished_at + self.ttl_seconds if job.finished_at is not None else None
+
+    # ---- 后台线程 ----
+
+    def start(self) -> None:
+        # 幂等；应用启动时调用一次，使重启后遗留的任务无需等到下一次提交就能继续执行。
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"export-job-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            threads, self._threads = self._threads, []
+        if not threads:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        for thread in threads:
+            thread.join(timeout)
+        # 仍在执行的任务放回队列，由其它 worker 或重启后的本 worker 继续
+        try:
+            self._connect().execute(
+                "UPDATE jobs SET status = ?, owner = NULL, lease_until = NULL, updated_at = ? WHERE status = ? AND owner = ?",
+                (QUEUED, time.time(), RUNNING, self.owner),
+            )
+        except (sqlite3.Error, OSError):
+            pass
+
+    def _worker(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._maybe_sweep()
+                job = self._claim()
+            except Exception:  # noqa: BLE001 - 数据库或目录暂不可用时稍后重试，不能让后台线程退出
+                logger.exception("export job queue: failed to claim a job")
+                job = None
+            if job is None:
+                self._wakeup.wait(_POLL_SECONDS)
+                self._wakeup.clear()
+                continue
+            self._run(*job)
+
+    def _claim(self) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT job_id, kind, payload FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (QUEUED,),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, owner = ?, lease_until = ?, attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                    (RUNNING, self.owner, now + self.lease_seconds, now, row["job_id"]),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return row["job_id"], row["kind"], json.loads(row["payload"])
+
+    def _run(self, job_id: str, kind: str, payload: Dict[str, Any]) -> None:
+        artifact = f"{job_id}.zip"
+        tmp_path = None
+        chunks = None
+        try:
+            handler = self._handlers.get(kind)
+            if handler is None:
+                raise ValueError(f"unknown export job kind: {kind}")
+            # 先准备好产物文件再调用处理函数：处理函数返回的生成器一旦拿到就立即开始消费，
+            # 否则未启动的生成器不会执行它的清理逻辑（如放行等待中的相同请求）
+            os.makedirs(self.artifact_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.artifact_dir, prefix=".tmp-")
+            size = 0
+            with os.fdopen(fd, "wb") as f:
+                chunks, headers = handler(payload)
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(tmp_path, os.path.join(self.artifact_dir, artifact))
+            tmp_path = None
+        except Exception as e:  # noqa: BLE001 - 任何失败都记录到任务上，不能让后台线程退出
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                # 中途失败：立即结束生成器，执行其清理逻辑
+                close()
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            self._finish(job_id, FAILED, error=str(e) or type(e).__name__)
+            return
+        self._finish(job_id, SUCCEEDED, artifact=artifact, size=size, headers=headers)
+
+    def _finish(self, job_id: str, status: str, *, error: Optional[str] = None, artifact: Optional[str] = None,
+                size: Optional[int] = None, headers: Optional[Dict[str, str]] = None) -> None:
+        now = time.time()
+        try:
+            # 只有仍持有该任务时才写结果（租约过期后任务可能已被别的 worker 重新领取）
+            self._connect().execute(
+                "UPDATE jobs SET status = ?, error = ?, artifact = ?, size = ?, headers = ?, owner = NULL, "
+                "lease_until = NULL, updated_at = ?, finished_at = ? WHERE job_id = ? AND owner = ?",
+                (
+                    status,
+                    error,
+                    artifact,
+                    size,
+                    json.dumps(headers, ensure_ascii=False) if headers is not None else None,
+                    now,
+                    now,
+                    job_id,
+                    self.owner,
+                ),
+            )
+        except (sqlite3.Error, OSError):
+            pass
+
+    def _maybe_sweep(self) -> None:
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep < _SWEEP_EVERY:
+                return
+            self._last_sweep = now
+        self.sweep(now)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """租约过期的任务重新排队（超过重试次数则标记失败），清理过期的已结束任务，返回删除的任务数。"""
+        now = time.time() if now is None else now
+        conn = self._connect()
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = 'worker lost', owner = NULL, lease_until = NULL, updated_at = ?, finished_at = ? "
+            "WHERE status = ? AND lease_until < ? AND attempts >= ?",
+            (FAILED, now, now, RUNNING, now, self.max_attempts),
+        )
+        requeued = conn.execute(
+            "UPDATE jobs SET status = ?, owner = NULL, lease_until = NULL, updated_at = ? WHERE status = ? AND lease_until < ?",
+            (QUEUED, now, RUNNING, now),
+        ).rowcount
+        if requeued:
+            self._wakeup.set()
+        expired = conn.execute(
+            "SELECT job_id, artifact FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+            (SUCCEEDED, FAILED, now - self.ttl_seconds),
+        ).fetchall()
+        for row in expired:
+            if row["artifact"]:
+                try:
+                    os.remove(os.path.join(self.artifact_dir, row["artifact"]))
+                except OSError:
+                    pass
+            conn.execute("DELETE FROM jobs WHERE job_id = ?", (row["job_id"],))
+        return len(expired)
@@ -0,0 +1,247 @@
+"""导出文件（ZIP）的本地磁盘缓存，按内容寻址。
+
+同一请求体（同一计算日期）导出的文件完全相同：用户重复点击下载、分享链接都会命中。
+键由调用方给出（规范化请求的 SHA-256，见 response_cache.request_key），文件布局：
+    <root>/<key[:2]>/<key>.bin    导出文件本身
+    <root>/<key[:2]>/<key>.json   响应头等元数据（media_type、Content-Disposition、X-* 头）
+
+写入先落到同目录下的临时文件再 os.replace，多个 worker 同时写同一个键也不会读到半个文件；
+元数据文件最后写入，读取时以它存在为准。流式导出用 open_writer 边生成边落盘，生成完整后才提交。
+容量按总字节数限制，超出时按文件修改时间（命中时会刷新）淘汰最久未用的条目，即近似 LRU。
+每个进程维护一份总字节数的估计，写入时累加，只有估计超限或距上次扫描超过 _RESCAN_SECONDS
+（以纳入其它 worker 的写入）时才遍历目录；淘汰删到上限的 _EVICT_LOW_WATER，之后一段时间的写入不必再扫描。
+扫描时顺带删除超过 _STALE_TMP_SECONDS 的 .tmp-* 文件（进程被杀、流式下载中断留下的半成品）。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+# 淘汰时删到上限的这一比例，之后约 10% 容量的写入都不必再扫描目录
+_EVICT_LOW_WATER = 0.9
+
+# 本进程估计未超限时，全量扫描的最长间隔（秒）
+_RESCAN_SECONDS = 300.0
+
+# 临时文件超过这么久（秒）仍未提交，视为中断写入的残留
+_STALE_TMP_SECONDS = 3600.0
+
+
+@dataclass
+class StoredExport:
+    """磁盘上的一份导出文件。
+
+    字段说明：
+        path: 文件绝对路径。
+        size: 文件字节数。
+        media_type: 响应的 Content-Type。
+        headers: 需要原样返回的响应头（Content-Disposition、X-Savings-* 等）。
+    """
+
+    path: str
+    size: int
+    media_type: str
+    headers: Dict[str, str]
+
+
+class ExportStore:
+    """按内容寻址、总字节数有上限的导出文件缓存。"""
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._evict_lock = threading.Lock()
+        self._total: Optional[int] = None  # 总字节数估计，None 表示尚未扫描
+        self._scanned_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.root) and self.max_bytes > 0
+
+    def _paths(self, key: str):
+        directory = os.path.join(self.root, key[:2])
+        return directory, os.path.join(directory, f"{key}.bin"), os.path.join(directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[StoredExport]:
+        if not self.enabled:
+            return None
+        _, data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            size = os.path.getsize(data_path)
+            # 刷新修改时间，作为 LRU 淘汰依据
+            os.utime(data_path)
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            return None
+        return StoredExport(data_path, size, meta["media_type"], meta["headers"])
+
+    def put(self, key: str, data: bytes, *, media_type: str, headers: Dict[str, str]) -> Optional[StoredExport]:
+        # 写入失败（磁盘满、目录不可写等）时返回 None，调用方照常返回内存中的结果。
+        if not self.enabled or len(data) > self.max_bytes:
+            return None
+        directory, data_path, meta_path = self._paths(key)
+        meta = json.dumps({"media_type": media_type, "headers": headers}, ensure_ascii=False).encode("utf-8")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            replaced = _file_size(data_path)
+            _atomic_write(data_path, data)
+            _atomic_write(meta_path, meta)
+        except OSError:
+            return None
+        self._record(len(data), replaced)
+        return StoredExport(data_path, len(data), media_type, dict(headers))
+
+    def open_writer(self, key: str, *, media_type: str, headers: Dict[str, str]) -> Optional["PendingExport"]:
+        # 流式写入：逐块 write，全部成功后 commit；中途失败或超出容量则 discard。无法写盘时返回 None。
+        if not self.enabled:
+            return None
+        directory, data_path, meta_path = self._paths(key)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        except OSError:
+            return None
+        return PendingExport(self, os.fdopen(fd, "wb"), tmp_path, data_path, meta_path, media_type, dict(headers))
+
+    def _record(self, size: int, replaced: int) -> None:
+        # 新提交了 size 字节（覆盖了 replaced 字节的旧文件）：更新估计，必要时淘汰。
+        with self._evict_lock:
+            if self._total is not None:
+                self._total += size - replaced
+        self.evict()
+
+    def evict(self, *, force: bool = False) -> int:
+        # 总字节数超过上限时按修改时间从旧到新删除到上限的 _EVICT_LOW_WATER，返回删除的条目数。
+        # 估计未超限且最近扫描过时直接返回；force=True 时总是扫描。
+        if not self.enabled:
+            return 0
+        with self._evict_lock:
+            now = time.monotonic()
+            fresh = now - self._scanned_at < _RESCAN_SECONDS
+            if not force and self._total is not None and self._total <= self.max_bytes and fresh:
+                return 0
+            entries, total = self._scan()
+            self._scanned_at = now
+            removed = 0
+            if total > self.max_bytes:
+                target = self.max_bytes * _EVICT_LOW_WATER
+                for _, size, path in sorted(entries):
+                    if total <= target:
+                        break
+                    for victim in (path[: -len(".bin")] + ".json", path):
+                        try:
+                            os.remove(victim)
+                        except OSError:
+                            pass
+                    total -= size
+                    removed += 1
+            self._total = total
+            return removed
+
+    def _scan(self) -> Tuple[List[Tuple[float, int, str]], int]:
+        # 遍历目录：返回 [(修改时间, 字节数, .bin 路径)] 与总字节数，并删除过期的临时文件。
+        entries = []
+        total = 0
+        stale_before = time.time() - _STALE_TMP_SECONDS
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                is_tmp = name.startswith(".tmp-")
+                if not is_tmp and not name.endswith(".bin"):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    st = os.stat(path)
+                    if is_tmp:
+                        if st.st_mtime < stale_before:
+                            os.remove(path)
+                        continue
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        return entries, total
+
+
+class PendingExport:
+    """正在写入的导出文件（由 ExportStore.open_writer 创建）。"""
+
+    def __init__(self, store: ExportStore, fileobj, tmp_path: str, data_path: str, meta_path: str, media_type: str, headers: Dict[str, str]):
+        self._store = store
+        self._file = fileobj
+        self._tmp_path = tmp_path
+        self._data_path = data_path
+        self._meta_path = meta_path
+        self._media_type = media_type
+        self._headers = headers
+        self._size = 0
+        self._failed = False
+
+    def write(self, chunk: bytes) -> None:
+        # 写盘失败或超出容量后不再写入，commit 时自动放弃（不影响响应本身）。
+        if self._failed:
+            return
+        self._size += len(chunk)
+        if self._size > self._store.max_bytes:
+            self._failed = True
+            return
+        try:
+            self._file.write(chunk)
+        except OSError:
+            self._failed = True
+
+    def commit(self) -> Optional[StoredExport]:
+        if self._failed:
+            self.discard()
+            return None
+        try:
+            self._file.close()
+            replaced = _file_size(self._data_path)
+            os.replace(self._tmp_path, self._data_path)
+            meta = json.dumps({"media_type": self._media_type, "headers": self._headers}, ensure_ascii=False).encode("utf-8")
+            _atomic_write(self._meta_path, meta)
+        except OSError:
+            self.discard()
+            return None
+        self._store._record(self._size, replaced)
+        return StoredExport(self._data_path, self._size, self._media_type, self._headers)
+
+    def discard(self) -> None:
+        self._failed = True
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
@@ -0,0 +1,236 @@
+"""导出渲染入口：还款明细 Excel（快速写出 / openpyxl 兜底）与 PDF 报告。
+
+这些函数只依赖 Schedule、不依赖 Web 层，既可以在请求线程里直接调用，
+也可以交给 render_pool 的子进程执行。
+openpyxl 与 reportlab（含中文字体注册）只在第一次真正用到时才导入，
+只处理计算接口的 worker 不承担这部分启动时间和内存。
+"""
+
+from __future__ import annotations
+
+import os
+from io import BytesIO
+from typing import Sequence, Tuple
+
+from mortgage_agent.schedule import Schedule
+from mortgage_agent.xlsx import combined_schedule_xlsx, multi_schedule_xlsx, schedule_xlsx
+
+
+# Excel 写出方式：fast 为直接拼接 XML 的快速版本（默认），openpyxl 为原实现（兼容兜底）
+XLSX_WRITER = os.getenv("XLSX_WRITER", "fast").strip().lower()
+
+
+def schedule_to_xlsx(schedule: Schedule) -> bytes:
+    """将还款计划导出为 Excel（xlsx），返回二进制。"""
+    if XLSX_WRITER == "openpyxl":
+        return schedule_to_xlsx_openpyxl(schedule)
+    return schedule_xlsx(schedule)
+
+
+def schedule_to_xlsx_openpyxl(schedule: Schedule) -> bytes:
+    """openpyxl 版本：逐个单元格设置样式（与 xlsx.schedule_xlsx 输出版式相同）。"""
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Schedule"
+
+    headers = ["期数", "月供", "本金", "利息", "余额", "利息占比"]
+    ws.append(headers)
+
+    header_font = Font(bold=True, name="Arial", size=11, color="FFFFFF")
+    body_font = Font(name="Arial", size=10)
+    header_fill = PatternFill("solid", fgColor="0F172A")
+    alt_fill = PatternFill("solid", fgColor="F8FAFC")
+    border = Border(bottom=Side(style="thin", color="E2E8F0"))
+    align_right = Alignment(horizontal="right")
+    align_center = Alignment(horizontal="center")
+
+    for cell in ws[1]:
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = align_center
+
+    for idx, row in enumerate(schedule, start=2):
+        ratio = (row.interest / row.payment) if row.payment else 0.0
+        ws.append([
+            row.month_index,
+            round(row.payment, 2),
+            round(row.principal, 2),
+            round(row.interest, 2),
+            round(row.balance, 2),
+            f"{ratio*100:.2f}%",
+        ])
+        for col_idx in range(1, 7):
+            cell = ws.cell(row=idx, column=col_idx)
+            cell.font = body_font
+            cell.alignment = align_right if col_idx > 1 else align_center
+            if idx % 2 == 0:
+                cell.fill = alt_fill
+            cell.border = border
+        # 利息占比<50% 标红
+        ratio_cell = ws.cell(row=idx, column=6)
+        if ratio < 0.5:
+            ratio_cell.font = Font(name="Arial", size=10, color="EF4444")
+
+    # 列宽
+    widths = [8, 14, 14, 14, 16, 12]
+    for i, w in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = w
+
+    buf = BytesIO()
+    wb.save(buf)
+    buf.seek(0)
+    return buf.getvalue()
+
+
+def report_pdf(**kwargs) -> bytes:
+    """生成 PDF 分析报告（参数同 report.generate_pdf），首次调用时才加载 reportlab。"""
+    from mortgage_agent.report import generate_pdf
+
+    return generate_pdf(**kwargs)
+
+
+def schedules_to_xlsx(schedules: Sequence[Tuple[str, Schedule]]) -> bytes:
+    """多份还款计划合并为一个工作簿（每份一个工作表）。"""
+    return multi_schedule_xlsx(schedules)
+
+
+def combined_schedule_to_xlsx(
+    combined: Schedule,
+    commercial_schedule: Schedule,
+    fund_schedule: Schedule,
+    include_commercial: bool,
+    include_fund: bool,
+) -> bytes:
+    """组合贷专用：动态输出商贷/公积金列，含各自利息占比与总利息占比。"""
+    if XLSX_WRITER == "openpyxl":
+        return combined_schedule_to_xlsx_openpyxl(
+            combined,
+            commercial_schedule,
+            fund_schedule,
+            include_commercial=include_commercial,
+            include_fund=include_fund,
+        )
+    return combined_schedule_xlsx(
+        combined,
+        commercial_schedule,
+        fund_schedule,
+        include_commercial=include_commercial,
+        include_fund=include_fund,
+    )
+
+
+def combined_schedule_to_xlsx_openpyxl(
+    combined: Schedule,
+    commercial_schedule: Schedule,
+    fund_schedule: Schedule,
+    include_commercial: bool,
+    include_fund: bool,
+) -> bytes:
+    """openpyxl 版本（与 xlsx.combined_schedule_xlsx 输出版式相同）。"""
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Combined"
+
+    headers = ["期数", "月供总额"]
+    if include_commercial:
+        headers += [
+            "商贷月供总额",
+            "商贷本金",
+            "商贷利息",
+            "商贷余额",
+            "商贷利息占比",
+        ]
+    if include_fund:
+        headers += [
+            "公积金月供总额",
+            "公积金本金",
+            "公积金利息",
+            "公积金余额",
+            "公积金利息占比",
+        ]
+    headers.append("利息总占比")
+    ws.append(headers)
+
+    header_font = Font(bold=True, name="Arial", size=11, color="FFFFFF")
+    body_font = Font(name="Arial", size=10)
+    header_fill_base = PatternFill("solid", fgColor="0F172A")
+    header_fill_commercial = PatternFill("solid", fgColor="1D4ED8")
+    header_fill_fund = PatternFill("solid", fgColor="047857")
+    body_fill_commercial = PatternFill("solid", fgColor="EFF6FF")
+    body_fill_fund = PatternFill("solid", fgColor="ECFDF3")
+    alt_fill = PatternFill("solid", fgColor="F8FAFC")
+    border = Border(bottom=Side(style="thin", color="E2E8F0"))
+    align_right = Alignment(horizontal="right")
+    align_center = Alignment(horizontal="center")
+
+    commercial_cols = [idx for idx, h in enumerate(headers, start=1) if h.startswith("商贷")]
+    fund_cols = [idx for idx, h in enumerate(headers, start=1) if h.startswith("公积金")]
+
+    for idx, cell in enumerate(ws[1], start=1):
+        cell.font = header_font
+        if idx in commercial_cols:
+            cell.fill = header_fill_commercial
+        elif idx in fund_cols:
+            cell.fill = header_fill_fund
+        else:
+            cell.fill = header_fill_base
+        cell.alignment = align_center
+
+    for idx, (combined_row, c, f) in enumerate(zip(combined, commercial_schedule.pad_to(len(combined)), fund_schedule.pad_to(len(combined)))):
+        row_values = [
+            combined_row.month_index,
+            round(combined_row.payment, 2),
+        ]
+
+        if include_commercial:
+            c_ratio = (c.interest / c.payment * 100) if c.payment else 0.0
+            row_values += [
+                round(c.payment, 2),
+                round(c.principal, 2),
+                round(c.interest, 2),
+                round(c.balance, 2),
+                f"{c_ratio:.2f}%",
+            ]
+
+        if include_fund:
+            f_ratio = (f.interest / f.payment * 100) if f.payment else 0.0
+            row_values += [
+                round(f.payment, 2),
+                round(f.principal, 2),
+                round(f.interest, 2),
+                round(f.balance, 2),
+                f"{f_ratio:.2f}%",
+            ]
+
+        total_ratio = (combined_row.interest / combined_row.payment * 100) if combined_row.payment else 0.0
+        row_values.append(f"{total_ratio:.2f}%")
+
+        ws.append(row_values)
+
+        for col_idx in range(1, len(row_values) + 1):
+            cell = ws.cell(row=idx + 2, column=col_idx)
+            cell.font = body_font
+            cell.alignment = align_right if col_idx > 1 else align_center
+            if col_idx in commercial_cols:
+                cell.fill = body_fill_commercial
+            elif col_idx in fund_cols:
+                cell.fill = body_fill_fund
+            elif (idx + 2) % 2 == 0:
+                cell.fill = alt_fill
+            cell.border = border
+
+    for i in range(1, len(headers) + 1):
+        ws.column_dimensions[get_column_letter(i)].width = 14
+
+    buf = BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
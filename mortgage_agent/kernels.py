@@ -0,0 +1,215 @@
+"""还款计划的 NumPy 向量化内核。
+
+calculator.build_* 系列函数在 backend="numpy" 时调用这里的实现，结果直接以 Schedule 列存储返回：
+- 等额本金：本金、余额都是等差数列，整张表一次性生成，没有任何循环；
+- 固定月供（等额本息 / 缩短年限 / 定投）：余额按年金闭式解
+  B_j = B_0 * (1+r)^j - p * ((1+r)^j - 1) / r 整段生成，
+  还清期数用对数闭式解求出，只有“月供发生变化”的分段才需要 Python 层循环
+  （按年定投为每年两段，按月定投最多两段）；
+- 同样由于闭式解，表中任意连续一段行可以单独求出（equal_principal_rows / fixed_payment_rows），
+  结果与整表切片逐位相同，分页查询只计算所请求的行。
+
+精度约定（与逐月循环版本逐行比较）：
+    各列绝对误差不超过 ARRAY_BACKEND_RTOL * principal（常规房贷参数下远小于 0.01 元）。
+    固定月供类的表在“恰好整期还清”时，两者都把不足 _PAYOFF_EPS 期月供的浮点零头并入最后一期，行数一致；
+    期数固定的等额本息 / 等额本金表由向量化版本把末期余额置 0，循环版本保留该零头。
+"""
+
+from __future__ import annotations
+
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+from mortgage_agent.schedule import Schedule
+
+
+# 与逐月循环结果比较时的相对误差上限（相对于贷款本金）
+ARRAY_BACKEND_RTOL = 1e-9
+
+# 闭式解判断“已还清”时的期数容差，与 calculator._PAYOFF_EPS 保持一致
+_PAYOFF_EPS = 1e-6
+
+
+def _assemble(blocks: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]) -> Schedule:
+    # 把若干分段（payment, principal, interest, balance）拼成一张完整的表。
+    if not blocks:
+        return Schedule.empty()
+    if len(blocks) == 1:
+        return Schedule(*blocks[0])
+    return Schedule(*(np.concatenate(cols) for cols in zip(*blocks)))
+
+
+def _payoff_months(balance: float, rate: float, payment: float) -> float:
+    # 固定月供下还清 balance 所需的（非整数）期数；月供覆盖不了利息时返回 inf。
+    if payment - balance * rate <= 0:
+        return math.inf
+    if rate == 0:
+        return balance / payment
+    return -math.log(1 - balance * rate / payment) / math.log1p(rate)
+
+
+def _fixed_payment_count(balance: float, rate: float, payment: float, max_months: int) -> Tuple[int, bool]:
+    # 固定月供最多还 max_months 期时的实际期数，以及是否在上限内还清。
+    exact = _payoff_months(balance, rate, payment)
+    if math.isinf(exact):
+        return max_months, False
+    needed = max(math.ceil(exact - _PAYOFF_EPS), 1)
+    return min(needed, max_months), needed <= max_months
+
+
+def _fixed_payment_window(
+    balance: float,
+    rate: float,
+    payment: float,
+    count: int,
+    paid_off: bool,
+    lo: int,
+    hi: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # 固定月供分段中第 lo+1 ~ hi 期（0 <= lo <= hi <= count）的四列：期初余额由闭式解直接求出，与前面的行无关。
+    j = np.arange(lo, hi, dtype=np.float64)  # 第 j+1 期期初已经过的期数
+    if rate == 0:
+        before = balance - payment * j
+    else:
+        growth = np.power(1.0 + rate, j)
+        before = balance * growth - payment * (growth - 1.0) / rate
+    interest = before * rate
+    principal = np.minimum(payment - interest, before)
+    if paid_off and hi == count and hi > lo:
+        # 最后一期结清全部剩余本金（吸收浮点残差）
+        principal[-1] = before[-1]
+    after = before - principal
+    return principal + interest, principal, interest, after
+
+
+def _fixed_payment_block(
+    balance: float,
+    rate: float,
+    payment: float,
+    max_months: int,
+) -> Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], float]:
+    # 固定月供分段：最多 max_months 期，提前还清则截断。返回（四列数组, 分段末余额）。
+    count, paid_off = _fixed_payment_count(balance, rate, payment, max_months)
+    cols = _fixed_payment_window(balance, rate, payment, count, paid_off, 0, count)
+    ending = float(cols[3][-1]) if count else balance
+    return cols, ending
+
+
+def _equal_principal_window(
+    principal: float,
+    rate: float,
+    months: int,
+    lo: int,
+    hi: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # 等额本金第 lo+1 ~ hi 期（0 <= lo <= hi <= months）的四列：本金与余额都是等差数列。
+    principal_part = principal / months
+    k = np.arange(lo, hi, dtype=np.float64)
+    before = principal - principal_part * k
+    interest = before * rate
+    principal_col = np.minimum(np.full(hi - lo, principal_part), before)
+    balance = np.maximum(before - principal_col, 0.0)
+    if hi == months and hi > lo:
+        balance[-1] = 0.0
+    return principal_col + interest, principal_col, interest, balance
+
+
+def equal_principal_arrays(principal: float, rate: float, months: int) -> Schedule:
+    # 等额本金：每期本金固定，余额与利息均为等差数列，无需循环。
+    if months <= 0 or principal <= 0:
+        return Schedule.empty()
+    return _assemble([_equal_principal_window(principal, rate, months, 0, months)])
+
+
+def fixed_payment_arrays(principal: float, rate: float, payment: float, max_months: int) -> Schedule:
+    # 固定月供直至还清（等额本息基准表、缩短年限方案共用）。
+    if principal <= 0 or payment <= 0 or max_months <= 0:
+        return Schedule.empty()
+    if payment - principal * rate <= 0:
+        # 与循环版本一致：首期即无法摊还时返回空表
+        return Schedule.empty()
+    block, _ = _fixed_payment_block(principal, rate, payment, max_months)
+    return _assemble([block])
+
+
+def equal_principal_rows(principal: float, rate: float, months: int, offset: int, limit: int) -> Tuple[Schedule, int]:
+    # equal_principal_arrays 的第 offset+1 ~ offset+limit 行（只计算这些行，O(limit)），以及整张表的行数。
+    if months <= 0 or principal <= 0:
+        return Schedule.empty(start=offset + 1), 0
+    lo, hi = min(offset, months), min(offset + limit, months)
+    return Schedule(*_equal_principal_window(principal, rate, months, lo, hi), start=lo + 1), months
+
+
+def fixed_payment_rows(principal: float, rate: float, payment: float, max_months: int, offset: int, limit: int) -> Tuple[Schedule, int]:
+    # fixed_payment_arrays 的第 offset+1 ~ offset+limit 行（只计算这些行，O(limit)），以及整张表的行数。
+    if principal <= 0 or payment <= 0 or max_months <= 0 or payment - principal * rate <= 0:
+        return Schedule.empty(start=offset + 1), 0
+    count, paid_off = _fixed_payment_count(principal, rate, payment, max_months)
+    lo, hi = min(offset, count), min(offset + limit, count)
+    return Schedule(*_fixed_payment_window(principal, rate, payment, count, paid_off, lo, hi), start=lo + 1), count
+
+
+def _segmented_arrays(
+    principal: float,
+    rate: float,
+    segments: List[Tuple[float, int]],
+    max_months: int,
+) -> Schedule:
+    # 按（月供, 期数）分段依次推进；任一分段首期月供覆盖不了利息即报错。
+    blocks = []
+    balance = principal
+    used = 0
+    for payment, count in segments:
+        count = min(count, max_months - used)
+        if count <= 0:
+            break
+        if payment - balance * rate <= 0:
+            raise ValueError("recurring payment too low to reduce principal")
+        block, balance = _fixed_payment_block(balance, rate, payment, count)
+        blocks.append(block)
+        used += len(block[0])
+        if balance <= 0 or len(block[0]) < count:
+            break
+    return _assemble(blocks)
+
+
+def recurring_extra_arrays(
+    principal: float,
+    rate: float,
+    base_payment: float,
+    extra_payment: float,
+    max_months: int,
+    extra_start_offset: int = 0,
+) -> Schedule:
+    # 每月追加定投：前 extra_start_offset 期按原月供，之后按“原月供 + 定投”。
+    if principal <= 0 or (base_payment + extra_payment) <= 0:
+        return Schedule.empty()
+    segments = []
+    if extra_start_offset > 0:
+        segments.append((base_payment, extra_start_offset))
+    segments.append((base_payment + extra_payment, max_months))
+    return _segmented_arrays(principal, rate, segments, max_months)
+
+
+def annual_recurring_arrays(
+    principal: float,
+    rate: float,
+    base_payment: float,
+    extra_payment: float,
+    max_months: int,
+    first_extra_offset: int = 0,
+) -> Schedule:
+    # 每年追加一次定投：第 first_extra_offset+1 期起，每 12 期的第一期多还 extra_payment。
+    if principal <= 0 or base_payment <= 0:
+        return Schedule.empty()
+    segments = []
+    if first_extra_offset > 0:
+        segments.append((base_payment, first_extra_offset))
+    remaining = max_months - first_extra_offset
+    while remaining > 0:
+        segments.append((base_payment + extra_payment, 1))
+        segments.append((base_payment, 11))
+        remaining -= 12
+    return _segmented_arrays(principal, rate, segments, max_months)
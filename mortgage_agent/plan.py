@@ -0,0 +1,353 @@
+"""多事件还款计划引擎：一次性提前还款、利率调整、定期追加还款可以任意组合、随时增删。
+
+原理：
+    每个月对“(剩余本金 B, 累计利息 I)”的作用都是仿射变换
+        B' = a * B + b,   I' = I + c * B + d
+    （等额本息：a = 1+r, b = -(月供+追加), c = r, d = 0；等额本金：a = 1, b = -(每期本金+追加), c = r, d = 0）。
+    仿射变换可以结合，整段贷款的月度变换存放在一棵线段树里，每个节点保存其区间内各月变换的合成结果。
+    连续若干个月的利率与还款额相同时，合成结果有闭式解（年金公式 / 等差数列），因此区间赋值可以懒标记完成。
+
+复杂度（n 为计划期数）：
+    - 增加 / 移动 / 删除一个事件：O((k+1) * log n)，k 为受影响区间内其它事件的边界数（通常为 0）；
+    - 任意第 m 期的余额、累计利息、累计还款：O(log n)，无需回放还款计划；
+    - 还清期数：O(log n)（沿线段树下降查找余额首次归零的月份）。
+
+约定：
+    - 月份从 1 开始，与 ScheduleRow.month_index 一致；事件金额随当月月供一起支付；
+    - 提前还款与利率调整后月供（等额本金为每期本金）保持不变，期限随之缩短或延长；
+    - 计划窗口默认为原期限的 2 倍，以容纳加息导致的期限延长。
+"""
+
+from __future__ import annotations
+
+import bisect
+import itertools
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from mortgage_agent.calculator import METHOD_EQUAL_PRINCIPAL, LoanState, annuity_payment, monthly_rate, normalize_method
+
+
+# 余额低于该值视为已还清（元），吸收浮点残差
+_PAID_OFF_EPS = 1e-6
+
+EVENT_PREPAYMENT = "prepayment"
+EVENT_RATE_CHANGE = "rate_change"
+EVENT_RECURRING_EXTRA = "recurring_extra"
+
+
+@dataclass
+class PlanEvent:
+    """计划中的一个事件。
+
+    字段说明：
+        event_id: 事件编号（增加事件时返回）。
+        kind: prepayment（一次性提前还款）/ rate_change（利率调整）/ recurring_extra（定期追加还款）。
+        month: 生效月份（定期追加为开始月份）。
+        amount: 提前还款或每月追加金额（元）；利率调整时为新年利率（百分比）。
+        end_month: 定期追加的结束月份（含）；None 表示持续到计划窗口结束。
+    """
+
+    event_id: int
+    kind: str
+    month: int
+    amount: float
+    end_month: Optional[int] = None
+
+
+# 仿射变换 (a, b, c, d)：B' = a*B + b, I' = I + c*B + d
+_IDENTITY = (1.0, 0.0, 0.0, 0.0)
+
+
+def _compose(first, second):
+    # 先作用 first、再作用 second 的合成变换。
+    a1, b1, c1, d1 = first
+    a2, b2, c2, d2 = second
+    return (a2 * a1, a2 * b1 + b2, c1 + c2 * a1, d1 + c2 * b1 + d2)
+
+
+class _Fenwick:
+    """树状数组：单点增量、前缀求和，用于查询任一月份的追加还款合计。"""
+
+    __slots__ = ("_tree",)
+
+    def __init__(self, size: int):
+        self._tree = [0.0] * (size + 1)
+
+    def add(self, index: int, delta: float) -> None:
+        while index < len(self._tree):
+            self._tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index: int) -> float:
+        total = 0.0
+        while index > 0:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+
+class RepaymentPlan:
+    """可交互编辑的多事件还款计划。"""
+
+    def __init__(
+        self,
+        principal: float,
+        annual_rate: float,
+        term_months: int,
+        method: str,
+        *,
+        horizon_months: Optional[int] = None,
+    ):
+        if principal <= 0 or term_months <= 0:
+            raise ValueError("principal and term_months must be greater than 0")
+        self.principal = principal
+        self.annual_rate = annual_rate
+        self.term_months = term_months
+        self.method = normalize_method(method)
+        self.horizon = horizon_months or term_months * 2
+        if self.horizon < term_months:
+            raise ValueError("horizon_months cannot be shorter than term_months")
+
+        rate = monthly_rate(annual_rate)
+        if self.method == METHOD_EQUAL_PRINCIPAL:
+            # 等额本金：每期固定本金，原期限结束后不再有本金流出
+            self._base_outflow = principal / term_months
+        else:
+            self._base_outflow = annuity_payment(principal, rate, term_months)
+
+        self._events: Dict[int, PlanEvent] = {}
+        self._ids = itertools.count(1)
+        self._extra = _Fenwick(self.horizon + 1)  # 追加还款的差分
+        self._rate_changes: List[Tuple[int, int]] = []  # 有序 (month, event_id)
+        self._boundaries: List[int] = []  # 所有事件边界月份（有序、可重复）
+
+        size = 4 * self.horizon
+        self._maps = [_IDENTITY] * size
+        self._lazy: List[Optional[Tuple[float, float]]] = [None] * size
+        self._assign(1, 1, self.horizon, 1, self.horizon, (rate, self._base_outflow))
+        if self.method == METHOD_EQUAL_PRINCIPAL and self.horizon > term_months:
+            self._assign(1, 1, self.horizon, term_months + 1, self.horizon, (rate, 0.0))
+
+    # ------------------------------------------------------------------ 线段树
+
+    def _run_map(self, attrs: Tuple[float, float], length: int):
+        # 连续 length 个月利率、流出相同时的合成变换（闭式解）。
+        rate, outflow = attrs
+        if self.method == METHOD_EQUAL_PRINCIPAL:
+            return (1.0, -outflow * length, rate * length, -rate * outflow * length * (length - 1) / 2.0)
+        if rate == 0:
+            return (1.0, -outflow * length, 0.0, 0.0)
+        growth = math.pow(1 + rate, length)
+        b = -outflow * (growth - 1) / rate
+        # 区间利息 = 区间还款 - 本金减少额
+        return (growth, b, growth - 1, b + outflow * length)
+
+    def _apply(self, node: int, lo: int, hi: int, attrs: Tuple[float, float]) -> None:
+        self._maps[node] = self._run_map(attrs, hi - lo + 1)
+        self._lazy[node] = attrs
+
+    def _push(self, node: int, lo: int, hi: int) -> None:
+        attrs = self._lazy[node]
+        if attrs is None:
+            return
+        mid = (lo + hi) // 2
+        self._apply(2 * node, lo, mid, attrs)
+        self._apply(2 * node + 1, mid + 1, hi, attrs)
+        self._lazy[node] = None
+
+    def _assign(self, node: int, lo: int, hi: int, left: int, right: int, attrs: Tuple[float, float]) -> None:
+        if right < lo or hi < left:
+            return
+        if left <= lo and hi <= right:
+            self._apply(node, lo, hi, attrs)
+            return
+        self._push(node, lo, hi)
+        mid = (lo + hi) // 2
+        self._assign(2 * node, lo, mid, left, right, attrs)
+        self._assign(2 * node + 1, mid + 1, hi, left, right, attrs)
+        self._maps[node] = _compose(self._maps[2 * node], self._maps[2 * node + 1])
+
+    def _prefix_map(self, node: int, lo: int, hi: int, count: int):
+        # 第 1~count 期的合成变换。
+        if count >= hi:
+            return self._maps[node]
+        if count < lo:
+            return _IDENTITY
+        self._push(node, lo, hi)
+        mid = (lo + hi) // 2
+        left = self._prefix_map(2 * node, lo, mid, count)
+        if count <= mid:
+            return left
+        return _compose(left, self._prefix_map(2 * node + 1, mid + 1, hi, count))
+
+    # ------------------------------------------------------------------ 月度属性
+
+    def _rate_at(self, month: int) -> float:
+        pos = bisect.bisect_right(self._rate_changes, (month, math.inf))
+        if pos == 0:
+            return monthly_rate(self.annual_rate)
+        return monthly_rate(self._events[self._rate_changes[pos - 1][1]].amount)
+
+    def _outflow_at(self, month: int) -> float:
+        base = self._base_outflow if (self.method != METHOD_EQUAL_PRINCIPAL or month <= self.term_months) else 0.0
+        return base + self._extra.prefix(month)
+
+    def _refresh(self, left: int, right: int) -> None:
+        # 重新计算 [left, right] 内各月属性：按事件边界切成若干同质区间，逐段懒赋值。
+        right = min(right, self.horizon)
+        if left > right:
+            return
+        cuts = [left]
+        lo = bisect.bisect_right(self._boundaries, left)
+        hi = bisect.bisect_right(self._boundaries, right)
+        for month in self._boundaries[lo:hi]:
+            if month != cuts[-1]:
+                cuts.append(month)
+        if self.method == METHOD_EQUAL_PRINCIPAL and left <= self.term_months < right and self.term_months + 1 not in cuts:
+            bisect.insort(cuts, self.term_months + 1)
+        cuts.append(right + 1)
+        for start, stop in zip(cuts, cuts[1:]):
+            attrs = (self._rate_at(start), self._outflow_at(start))
+            self._assign(1, 1, self.horizon, start, stop - 1, attrs)
+
+    def _span(self, event: PlanEvent) -> Tuple[int, int]:
+        # 事件影响的月份区间 [start, end]。
+        if event.kind == EVENT_PREPAYMENT:
+            return event.month, event.month
+        if event.kind == EVENT_RECURRING_EXTRA:
+            return event.month, event.end_month or self.horizon
+        pos = bisect.bisect_right(self._rate_changes, (event.month, event.event_id))
+        following = [m for m, _ in self._rate_changes[pos:] if m > event.month]
+        return event.month, (following[0] - 1) if following else self.horizon
+
+    def _edges(self, event: PlanEvent) -> List[int]:
+        # 事件在月度属性上产生的分界月份（属性从该月起可能变化）。
+        if event.kind == EVENT_RATE_CHANGE:
+            return [event.month]
+        start, end = self._span(event)
+        return [start, end + 1]
+
+    def _attach(self, event: PlanEvent) -> None:
+        self._events[event.event_id] = event
+        if event.kind == EVENT_RATE_CHANGE:
+            bisect.insort(self._rate_changes, (event.month, event.event_id))
+        else:
+            start, end = self._span(event)
+            self._extra.add(start, event.amount)
+            if end + 1 <= self.horizon:
+                self._extra.add(end + 1, -event.amount)
+        for month in self._edges(event):
+            bisect.insort(self._boundaries, month)
+        self._refresh(*self._span(event))
+
+    def _detach(self, event: PlanEvent) -> None:
+        start, end = self._span(event)
+        if event.kind == EVENT_RATE_CHANGE:
+            self._rate_changes.remove((event.month, event.event_id))
+        else:
+            self._extra.add(start, -event.amount)
+            if end + 1 <= self.horizon:
+                self._extra.add(end + 1, event.amount)
+        for month in self._edges(event):
+            del self._boundaries[bisect.bisect_left(self._boundaries, month)]
+        del self._events[event.event_id]
+        self._refresh(start, end)
+
+    # ------------------------------------------------------------------ 事件编辑
+
+    def _check_month(self, month: int) -> None:
+        if not 1 <= month <= self.horizon:
+            raise ValueError(f"month must be between 1 and {self.horizon}")
+
+    def add_prepayment(self, month: int, amount: float) -> int:
+        # 第 month 期随月供一起一次性提前还款 amount 元，返回事件编号。
+        self._check_month(month)
+        if amount <= 0:
+            raise ValueError("prepayment amount must be greater than 0")
+        event = PlanEvent(next(self._ids), EVENT_PREPAYMENT, month, amount)
+        self._attach(event)
+        return event.event_id
+
+    def add_rate_change(self, month: int, annual_rate: float) -> int:
+        # 自第 month 期起年利率调整为 annual_rate（百分比），直到下一次利率调整。
+        self._check_month(month)
+        if annual_rate < 0:
+            raise ValueError("annual_rate cannot be negative")
+        event = PlanEvent(next(self._ids), EVENT_RATE_CHANGE, month, annual_rate)
+        self._attach(event)
+        return event.event_id
+
+    def add_recurring_extra(self, start_month: int, amount: float, end_month: Optional[int] = None) -> int:
+        # 自 start_month 期起（至 end_month 期，含）每月在月供之外追加 amount 元。
+        self._check_month(start_month)
+        if end_month is not None:
+            self._check_month(end_month)
+            if end_month < start_month:
+                raise ValueError("end_month cannot be earlier than start_month")
+        if amount <= 0:
+            raise ValueError("recurring extra amount must be greater than 0")
+        event = PlanEvent(next(self._ids), EVENT_RECURRING_EXTRA, start_month, amount, end_month)
+        self._attach(event)
+        return event.event_id
+
+    def move_event(self, event_id: int, month: int) -> None:
+        # 把事件挪到第 month 期（定期追加会保持原持续期数）。
+        event = self._get(event_id)
+        self._check_month(month)
+        end_month = event.end_month
+        if end_month is not None:
+            end_month = month + (end_month - event.month)
+            self._check_month(end_month)
+        self._detach(event)
+        self._attach(PlanEvent(event.event_id, event.kind, month, event.amount, end_month))
+
+    def remove_event(self, event_id: int) -> None:
+        self._detach(self._get(event_id))
+
+    def _get(self, event_id: int) -> PlanEvent:
+        try:
+            return self._events[event_id]
+        except KeyError:
+            raise ValueError(f"unknown plan event: {event_id}") from None
+
+    @property
+    def events(self) -> List[PlanEvent]:
+        return sorted(self._events.values(), key=lambda e: (e.month, e.event_id))
+
+    # ------------------------------------------------------------------ 查询
+
+    def payoff_month(self) -> Optional[int]:
+        # 余额首次归零的期数；计划窗口内还不清时返回 None。
+        node, lo, hi = 1, 1, self.horizon
+        prefix = _IDENTITY
+        if self.principal * self._maps[1][0] + self._maps[1][1] > _PAID_OFF_EPS:
+            return None
+        while lo < hi:
+            self._push(node, lo, hi)
+            mid = (lo + hi) // 2
+            candidate = _compose(prefix, self._maps[2 * node])
+            if self.principal * candidate[0] + candidate[1] > _PAID_OFF_EPS:
+                prefix = candidate
+                node, lo = 2 * node + 1, mid + 1
+            else:
+                node, hi = 2 * node, mid
+        return lo
+
+    def state_at(self, month: int) -> LoanState:
+        # 第 month 期还款后的余额、累计利息与累计还款（还清之后保持还清时的数值）。
+        month = min(max(month, 0), self.horizon)
+        payoff = self.payoff_month()
+        if payoff is not None:
+            month = min(month, payoff)
+        a, b, c, d = self._prefix_map(1, 1, self.horizon, month)
+        balance = a * self.principal + b
+        if balance <= _PAID_OFF_EPS:
+            balance = 0.0
+        interest = c * self.principal + d
+        return LoanState(month, balance, interest, interest + (self.principal - balance))
+
+    def total_interest(self) -> float:
+        # 计划全程（至还清或计划窗口结束）的利息合计。
+        return self.state_at(self.horizon).cumulative_interest
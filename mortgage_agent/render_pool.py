@@ -0,0 +1,121 @@
+"""导出渲染进程池：Excel / PDF 在子进程中生成，不占用 API 进程的 GIL。
+
+export 接口是同步接口，渲染原本在 Starlette 线程池里执行，纯 Python 渲染持有 GIL，
+同一 worker 内的其它请求（包括 /health、calc）都会被拖慢。
+EXPORT_PROCESS_WORKERS > 0 时，渲染任务提交到进程池并行执行：参数中的 Schedule 以紧凑字节形式传递
+（见 Schedule.__reduce__），子进程只返回生成好的 bytes。
+
+EXPORT_PROCESS_WORKERS = 0（默认；docker-compose 默认 1）时不启用进程池，任务在取结果时才在当前线程执行，行为与以前一致。
+子进程使用 spawn 方式启动（API 进程本身是多线程的，fork 不安全），首次使用时创建；
+子进程异常退出导致进程池损坏时会自动重建：提交时损坏则重新提交，渲染中途损坏则在当前线程重新生成该任务，
+调用方（流式 ZIP 已发出响应头）不会因此拿到截断的文件。
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+
+EXPORT_PROCESS_WORKERS = int(os.getenv("EXPORT_PROCESS_WORKERS", "0"))
+
+
+def _warm_up() -> None:
+    # 子进程启动时预先导入渲染依赖（reportlab 及字体注册），避免第一个任务承担导入开销。
+    from mortgage_agent.report import register_fonts
+
+    register_fonts()
+
+
+class _DeferredTask:
+    # 未启用进程池时的任务：result() 时才在当前线程执行，保持“逐个生成”的内存特性。
+    def __init__(self, fn: Callable[..., Any], args, kwargs):
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        if timeout is None:
+            return self._fn(*self._args, **self._kwargs)
+        # 带超时：在辅助线程中执行，超时抛出 TimeoutError（与 Future.result 一致，任务本身继续执行到结束）
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+        threading.Thread(target=self._run_into, args=(future,), daemon=True).start()
+        return future.result(timeout)
+
+    def _run_into(self, future: Future) -> None:
+        try:
+            future.set_result(self._fn(*self._args, **self._kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+
+class _PooledTask:
+    # 进程池中的任务：子进程在渲染中途崩溃（进程池损坏）时重建进程池，并在当前线程重新生成。
+    def __init__(self, pool: "RenderPool", executor: ProcessPoolExecutor, future: Future, fn: Callable[..., Any], args, kwargs):
+        self._pool = pool
+        self._executor = executor
+        self._future = future
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        try:
+            return self._future.result(timeout)
+        except BrokenProcessPool:
+            self._pool._reset(self._executor)
+            return _DeferredTask(self._fn, self._args, self._kwargs).result(timeout)
+
+
+class RenderPool:
+    """渲染任务调度：submit 返回带 result() 的任务对象。"""
+
+    def __init__(self, workers: int):
+        self.workers = max(workers, 0)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_up,
+                )
+            return self._executor
+
+    def _reset(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs):
+        # fn 必须是模块级函数（可被 pickle），参数与返回值也需可 pickle。
+        if not self.enabled:
+            return _DeferredTask(fn, args, kwargs)
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            self._reset(executor)
+            executor = self._get_executor()
+            future = executor.submit(fn, *args, **kwargs)
+        return _PooledTask(self, executor, future, fn, args, kwargs)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import copy
 import os
+import threading
 import uuid
 from datetime import date
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 from io import BytesIO
 
 from reportlab.lib import colors
@@ -22,6 +24,7 @@ from reportlab.platypus import (
     Flowable,
 )
 
+from mortgage_agent import charts
 from mortgage_agent.calculator import Prepayment, SimulationResult
 
 
@@ -30,7 +33,15 @@ from mortgage_agent.calculator import Prepayment, SimulationResult
 FONT_NAME = "STSong-Light"
 FONT_NAME_BOLD = "STSong-Light"  # CID 字体使用 <b> 标签加粗
 NUM_FONT = "Helvetica"  # 数字/英文使用西文字体，避免拥挤
-pdfmetrics.registerFont(UnicodeCIDFont(FONT_NAME))
+
+# 静态内容的绘制方式（环境变量 REPORT_STATIC_MODE）：
+#   fragments  静态段落每个进程只断行排版一次，之后的报告直接绘制；
+#              页眉固定部分作为 PDF Form XObject（beginForm / doForm）每份报告只绘制一次，各页引用（默认）
+#   flowables  每份报告完整排版所有段落
+REPORT_STATIC_MODE = os.getenv("REPORT_STATIC_MODE", "fragments").strip().lower()
+
+# SimpleDocTemplate 默认 Frame 左右各留 6pt 内边距，段落实际可用宽度 = 版心宽度 - 12pt
+_FRAME_PADDING = 12
 
 PALETTE = {
     "primary_text": "#1E293B",
@@ -108,23 +119,293 @@ class PageHeader(Flowable):
         self.canv.line(0, self.height, self.width, self.height)
 
 
-def _header_footer(canvas, doc):
-    """每页页眉页脚。"""
-    canvas.saveState()
-    header_text = "息策 ▲ 提前还款分析"
-    canvas.setFont(FONT_NAME, 9)
-    canvas.setFillColor(colors.HexColor(PALETTE["secondary_text"]))
-    # 顶部细线 + 抬高标题，避免压正文
-    canvas.setStrokeColor(colors.HexColor(PALETTE["border"]))
-    canvas.setLineWidth(0.4)
-    canvas.line(doc.leftMargin, doc.height + doc.topMargin - 9 * mm, doc.width + doc.leftMargin, doc.height + doc.topMargin - 9 * mm)
-    canvas.drawString(doc.leftMargin, doc.height + doc.topMargin - 7 * mm, header_text)
+class ChartFlowable(Flowable):
+    """走势图（charts.ChartDrawing）：缓存的矢量绘制指令经 Canvas.addLiteral 原样写入，刻度数字以 PDF 文字绘制。"""
+
+    def __init__(self, chart: charts.ChartDrawing):
+        super().__init__()
+        self.chart = chart
+        self.width = chart.width
+        self.height = chart.height
+
+    def draw(self):
+        self.canv.addLiteral(self.chart.ops)
+        self._draw_ticks()
+
+    def _draw_ticks(self):
+        canv = self.canv
+        chart = self.chart
+        canv.saveState()
+        canv.setFont(NUM_FONT, 6.5)
+        canv.setFillColor(colors.HexColor(PALETTE["secondary_text"]))
+        for axes in chart.axes:
+            x0, y0, w, h = axes.bounds
+            for frac, label in axes.x_ticks:
+                canv.drawCentredString((x0 + frac * w) * self.width, y0 * self.height - 8, label)
+            for frac, label in axes.y_ticks:
+                canv.drawRightString(x0 * self.width - 3, (y0 + frac * h) * self.height - 2.2, label)
+        canv.restoreState()
+
+
+class StaticFragment(Flowable):
+    """预先排版好的静态段落：断行在构建模板时只做一次，之后的文档只绘制，不再排版。
+
+    当前页放不下时交给原段落拆分，拆出的部分照常排版、绘制，与 flowables 模式一致。
+    """
+
+    def __init__(self, paragraph: Paragraph, avail_width: float):
+        super().__init__()
+        self._para = paragraph
+        self.width, self.height = paragraph.wrap(avail_width, 1e6)
+        self.spaceBefore = paragraph.getSpaceBefore()
+        self.spaceAfter = paragraph.getSpaceAfter()
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        return copy.copy(self._para).split(availWidth, availHeight)
 
-    footer_text = f"生成日期: {date.today().strftime('%Y-%m-%d')}"
-    canvas.setFont(FONT_NAME, 8)
-    canvas.drawString(doc.leftMargin, 10 * mm, footer_text)
-    canvas.drawRightString(doc.width + doc.leftMargin, 10 * mm, f"第 {doc.page} 页")
-    canvas.restoreState()
+    def draw(self):
+        # 排版结果只读共享，绘制时会记录画布等状态，因此用浅拷贝
+        copy.copy(self._para).drawOn(self.canv, 0, 0)
+
+
+def register_fonts() -> None:
+    """注册中文 CID 字体（幂等）；生成 PDF 前调用，不在导入时注册。"""
+    if FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(UnicodeCIDFont(FONT_NAME))
+
+
+class ReportTemplate:
+    """报告中与具体贷款无关的部分：段落样式、表格样式、页面设置、页眉页脚与静态段落。
+
+    每个进程只构建一次（见 get_report_template），generate_pdf 只拼装动态内容。
+    样式与表格样式在排版时只读，可被并发生成的报告共享；段落在排版时会记录自身的布局状态，
+    静态段落因此通过 static() 取浅拷贝使用（不必重新解析标记）。
+    static_mode 为 fragments 时静态段落预先排版为 StaticFragment（见 REPORT_STATIC_MODE）。
+    """
+
+    def __init__(self, static_mode: str = "flowables"):
+        register_fonts()
+        self.static_mode = static_mode
+        styles = getSampleStyleSheet()
+        self.palette = {name: colors.HexColor(value) for name, value in PALETTE.items()}
+        palette = self.palette
+
+        self.meta_style = ParagraphStyle(
+            "meta_cn",
+            parent=styles["BodyText"],
+            fontName=FONT_NAME,
+            fontSize=9.5,
+            leading=14.5,
+            textColor=palette["secondary_text"],
+        )
+        self.base_style = ParagraphStyle(
+            "base_cn",
+            parent=styles["BodyText"],
+            fontName=FONT_NAME,
+            fontSize=10.2,
+            leading=19,
+            wordWrap="CJK",
+            textColor=palette["primary_text"],
+        )
+        self.title_style = ParagraphStyle(
+            "title_cn",
+            parent=styles["Title"],
+            fontName=FONT_NAME_BOLD,
+            fontSize=25,
+            leading=33,
+            textColor=palette["primary_text"],
+            spaceAfter=10,
+        )
+        self.h2_style = ParagraphStyle(
+            "h2_cn",
+            parent=styles["Heading2"],
+            fontName=FONT_NAME_BOLD,
+            fontSize=16.5,
+            leading=23,
+            textColor=palette["primary_text"],
+            spaceBefore=8,
+            spaceAfter=8,
+        )
+        self.big_green_style = ParagraphStyle(
+            "big_green",
+            parent=styles["Title"],
+            fontName=NUM_FONT,
+            fontSize=40,
+            leading=48,
+            textColor=palette["accent_green"],
+            alignment=1,
+            spaceBefore=6,
+            spaceAfter=6,
+        )
+        self.tag_style = ParagraphStyle(
+            "tag",
+            parent=styles["BodyText"],
+            fontName=FONT_NAME,
+            fontSize=12,
+            leading=16,
+            textColor=palette["accent_green"],
+            backColor=colors.HexColor("#ECFDF3"),
+            borderPadding=7,
+            alignment=1,
+            spaceAfter=8,
+        )
+        self.info_style = ParagraphStyle("info_cn", parent=self.base_style, leading=17)
+        self.money_style = ParagraphStyle(name="sum_money", parent=self.base_style, fontName=NUM_FONT, alignment=2)
+        self.critical_tip_style = ParagraphStyle(
+            name="critical_point_tip",
+            parent=self.base_style,
+            fontSize=9.6,
+            leading=13.5,
+            backColor=palette["highlight_bg"],
+            borderPadding=8,
+        )
+
+        self.info_table_style = TableStyle(
+            [
+                ("FONT", (0, 0), (-1, -1), FONT_NAME, 9.7),
+                ("BACKGROUND", (0, 0), (-1, 0), palette["highlight_bg"]),
+                ("TEXTCOLOR", (0, 0), (-1, 0), palette["secondary_text"]),
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ("LINEBELOW", (0, 0), (-1, 0), 1, palette["border"]),
+                ("BOX", (0, 0), (-1, -1), 0.8, palette["border"]),
+                ("INNERGRID", (0, 0), (-1, -1), 0.25, palette["border"]),
+                ("PADDING", (0, 0), (-1, -1), 10),
+            ]
+        )
+        self.summary_table_style = TableStyle(
+            [
+                ("FONT", (0, 0), (-1, -1), FONT_NAME, 10.2),
+                ("FONT", (2, 1), (2, -1), NUM_FONT, 10.2),  # 金额列使用西文字体
+                ("BACKGROUND", (0, 0), (-1, 0), palette["dark_header"]),
+                ("TEXTCOLOR", (0, 0), (-1, 0), palette["white"]),
+                ("ALIGN", (2, 1), (2, -1), "RIGHT"),
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                ("LINEBELOW", (0, 0), (-1, 0), 1.5, palette["dark_header"]),
+                ("LINEBELOW", (0, -1), (-1, -1), 0.8, palette["border"]),
+                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.HexColor("#FFFFFF"), palette["highlight_bg"]]),
+                ("PADDING", (0, 0), (-1, -1), 9),
+                ("GRID", (0, 0), (-1, -1), 0, colors.transparent),
+            ]
+        )
+
+        self.page_kwargs = dict(
+            pagesize=A4,
+            leftMargin=20 * mm,
+            rightMargin=20 * mm,
+            topMargin=32 * mm,
+            bottomMargin=22 * mm,
+            title="息策 Agent - 提前还款分析报告",
+            author="息策 Agent",
+        )
+
+        self._static = {
+            "title": Paragraph("<b>息策 ▲ 提前还款分析</b>", self.title_style),
+            "subtitle": Paragraph(
+                "高级决策简报 · 以收益视角评估提前还款价值",
+                ParagraphStyle(name="subtitle_cn", parent=self.base_style, textColor=palette["secondary_text"], fontSize=10.5, leading=16),
+            ),
+            "saving_title": Paragraph(
+                "本次还款预计为您节省",
+                ParagraphStyle(name="saving_title_cn", parent=self.base_style, alignment=1, fontSize=11),
+            ),
+            "excel_note": Paragraph(
+                "* 详细还款明细请查看导出的 <font name='Helvetica'>Excel</font> 文件（含原方案 / 减少月供 / 缩短年限）。",
+                ParagraphStyle(
+                    name="note_excel",
+                    parent=self.base_style,
+                    fontSize=9,
+                    leading=13,
+                    textColor=palette["secondary_text"],
+                ),
+            ),
+            "advice_heading": Paragraph("理财建议", self.h2_style),
+            "no_invest_rate": Paragraph(
+                "您未提供理财年化收益率，通用建议：当贷款进入“本金还款期”后，提前还款的边际收益下降，"
+                "可考虑将资金用于更高收益理财或保留流动性。",
+                self.base_style,
+            ),
+            "chart_heading": Paragraph("还款走势", self.h2_style),
+            "chart_legend": Paragraph(
+                "<font name='Helvetica'>&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;</font>".join(
+                    f"<font color='{color}'>■</font><font name='Helvetica'>&nbsp;</font>{label}" for _, label, color in charts.SCENARIOS
+                )
+                + "<br/>上图：剩余本金（万元）；下图：各方案每月利息（实线）与本金（虚线）（元）；横轴：距今年数。",
+                ParagraphStyle(
+                    name="chart_legend",
+                    parent=self.base_style,
+                    fontSize=8.5,
+                    leading=13,
+                    textColor=palette["secondary_text"],
+                ),
+            ),
+            "disclaimer": Paragraph(
+                "<b>免责声明：</b>本报告基于您提供的数据进行数学模拟，结果仅供参考。实际还款规则可能受银行计息方式、扣款日、提前还款手续费等多种因素影响。"
+                "如需执行具体操作，请务必以银行出具的官方还款计划表为准。",
+                ParagraphStyle(
+                    "disclaimer",
+                    parent=self.base_style,
+                    fontSize=8.5,
+                    leading=14,
+                    textColor=palette["secondary_text"],
+                ),
+            ),
+        }
+        if static_mode == "fragments":
+            avail_width = A4[0] - self.page_kwargs["leftMargin"] - self.page_kwargs["rightMargin"] - _FRAME_PADDING
+            self._static = {name: StaticFragment(para, avail_width) for name, para in self._static.items()}
+
+    def static(self, name: str) -> Flowable:
+        return copy.copy(self._static[name])
+
+    def new_document(self, buf: BytesIO) -> SimpleDocTemplate:
+        return SimpleDocTemplate(buf, **self.page_kwargs)
+
+    def _draw_header(self, canvas, doc):
+        header_text = "息策 ▲ 提前还款分析"
+        canvas.setFont(FONT_NAME, 9)
+        canvas.setFillColor(self.palette["secondary_text"])
+        # 顶部细线 + 抬高标题，避免压正文
+        canvas.setStrokeColor(self.palette["border"])
+        canvas.setLineWidth(0.4)
+        canvas.line(doc.leftMargin, doc.height + doc.topMargin - 9 * mm, doc.width + doc.leftMargin, doc.height + doc.topMargin - 9 * mm)
+        canvas.drawString(doc.leftMargin, doc.height + doc.topMargin - 7 * mm, header_text)
+
+    def header_footer(self, canvas, doc):
+        """每页页眉页脚。"""
+        canvas.saveState()
+        if self.static_mode == "fragments":
+            # 页眉各页相同：定义一次 Form，之后每页引用
+            if not canvas.hasForm("static_page_header"):
+                canvas.beginForm("static_page_header")
+                self._draw_header(canvas, doc)
+                canvas.endForm()
+            canvas.doForm("static_page_header")
+            canvas.setFillColor(self.palette["secondary_text"])
+        else:
+            self._draw_header(canvas, doc)
+
+        footer_text = f"生成日期: {date.today().strftime('%Y-%m-%d')}"
+        canvas.setFont(FONT_NAME, 8)
+        canvas.drawString(doc.leftMargin, 10 * mm, footer_text)
+        canvas.drawRightString(doc.width + doc.leftMargin, 10 * mm, f"第 {doc.page} 页")
+        canvas.restoreState()
+
+
+_TEMPLATE: Optional[ReportTemplate] = None
+_TEMPLATE_LOCK = threading.Lock()
+
+
+def get_report_template() -> ReportTemplate:
+    """进程内共享的报告模板（首次调用时构建）。"""
+    global _TEMPLATE
+    if _TEMPLATE is None:
+        with _TEMPLATE_LOCK:
+            if _TEMPLATE is None:
+                _TEMPLATE = ReportTemplate(REPORT_STATIC_MODE)
+    return _TEMPLATE
 
 
 def generate_pdf(
@@ -137,6 +418,9 @@ def generate_pdf(
     original_method: str,
 ) -> bytes:
     """根据 simulate 的结果生成 PDF，返回 PDF 二进制。"""
+    tpl = get_report_template()
+    palette = tpl.palette
+    base_style = tpl.base_style
 
     pdf_buf = BytesIO()
 
@@ -152,104 +436,22 @@ def generate_pdf(
     best_saved = max(shorten_saved, reduce_saved)
     best_label = _score_label(best_saved, float(prepayment.amount))
 
-    # --- Define Styles ---
-    styles = getSampleStyleSheet()
-
-    meta_style = ParagraphStyle(
-        "meta_cn",
-        parent=styles["BodyText"],
-        fontName=FONT_NAME,
-        fontSize=9.5,
-        leading=14.5,
-        textColor=colors.HexColor(PALETTE["secondary_text"]),
-    )
-
-    base_style = ParagraphStyle(
-        "base_cn",
-        parent=styles["BodyText"],
-        fontName=FONT_NAME,
-        fontSize=10.2,
-        leading=19,
-        wordWrap="CJK",
-        textColor=colors.HexColor(PALETTE["primary_text"]),
-    )
-
-    title_style = ParagraphStyle(
-        "title_cn",
-        parent=styles["Title"],
-        fontName=FONT_NAME_BOLD,
-        fontSize=25,
-        leading=33,
-        textColor=colors.HexColor(PALETTE["primary_text"]),
-        spaceAfter=10,
-    )
-
-    h2_style = ParagraphStyle(
-        "h2_cn",
-        parent=styles["Heading2"],
-        fontName=FONT_NAME_BOLD,
-        fontSize=16.5,
-        leading=23,
-        textColor=colors.HexColor(PALETTE["primary_text"]),
-        spaceBefore=8,
-        spaceAfter=8,
-    )
-
-    big_green_style = ParagraphStyle(
-        "big_green",
-        parent=styles["Title"],
-        fontName=NUM_FONT,
-        fontSize=40,
-        leading=48,
-        textColor=colors.HexColor(PALETTE["accent_green"]),
-        alignment=1,
-        spaceBefore=6,
-        spaceAfter=6,
-    )
-
-    tag_style = ParagraphStyle(
-        "tag",
-        parent=styles["BodyText"],
-        fontName=FONT_NAME,
-        fontSize=12,
-        leading=16,
-        textColor=colors.HexColor(PALETTE["accent_green"]),
-        backColor=colors.HexColor("#ECFDF3"),
-        borderPadding=7,
-        alignment=1,
-        spaceAfter=8,
-    )
-
-    doc = SimpleDocTemplate(
-        pdf_buf,
-        pagesize=A4,
-        leftMargin=20 * mm,
-        rightMargin=20 * mm,
-        topMargin=32 * mm,
-        bottomMargin=22 * mm,
-        title="息策 Agent - 提前还款分析报告",
-        author="息策 Agent",
-    )
+    doc = tpl.new_document(pdf_buf)
 
     story = []
 
     # -------------------- 第 1 页：核心摘要 --------------------
     # 首屏额外留白，确保不与页眉重叠
     story.append(Spacer(1, 3 * mm))
-    story.append(Paragraph("<b>息策 ▲ 提前还款分析</b>", title_style))
-    story.append(
-        Paragraph(
-            "高级决策简报 · 以收益视角评估提前还款价值",
-            ParagraphStyle(name="subtitle_cn", parent=base_style, textColor=colors.HexColor(PALETTE["secondary_text"]), fontSize=10.5, leading=16),
-        )
-    )
+    story.append(tpl.static("title"))
+    story.append(tpl.static("subtitle"))
 
-    story.append(Paragraph(f"生成日期：{date.today().strftime('%Y-%m-%d')}", meta_style))
+    story.append(Paragraph(f"生成日期：{date.today().strftime('%Y-%m-%d')}", tpl.meta_style))
     story.append(PageHeader(doc.width))
     story.append(Spacer(1, 6 * mm))
 
     # 信息卡片：原贷款信息 + 还款进度 + 本次提前还款
-    info_style = ParagraphStyle("info_cn", parent=base_style, leading=17)
+    info_style = tpl.info_style
     info_data = [
         ["原贷款信息", "还款进度", "本次提前还款"],
         [
@@ -276,41 +478,17 @@ def generate_pdf(
     ]
 
     info_table = Table(info_data, colWidths=[58 * mm, 58 * mm, 54 * mm])
-    info_table.setStyle(
-        TableStyle(
-            [
-                ("FONT", (0, 0), (-1, -1), FONT_NAME, 9.7),
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor(PALETTE["highlight_bg"])),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor(PALETTE["secondary_text"])),
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ("LINEBELOW", (0, 0), (-1, 0), 1, colors.HexColor(PALETTE["border"])),
-                ("BOX", (0, 0), (-1, -1), 0.8, colors.HexColor(PALETTE["border"])),
-                ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.HexColor(PALETTE["border"])),
-                ("PADDING", (0, 0), (-1, -1), 10),
-            ]
-        )
-    )
+    info_table.setStyle(tpl.info_table_style)
     story.append(info_table)
 
     story.append(Spacer(1, 6 * mm))
 
-    story.append(Paragraph("本次还款预计为您节省", ParagraphStyle(name="saving_title_cn", parent=base_style, alignment=1, fontSize=11)))
-    story.append(Paragraph(f"{_fmt_money_font(best_saved)}", big_green_style))
-    story.append(Paragraph(best_label, tag_style))
+    story.append(tpl.static("saving_title"))
+    story.append(Paragraph(f"{_fmt_money_font(best_saved)}", tpl.big_green_style))
+    story.append(Paragraph(best_label, tpl.tag_style))
     story.append(Spacer(1, 4 * mm))
 
-    story.append(
-        Paragraph(
-            "* 详细还款明细请查看导出的 <font name='Helvetica'>Excel</font> 文件（含原方案 / 减少月供 / 缩短年限）。",
-            ParagraphStyle(
-                name="note_excel",
-                parent=base_style,
-                fontSize=9,
-                leading=13,
-                textColor=colors.HexColor(PALETTE["secondary_text"]),
-            ),
-        )
-    )
+    story.append(tpl.static("excel_note"))
 
     summary_data = [
         ["方案", "关键变化", "预计节省利息"],
@@ -320,7 +498,7 @@ def generate_pdf(
                 f"月供不变，预计提前 {shorten_years} 年 {shorten_left_months} 个月结清",
                 base_style,
             ),
-            Paragraph(_fmt_money_font(shorten_saved), ParagraphStyle(name="sum_money1", parent=base_style, fontName=NUM_FONT, alignment=2)),
+            Paragraph(_fmt_money_font(shorten_saved), tpl.money_style),
         ],
         [
             "减少月供",
@@ -328,28 +506,12 @@ def generate_pdf(
                 f"期限不变，月供从约 {_fmt_money_font(result.original_monthly_payment)} 降至约 {_fmt_money_font(result.reduced_monthly_payment)}",
                 base_style,
             ),
-            Paragraph(_fmt_money_font(reduce_saved), ParagraphStyle(name="sum_money2", parent=base_style, fontName=NUM_FONT, alignment=2)),
+            Paragraph(_fmt_money_font(reduce_saved), tpl.money_style),
         ],
     ]
 
     t = Table(summary_data, colWidths=[45 * mm, 85 * mm, 40 * mm])
-    t.setStyle(
-        TableStyle(
-            [
-                ("FONT", (0, 0), (-1, -1), FONT_NAME, 10.2),
-                ("FONT", (2, 1), (2, -1), NUM_FONT, 10.2),  # 金额列使用西文字体
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor(PALETTE["dark_header"])),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor(PALETTE["white"])),
-                ("ALIGN", (2, 1), (2, -1), "RIGHT"),
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ("LINEBELOW", (0, 0), (-1, 0), 1.5, colors.HexColor(PALETTE["dark_header"])),
-                ("LINEBELOW", (0, -1), (-1, -1), 0.8, colors.HexColor(PALETTE["border"])),
-                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.HexColor("#FFFFFF"), colors.HexColor(PALETTE["highlight_bg"])]),
-                ("PADDING", (0, 0), (-1, -1), 9),
-                ("GRID", (0, 0), (-1, -1), 0, colors.transparent),
-            ]
-        )
-    )
+    t.setStyle(tpl.summary_table_style)
     story.append(Spacer(1, 5 * mm))
     story.append(t)
 
@@ -368,24 +530,12 @@ def generate_pdf(
         )
 
         story.append(Spacer(1, 8))
-        story.append(
-            Paragraph(
-                critical_text,
-                ParagraphStyle(
-                    name="critical_point_tip",
-                    parent=base_style,
-                    fontSize=9.6,
-                    leading=13.5,
-                    backColor=colors.HexColor(PALETTE["highlight_bg"]),
-                    borderPadding=8,
-                ),
-            )
-        )
+        story.append(Paragraph(critical_text, tpl.critical_tip_style))
 
     story.append(PageBreak())
 
     # -------------------- 第 2 页：理财建议 --------------------
-    story.append(Paragraph("理财建议", h2_style))
+    story.append(tpl.static("advice_heading"))
     story.append(PageHeader(doc.width))
 
     saved_for_compare = best_saved
@@ -393,13 +543,7 @@ def generate_pdf(
 
     invest_rate = prepayment.invest_annual_rate
     if invest_rate is None:
-        story.append(
-            Paragraph(
-                "您未提供理财年化收益率，通用建议：当贷款进入“本金还款期”后，提前还款的边际收益下降，"
-                "可考虑将资金用于更高收益理财或保留流动性。",
-                base_style,
-            )
-        )
+        story.append(tpl.static("no_invest_rate"))
     else:
         years = 20
         fv = _invest_future_value(prepay_amount, float(invest_rate), years)
@@ -439,24 +583,22 @@ def generate_pdf(
                 )
             )
 
+    if charts.REPORT_CHARTS and len(result.base_schedule):
+        chart = charts.amortization_chart(result.base_schedule, result.reduced_schedule, result.shorten_schedule)
+        story.append(Spacer(1, 10 * mm))
+        story.append(tpl.static("chart_heading"))
+        story.append(PageHeader(doc.width))
+        story.append(Spacer(1, 3 * mm))
+        story.append(ChartFlowable(chart))
+        story.append(Spacer(1, 2 * mm))
+        story.append(tpl.static("chart_legend"))
+
     story.append(Spacer(1, 12 * mm))
     story.append(PageHeader(doc.width))
     story.append(Spacer(1, 4 * mm))
-    story.append(
-        Paragraph(
-            "<b>免责声明：</b>本报告基于您提供的数据进行数学模拟，结果仅供参考。实际还款规则可能受银行计息方式、扣款日、提前还款手续费等多种因素影响。"
-            "如需执行具体操作，请务必以银行出具的官方还款计划表为准。",
-            ParagraphStyle(
-                "disclaimer",
-                parent=base_style,
-                fontSize=8.5,
-                leading=14,
-                textColor=colors.HexColor(PALETTE["secondary_text"]),
-            ),
-        )
-    )
+    story.append(tpl.static("disclaimer"))
 
-    doc.build(story, onFirstPage=_header_footer, onLaterPages=_header_footer)
+    doc.build(story, onFirstPage=tpl.header_footer, onLaterPages=tpl.header_footer)
 
     pdf_bytes = pdf_buf.getvalue()
     pdf_buf.close()
@@ -0,0 +1,197 @@
+"""计算接口的响应缓存（本地 SQLite 文件，所有 uvicorn worker 共享）。
+
+calc 类接口的结果只取决于请求体；唯一的例外是按 first_payment_date 推算已还期数时依赖“今天”。
+因此缓存键为：接口名 + 校验后请求体的规范化 JSON + 生效的计算日期（不依赖日期时为空），取 SHA-256。
+
+淘汰策略：
+    - TTL：写入超过 ttl_seconds 的条目视为过期，读取时忽略、写入时顺带清理；
+    - LRU：条目数超过 max_entries 时按最近访问时间淘汰最旧的条目。
+    两项清理每写入 _PRUNE_EVERY 次才做一次，条目数可能短暂超出上限。
+命中路径只读：最近访问时间距今超过 _TOUCH_INTERVAL_SECONDS 才回写（LRU 精度因此为该粒度），
+命中 / 未命中计数先累计在进程内，每隔 _COUNTER_FLUSH_SECONDS 合并写入同一个数据库一次，
+因此统计的是所有 worker 的合计（其它 worker 最近几秒的计数可能尚未写入）。
+
+SQLite 或文件系统出错（目录不可写、磁盘满、文件被锁太久等）时缓存自动退化为“未命中 / 不写入”，不影响接口本身。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, Optional
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# 每写入多少次做一次 TTL / 容量清理（清理是一条带索引的 DELETE，无需每次都做）
+_PRUNE_EVERY = 64
+
+# 命中时最近访问时间的回写粒度：比它新的条目不再更新，命中不必抢占写锁
+_TOUCH_INTERVAL_SECONDS = 60.0
+
+# 进程内命中 / 未命中计数写入数据库的间隔
+_COUNTER_FLUSH_SECONDS = 5.0
+
+_COUNTER_UPSERT = (
+    "INSERT INTO counters (name, value) VALUES (?, ?) "
+    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value"
+)
+
+
+def request_key(endpoint: str, body: Dict[str, Any], as_of: Optional[date] = None) -> str:
+    # 规范化请求：键排序、紧凑分隔符，数值已由 pydantic 转为统一类型（如 1e6 与 1000000 均为 1000000.0）。
+    canonical = json.dumps(
+        {"endpoint": endpoint, "body": body, "as_of": as_of.isoformat() if as_of else None},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """基于 SQLite 的 TTL + LRU 响应缓存，可被多个进程同时使用。"""
+
+    def __init__(self, path: str, *, ttl_seconds: float, max_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._pending = {"hits": 0, "misses": 0}
+        self._flushed_at = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and self.max_entries > 0 and self.ttl_seconds > 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # 每个线程一条连接（FastAPI 同步接口运行在线程池中）。
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=2.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._pending[name] += 1
+            due = time.monotonic() - self._flushed_at >= _COUNTER_FLUSH_SECONDS
+        if due:
+            self._flush_counters()
+
+    def _flush_counters(self) -> None:
+        # 把进程内累计的计数合并写入数据库；写入失败时计数留待下次。
+        with self._lock:
+            pending = {name: value for name, value in self._pending.items() if value}
+            self._pending = dict.fromkeys(self._pending, 0)
+            self._flushed_at = time.monotonic()
+        if not pending:
+            return
+        try:
+            self._connect().executemany(_COUNTER_UPSERT, pending.items())
+        except (sqlite3.Error, OSError):
+            with self._lock:
+                for name, value in pending.items():
+                    self._pending[name] += value
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT payload, accessed_at FROM responses WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row is not None and now - row[1] >= _TOUCH_INTERVAL_SECONDS:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        except (sqlite3.Error, OSError):
+            return None
+        if row is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return json.loads(row[0])
+
+    def put(self, key: str, endpoint: str, payload: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, payload, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint, json.dumps(payload, separators=(",", ":"), ensure_ascii=False), now, now),
+            )
+            self._writes += 1
+            if self._writes % _PRUNE_EVERY == 1:
+                self._prune(conn, now)
+        except (sqlite3.Error, OSError):
+            return
+
+    def _prune(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        cur = conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?"
+            ")",
+            (self.max_entries,),
+        )
+        if cur.rowcount and cur.rowcount > 0:
+            conn.execute(_COUNTER_UPSERT, ("evictions", cur.rowcount))
+
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "enabled": self.enabled,
+            "entries": 0,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "hit_rate": 0.0,
+        }
+        if not self.enabled:
+            return result
+        self._flush_counters()
+        try:
+            conn = self._connect()
+            result["entries"] = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            for name, value in conn.execute("SELECT name, value FROM counters"):
+                result[name] = value
+        except (sqlite3.Error, OSError):
+            pass
+        with self._lock:
+            # 写入失败、尚留在进程内的计数
+            for name, value in self._pending.items():
+                result[name] += value
+        total = result["hits"] + result["misses"]
+        result["hit_rate"] = result["hits"] / total if total else 0.0
+        return result
@@ -0,0 +1,199 @@
+"""列式还款计划容器。
+
+Schedule 用 4 列连续的 float64 数组（payment / principal / interest / balance）保存整张表，
+期数序号由起始期数推出，不单独存储。600 期的计划约占 19 KB，
+而 600 个 ScheduleRow 对象需要数百 KB。
+
+与 List[ScheduleRow] 的用法保持兼容：
+- len(schedule)、for row in schedule、schedule[i] 返回 ScheduleRow；
+- schedule[a:b] 返回共享底层数组的视图（不复制数据），期数序号保持不变。
+"""
+
+from __future__ import annotations
+
+import hashlib
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Union, overload
+
+import numpy as np
+
+
+@dataclass
+class ScheduleRow:
+    """单期（月）还款计划明细。
+
+    字段说明：
+        month_index: 期数序号（从 1 开始）。
+        payment: 本期实际还款额（单位：元）。
+        principal: 本期归还本金（单位：元）。
+        interest: 本期支付利息（单位：元）。
+        balance: 本期还款后剩余本金余额（单位：元）。
+    """
+
+    month_index: int
+    payment: float
+    principal: float
+    interest: float
+    balance: float
+
+
+def _column(values: Union[np.ndarray, array, Iterable[float]]) -> np.ndarray:
+    # 转为只读 float64 一维数组；array('d') 与 float64 ndarray 不复制数据。
+    if isinstance(values, array):
+        col = np.frombuffer(values, dtype=np.float64) if len(values) else np.empty(0, dtype=np.float64)
+    else:
+        col = np.asarray(values, dtype=np.float64)
+    if col.flags.writeable:
+        col = col.view()
+        col.flags.writeable = False
+    return col
+
+
+class Schedule:
+    """列式还款计划（只读）。
+
+    字段说明：
+        start: 第一行的期数序号（整表为 1；剩余期切片为 paid_periods+1）。
+        payment / principal / interest / balance: 各列 float64 只读数组。
+        month_index: 期数序号数组（按需生成）。
+    """
+
+    __slots__ = ("start", "payment", "principal", "interest", "balance")
+
+    def __init__(self, payment, principal, interest, balance, *, start: int = 1):
+        self.start = start
+        self.payment = _column(payment)
+        self.principal = _column(principal)
+        self.interest = _column(interest)
+        self.balance = _column(balance)
+        if not (len(self.payment) == len(self.principal) == len(self.interest) == len(self.balance)):
+            raise ValueError("schedule columns must have the same length")
+
+    @classmethod
+    def empty(cls, start: int = 1) -> "Schedule":
+        return cls((), (), (), (), start=start)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[ScheduleRow]) -> "Schedule":
+        rows = list(rows)
+        if not rows:
+            return cls.empty()
+        return cls(
+            [r.payment for r in rows],
+            [r.principal for r in rows],
+            [r.interest for r in rows],
+            [r.balance for r in rows],
+            start=rows[0].month_index,
+        )
+
+    @property
+    def month_index(self) -> np.ndarray:
+        return np.arange(self.start, self.start + len(self), dtype=np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        return self.payment.nbytes * 4
+
+    def __len__(self) -> int:
+        return int(self.payment.shape[0])
+
+    def __iter__(self) -> Iterator[ScheduleRow]:
+        # tolist() 一次性转为 Python float，比逐元素索引 ndarray 快得多
+        for i, values in enumerate(zip(self.payment.tolist(), self.principal.tolist(), self.interest.tolist(), self.balance.tolist())):
+            yield ScheduleRow(self.start + i, *values)
+
+    @overload
+    def __getitem__(self, key: int) -> ScheduleRow: ...
+
+    @overload
+    def __getitem__(self, key: slice) -> "Schedule": ...
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            begin, _, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("schedule slices do not support a step")
+            return Schedule(
+                self.payment[key],
+                self.principal[key],
+                self.interest[key],
+                self.balance[key],
+                start=self.start + begin,
+            )
+        n = len(self)
+        i = key + n if key < 0 else key
+        if not 0 <= i < n:
+            raise IndexError("schedule index out of range")
+        return ScheduleRow(
+            self.start + i,
+            float(self.payment[i]),
+            float(self.principal[i]),
+            float(self.interest[i]),
+            float(self.balance[i]),
+        )
+
+    def __reduce__(self):
+        # 紧凑序列化（进程池传参）：四列拼成一段连续的 float64 字节。
+        return (_schedule_from_bytes, (self.start, len(self), np.stack([self.payment, self.principal, self.interest, self.balance]).tobytes()))
+
+    def __repr__(self) -> str:
+        return f"Schedule(start={self.start}, rows={len(self)})"
+
+    def digest(self) -> str:
+        # 内容哈希（起始期数 + 四列数据），用作图表等派生结果的缓存键。
+        h = hashlib.blake2b(digest_size=16)
+        h.update(self.start.to_bytes(8, "little", signed=True))
+        for col in (self.payment, self.principal, self.interest, self.balance):
+            h.update(np.ascontiguousarray(col).data)
+        return h.hexdigest()
+
+    def total_interest(self) -> float:
+        return float(self.interest.sum())
+
+    def total_payment(self) -> float:
+        return float(self.payment.sum())
+
+    def renumbered(self, start: int) -> "Schedule":
+        # 共享数据、只改变起始期数序号的视图。
+        return Schedule(self.payment, self.principal, self.interest, self.balance, start=start)
+
+    def pad_to(self, length: int) -> "Schedule":
+        # 末尾补零行到指定长度（组合贷对齐两笔贷款期数时使用）。
+        extra = length - len(self)
+        if extra <= 0:
+            return self
+        zeros = np.zeros(extra, dtype=np.float64)
+        return Schedule(
+            np.concatenate([self.payment, zeros]),
+            np.concatenate([self.principal, zeros]),
+            np.concatenate([self.interest, zeros]),
+            np.concatenate([self.balance, zeros]),
+            start=self.start,
+        )
+
+
+def _schedule_from_bytes(start: int, rows: int, data: bytes) -> Schedule:
+    columns = np.frombuffer(data, dtype=np.float64).reshape(4, rows)
+    return Schedule(*columns, start=start)
+
+
+class ScheduleBuilder:
+    """逐行追加构造 Schedule：各列写入 array('d')，build() 时零拷贝转为只读数组。"""
+
+    __slots__ = ("_payment", "_principal", "_interest", "_balance")
+
+    def __init__(self):
+        self._payment = array("d")
+        self._principal = array("d")
+        self._interest = array("d")
+        self._balance = array("d")
+
+    def append(self, payment: float, principal: float, interest: float, balance: float) -> None:
+        self._payment.append(payment)
+        self._principal.append(principal)
+        self._interest.append(interest)
+        self._balance.append(balance)
+
+    def build(self, start: int = 1) -> Schedule:
+        return Schedule(self._payment, self._principal, self._interest, self._balance, start=start)
@@ -0,0 +1,127 @@
+"""相同请求的并发合并（single flight）。
+
+前端重试或用户连点时，几毫秒内会到达多份完全相同的导出请求，每一份都会从头渲染。
+按规范化请求键合并：第一个请求（leader）负责生成，生成期间到达的相同请求（follower）等待它的结果。
+结果由 leader 通过 Flight.finish 交出（导出场景下是写入导出缓存后的 StoredExport）；
+leader 失败或结果不可用时 finish(None)，follower 各自回退为自行生成。
+
+合并范围是单个进程（每个 uvicorn worker 各自一份）。leader 若始终没有调用 finish（例如响应从未开始发送），
+超过 stale_after 秒后该键的下一个请求会成为新的 leader，等待者最多等待各自的超时时间。
+
+统计按键记录 leader / 合并 / 回退次数，只保留最近活跃的 max_tracked_keys 个键。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional
+
+
+@dataclass
+class FlightStats:
+    """单个键（或全部键合计）的合并统计。
+
+    字段说明：
+        leaders: 实际执行生成的次数。
+        coalesced: 等待并直接拿到 leader 结果的次数。
+        fallbacks: 等待后未拿到结果（leader 失败或超时）、回退为自行生成的次数。
+    """
+
+    leaders: int = 0
+    coalesced: int = 0
+    fallbacks: int = 0
+
+    @property
+    def coalesce_rate(self) -> float:
+        total = self.leaders + self.coalesced + self.fallbacks
+        return self.coalesced / total if total else 0.0
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.started_at = time.monotonic()
+
+
+class Flight:
+    """一次 join 的结果：leader 负责生成并 finish，follower 调用 wait。"""
+
+    def __init__(self, group: "SingleFlight", key: Hashable, call: _Call, leader: bool):
+        self._group = group
+        self._key = key
+        self._call = call
+        self.leader = leader
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        # follower：等待 leader 的结果；超时或 leader 未给出结果时返回 None。
+        result = self._call.result if self._call.done.wait(timeout) else None
+        self._group._record(self._key, "coalesced" if result is not None else "fallbacks")
+        return result
+
+    def finish(self, result: Any) -> None:
+        # leader：交出结果并唤醒所有等待者；重复调用无效。
+        if not self.leader or self._call.done.is_set():
+            return
+        self._call.result = result
+        self._call.done.set()
+        self._group._forget(self._key, self._call)
+
+
+class SingleFlight:
+    """按键合并并发的相同请求。"""
+
+    def __init__(self, name: str, *, stale_after: float, max_tracked_keys: int = 1024):
+        self.name = name
+        self.stale_after = stale_after
+        self.max_tracked_keys = max_tracked_keys
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats: "OrderedDict[Hashable, FlightStats]" = OrderedDict()
+        self._total = FlightStats()
+        self._lock = threading.Lock()
+
+    def join(self, key: Hashable) -> Flight:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and time.monotonic() - call.started_at < self.stale_after:
+                return Flight(self, key, call, leader=False)
+            call = _Call()
+            self._calls[key] = call
+        self._record(key, "leaders")
+        return Flight(self, key, call, leader=True)
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+    def _record(self, key: Hashable, field: str) -> None:
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = FlightStats()
+                if len(self._stats) > self.max_tracked_keys:
+                    self._stats.popitem(last=False)
+            else:
+                self._stats.move_to_end(key)
+            setattr(stats, field, getattr(stats, field) + 1)
+            setattr(self._total, field, getattr(self._total, field) + 1)
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def total(self) -> FlightStats:
+        with self._lock:
+            return FlightStats(self._total.leaders, self._total.coalesced, self._total.fallbacks)
+
+    def top_keys(self, limit: int = 20) -> List[tuple]:
+        # 合并次数最多的键：[(key, FlightStats), ...]
+        with self._lock:
+            items = [(key, FlightStats(s.leaders, s.coalesced, s.fallbacks)) for key, s in self._stats.items()]
+        items.sort(key=lambda item: (item[1].coalesced, item[1].leaders), reverse=True)
+        return items[:limit]
@@ -0,0 +1,348 @@
+"""还款明细 Excel 的快速写出路径。
+
+openpyxl 常规模式会为每个单元格创建对象并逐个设置字体、填充、对齐、边框，
+600 期 × 14 列的组合贷明细就是上万个带样式的单元格对象。
+这里直接拼接工作表 XML：样式在 styles.xml 中预先登记为固定的样式表，单元格只引用样式序号；
+字符串用内联字符串（inlineStr），不需要共享字符串表。
+
+输出的版式与 api 中 openpyxl 版本一致（表头深色底白字、隔行浅色底、底部细边框、列宽、利息占比标红）。
+"""
+
+from __future__ import annotations
+
+import zipfile
+from io import BytesIO
+from typing import Dict, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from mortgage_agent.schedule import Schedule
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    "{sheets}"
+    "</Types>"
+)
+_SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{n}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+
+# ---------------------------------------------------------------------- 样式表
+
+# 字体：(粗体, 字号, 颜色)，字体名统一为 Arial；0 号为 Excel 默认字体
+_Font = Tuple[bool, int, Optional[str]]
+
+
+class StyleTable:
+    """固定样式表：登记（字体, 填充色, 底边框, 水平对齐）组合，返回 cellXfs 序号。"""
+
+    def __init__(self):
+        self._fonts: List[Optional[_Font]] = [None]
+        self._fills: List[Optional[str]] = [None, None]  # 0: none, 1: gray125（规范要求的保留项）
+        self._xfs: List[Tuple[int, int, int, Optional[str]]] = [(0, 0, 0, None)]
+        self._index: Dict[Tuple, int] = {}
+
+    def add(self, *, font: _Font, fill: Optional[str] = None, border: bool = False, align: Optional[str] = None) -> int:
+        key = (font, fill, border, align)
+        if key in self._index:
+            return self._index[key]
+        if font not in self._fonts:
+            self._fonts.append(font)
+        font_id = self._fonts.index(font)
+        fill_id = 0
+        if fill is not None:
+            if fill not in self._fills[2:]:
+                self._fills.append(fill)
+            fill_id = self._fills.index(fill, 2)
+        self._xfs.append((font_id, fill_id, 1 if border else 0, align))
+        self._index[key] = len(self._xfs) - 1
+        return self._index[key]
+
+    def to_xml(self) -> str:
+        fonts = ['<font><sz val="11"/><name val="Calibri"/><family val="2"/></font>']
+        for bold, size, color in self._fonts[1:]:
+            fonts.append(
+                "<font>"
+                + ("<b/>" if bold else "")
+                + f'<sz val="{size}"/>'
+                + (f'<color rgb="FF{color}"/>' if color else "")
+                + '<name val="Arial"/><family val="2"/></font>'
+            )
+        fills = ['<fill><patternFill patternType="none"/></fill>', '<fill><patternFill patternType="gray125"/></fill>']
+        for color in self._fills[2:]:
+            fills.append(f'<fill><patternFill patternType="solid"><fgColor rgb="FF{color}"/><bgColor rgb="FF{color}"/></patternFill></fill>')
+        borders = (
+            "<border><left/><right/><top/><bottom/><diagonal/></border>"
+            '<border><left/><right/><top/><bottom style="thin"><color rgb="FFE2E8F0"/></bottom><diagonal/></border>'
+        )
+        xfs = []
+        for font_id, fill_id, border_id, align in self._xfs:
+            attrs = f'numFmtId="0" fontId="{font_id}" fillId="{fill_id}" borderId="{border_id}" xfId="0"'
+            if font_id:
+                attrs += ' applyFont="1"'
+            if fill_id:
+                attrs += ' applyFill="1"'
+            if border_id:
+                attrs += ' applyBorder="1"'
+            if align:
+                xfs.append(f'<xf {attrs} applyAlignment="1"><alignment horizontal="{align}"/></xf>')
+            else:
+                xfs.append(f"<xf {attrs}/>")
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<styleSheet xmlns="{_NS_MAIN}">'
+            f'<fonts count="{len(fonts)}">{"".join(fonts)}</fonts>'
+            f'<fills count="{len(fills)}">{"".join(fills)}</fills>'
+            f'<borders count="2">{borders}</borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            f'<cellXfs count="{len(xfs)}">{"".join(xfs)}</cellXfs>'
+            '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+            "</styleSheet>"
+        )
+
+
+def _column_letter(index: int) -> str:
+    # 1 -> A, 27 -> AA
+    letters = ""
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+# ---------------------------------------------------------------------- 工作表
+
+class Sheet:
+    """一张工作表：按行追加单元格 XML 片段，写出时整体拼接。"""
+
+    def __init__(self, title: str, widths: Sequence[float]):
+        self.title = title
+        self.widths = list(widths)
+        self._rows: List[str] = []
+        self._refs = [_column_letter(i) for i in range(1, len(self.widths) + 1)]
+
+    def append(self, cells: Sequence[Tuple[object, int]]) -> None:
+        # cells：[(值, 样式序号)]；值为 int/float 写数字，str 写内联字符串。
+        r = len(self._rows) + 1
+        refs = self._refs
+        parts = [f'<row r="{r}">']
+        for i, (value, style) in enumerate(cells):
+            ref = f"{refs[i]}{r}"
+            if isinstance(value, str):
+                parts.append(f'<c r="{ref}" s="{style}" t="inlineStr"><is><t>{escape(value)}</t></is></c>')
+            else:
+                parts.append(f'<c r="{ref}" s="{style}"><v>{value!r}</v></c>')
+        parts.append("</row>")
+        self._rows.append("".join(parts))
+
+    def to_xml(self) -> str:
+        cols = "".join(
+            f'<col min="{i}" max="{i}" width="{w}" customWidth="1"/>' for i, w in enumerate(self.widths, start=1)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<worksheet xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}">'
+            f"<cols>{cols}</cols>"
+            f'<sheetData>{"".join(self._rows)}</sheetData>'
+            "</worksheet>"
+        )
+
+
+def write_workbook(sheets: Sequence[Sheet], styles: StyleTable) -> bytes:
+    # 组装 xlsx 包（本身就是一个 zip）。
+    names = "".join(
+        f'<sheet name="{escape(s.title)}" sheetId="{n}" r:id="rId{n}"/>' for n, s in enumerate(sheets, start=1)
+    )
+    workbook = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<workbook xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}"><sheets>{names}</sheets></workbook>'
+    )
+    rels = "".join(
+        f'<Relationship Id="rId{n}" Type="{_NS_REL}/worksheet" Target="worksheets/sheet{n}.xml"/>'
+        for n in range(1, len(sheets) + 1)
+    )
+    rels += f'<Relationship Id="rId{len(sheets) + 1}" Type="{_NS_REL}/styles" Target="styles.xml"/>'
+    workbook_rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{rels}</Relationships>'
+    )
+    content_types = _CONTENT_TYPES.format(
+        sheets="".join(_SHEET_CONTENT_TYPE.format(n=n) for n in range(1, len(sheets) + 1))
+    )
+
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", content_types)
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr("xl/workbook.xml", workbook)
+        zf.writestr("xl/_rels/workbook.xml.rels", workbook_rels)
+        zf.writestr("xl/styles.xml", styles.to_xml())
+        for n, sheet in enumerate(sheets, start=1):
+            zf.writestr(f"xl/worksheets/sheet{n}.xml", sheet.to_xml())
+    return buf.getvalue()
+
+
+# ---------------------------------------------------------------------- 还款明细版式
+
+_HEADER_FONT: _Font = (True, 11, "FFFFFF")
+_BODY_FONT: _Font = (False, 10, None)
+_RED_FONT: _Font = (False, 10, "EF4444")
+_HEADER_FILL = "0F172A"
+_ALT_FILL = "F8FAFC"
+
+
+def _ratio_text(interest: float, payment: float) -> Tuple[float, str]:
+    ratio = (interest / payment) if payment else 0.0
+    return ratio, f"{ratio*100:.2f}%"
+
+
+def schedule_sheet(schedule: Schedule, styles: StyleTable, title: str = "Schedule") -> Sheet:
+    """单笔贷款明细：期数、月供、本金、利息、余额、利息占比（占比 < 50% 标红）。"""
+    sheet = Sheet(title, [8, 14, 14, 14, 16, 12])
+    header = styles.add(font=_HEADER_FONT, fill=_HEADER_FILL, align="center")
+    sheet.append([(h, header) for h in ("期数", "月供", "本金", "利息", "余额", "利息占比")])
+
+    # 偶数行（Excel 行号）带浅色底
+    body = {}
+    for alt in (False, True):
+        fill = _ALT_FILL if alt else None
+        body[alt] = (
+            styles.add(font=_BODY_FONT, fill=fill, border=True, align="center"),
+            styles.add(font=_BODY_FONT, fill=fill, border=True, align="right"),
+            styles.add(font=_RED_FONT, fill=fill, border=True, align="right"),
+        )
+
+    rows = zip(
+        schedule.month_index.tolist(),
+        schedule.payment.tolist(),
+        schedule.principal.tolist(),
+        schedule.interest.tolist(),
+        schedule.balance.tolist(),
+    )
+    for idx, (month_index, payment, principal, interest, balance) in enumerate(rows, start=2):
+        center, right, red = body[idx % 2 == 0]
+        ratio, ratio_text = _ratio_text(interest, payment)
+        sheet.append([
+            (month_index, center),
+            (round(payment, 2), right),
+            (round(principal, 2), right),
+            (round(interest, 2), right),
+            (round(balance, 2), right),
+            (ratio_text, red if ratio < 0.5 else right),
+        ])
+    return sheet
+
+
+def schedule_xlsx(schedule: Schedule) -> bytes:
+    styles = StyleTable()
+    return write_workbook([schedule_sheet(schedule, styles)], styles)
+
+
+def multi_schedule_xlsx(schedules: Sequence[Tuple[str, Schedule]]) -> bytes:
+    # 多张明细放进同一个工作簿，每张一个工作表（共享同一份样式表）。
+    styles = StyleTable()
+    return write_workbook([schedule_sheet(schedule, styles, title) for title, schedule in schedules], styles)
+
+
+def combined_schedule_sheet(
+    combined: Schedule,
+    commercial_schedule: Schedule,
+    fund_schedule: Schedule,
+    styles: StyleTable,
+    *,
+    include_commercial: bool,
+    include_fund: bool,
+    title: str = "Combined",
+) -> Sheet:
+    """组合贷明细：按需输出商贷/公积金列（各自底色区分），以及总利息占比。"""
+    groups = [("月供总额", None)]
+    if include_commercial:
+        groups.append(("商贷", commercial_schedule.pad_to(len(combined))))
+    if include_fund:
+        groups.append(("公积金", fund_schedule.pad_to(len(combined))))
+
+    header_base = styles.add(font=_HEADER_FONT, fill=_HEADER_FILL, align="center")
+    header_group = {
+        "商贷": styles.add(font=_HEADER_FONT, fill="1D4ED8", align="center"),
+        "公积金": styles.add(font=_HEADER_FONT, fill="047857", align="center"),
+    }
+    body_group = {
+        "商贷": styles.add(font=_BODY_FONT, fill="EFF6FF", border=True, align="right"),
+        "公积金": styles.add(font=_BODY_FONT, fill="ECFDF3", border=True, align="right"),
+    }
+    body = {
+        alt: (
+            styles.add(font=_BODY_FONT, fill=_ALT_FILL if alt else None, border=True, align="center"),
+            styles.add(font=_BODY_FONT, fill=_ALT_FILL if alt else None, border=True, align="right"),
+        )
+        for alt in (False, True)
+    }
+
+    header_cells = [("期数", header_base), ("月供总额", header_base)]
+    for label, _ in groups[1:]:
+        style = header_group[label]
+        header_cells += [(f"{label}{suffix}", style) for suffix in ("月供总额", "本金", "利息", "余额", "利息占比")]
+    header_cells.append(("利息总占比", header_base))
+
+    sheet = Sheet(title, [14] * len(header_cells))
+    sheet.append(header_cells)
+
+    columns = [
+        (label, s.payment.tolist(), s.principal.tolist(), s.interest.tolist(), s.balance.tolist())
+        for label, s in groups[1:]
+    ]
+    total_payment = combined.payment.tolist()
+    total_interest = combined.interest.tolist()
+    for i, month_index in enumerate(combined.month_index.tolist()):
+        excel_row = i + 2
+        center, right = body[excel_row % 2 == 0]
+        cells = [(month_index, center), (round(total_payment[i], 2), right)]
+        for label, payment, principal, interest, balance in columns:
+            style = body_group[label]
+            _, ratio_text = _ratio_text(interest[i], payment[i])
+            cells += [
+                (round(payment[i], 2), style),
+                (round(principal[i], 2), style),
+                (round(interest[i], 2), style),
+                (round(balance[i], 2), style),
+                (ratio_text, style),
+            ]
+        _, total_ratio_text = _ratio_text(total_interest[i], total_payment[i])
+        cells.append((total_ratio_text, right))
+        sheet.append(cells)
+    return sheet
+
+
+def combined_schedule_xlsx(
+    combined: Schedule,
+    commercial_schedule: Schedule,
+    fund_schedule: Schedule,
+    *,
+    include_commercial: bool,
+    include_fund: bool,
+) -> bytes:
+    styles = StyleTable()
+    sheet = combined_schedule_sheet(
+        combined,
+        commercial_schedule,
+        fund_schedule,
+        styles,
+        include_commercial=include_commercial,
+        include_fund=include_fund,
+    )
+    return write_workbook([sheet], styles)
@@ -0,0 +1,116 @@
+"""边生成边输出的 ZIP 流。
+
+每写完一个成员就把对应的 ZIP 数据立即交给响应。写入目标只缓冲“尚未发出”的数据并允许在其中 seek，
+zipfile 因此按普通（可 seek）模式写出：成员写完后回填本地文件头里的 CRC 与长度，
+不需要数据描述符，STORED 成员也能被流式解压工具正确读取。
+成员按需生成（传入的是返回 bytes 的函数），同一时刻内存中最多只有一个成员的原始数据和压缩数据，
+而不是整个压缩包的多份拷贝。
+
+压缩方式按成员选择：xlsx / pdf / 图片本身已经压缩过，再 DEFLATE 只会白白消耗 CPU，因此直接 STORED；
+文本类（csv、json、xml 等）才用 DEFLATED。
+"""
+
+from __future__ import annotations
+
+import os
+import zipfile
+from io import BytesIO
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+
+# 自身已压缩的格式：放进 ZIP 时不再压缩
+PRECOMPRESSED_EXTENSIONS = frozenset({".xlsx", ".docx", ".pdf", ".zip", ".png", ".jpg", ".jpeg", ".gz"})
+
+
+class ExportTooLarge(ValueError):
+    """已输出的字节数超过导出上限。"""
+
+
+def member_compression(name: str) -> int:
+    # 按扩展名选择压缩方式。
+    if os.path.splitext(name)[1].lower() in PRECOMPRESSED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+class _ChunkSink:
+    # zipfile 的写入目标：缓冲尚未发出的数据；tell / seek 使用整个流的绝对位置，只能 seek 到未发出的部分。
+    def __init__(self):
+        self._buffer = BytesIO()
+        self._base = 0  # 已发出的字节数
+
+    def write(self, data) -> int:
+        return self._buffer.write(data)
+
+    def tell(self) -> int:
+        return self._base + self._buffer.tell()
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if whence == 0:
+            if offset < self._base:
+                raise OSError("cannot seek into data that has already been sent")
+            self._buffer.seek(offset - self._base)
+        else:
+            self._buffer.seek(offset, whence)
+        return self.tell()
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = self._buffer.getvalue()
+        self._base += len(data)
+        self._buffer = BytesIO()
+        return data
+
+
+def stream_zip(
+    members: Iterable[Tuple[str, Callable[[], bytes]]],
+    *,
+    max_bytes: int,
+    compression: Callable[[str], int] = member_compression,
+    tee=None,
+    on_commit: Optional[Callable[[Any], None]] = None,
+) -> Iterator[bytes]:
+    """依次生成各成员并逐块产出 ZIP 数据。
+
+    参数：
+        members: (文件名, 生成内容的函数) 序列，按顺序写入。
+        max_bytes: 累计输出上限，超过时抛出 ExportTooLarge（已发出的数据无法撤回，客户端会收到不完整的文件）。
+        compression: 文件名 -> 压缩方式，默认按扩展名选择（见 member_compression）。
+        tee: 可选的 PendingExport，输出的每一块同时写入；完整结束时 commit，否则 discard。
+            commit 在发出最后一块之前完成，不必等客户端收完。
+        on_commit: 可选回调，完整结束时以 tee.commit() 的结果（无 tee 时为 None）调用，同样在发出最后一块之前。
+    """
+    sink = _ChunkSink()
+    total = 0
+    completed = False
+
+    def take() -> bytes:
+        nonlocal total
+        chunk = sink.drain()
+        total += len(chunk)
+        if total > max_bytes:
+            raise ExportTooLarge("export file too large")
+        if chunk and tee is not None:
+            tee.write(chunk)
+        return chunk
+
+    try:
+        with zipfile.ZipFile(sink, mode="w") as zf:
+            for name, produce in members:
+                zf.writestr(name, produce(), compress_type=compression(name))
+                chunk = take()
+                if chunk:
+                    yield chunk
+        # 关闭时写出中央目录；先提交完整文件，再发出最后一块
+        last = take()
+        completed = True
+        stored = tee.commit() if tee is not None else None
+        if on_commit is not None:
+            on_commit(stored)
+        if last:
+            yield last
+    finally:
+        if tee is not None and not completed:
+            tee.discard()
@@ -0,0 +1,92 @@
+"""PDF 报告走势图基准：走势图给单份报告与整次导出增加的耗时。
+
+使用方式（仓库根目录）：
+    python scripts/bench_charts.py [--repeat 30]
+
+对 bench_pdf.py 中的三种典型报告，输出各项的最好成绩（毫秒）：
+    pdf off        不含走势图（REPORT_CHARTS=0）的 PDF
+    pdf hit        含走势图，走势图缓存命中（相同计划再次导出）
+    pdf miss       含走势图，每次都重新生成（不同计划的首次导出）
+    export off/miss  整次导出（3 个 Excel + PDF）不含 / 含走势图（缓存未命中）
+    chart          单独生成一张走势图的绘制指令（缓存未命中时的额外开销之一）
+    chart full     同上，不降采样、画出每一期
+各项轮流执行 repeat 轮（而不是逐项连续执行），主机负载波动对各项的影响相同；
+取最好成绩而不是中位数，差值即走势图本身的开销。
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_pdf import CASES  # noqa: E402
+from mortgage_agent import charts  # noqa: E402
+from mortgage_agent.calculator import simulate  # noqa: E402
+from mortgage_agent.exports import report_pdf, schedule_to_xlsx  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    columns = ("pdf off", "pdf hit", "pdf miss", "export off", "export miss", "chart", "chart full")
+    print(f"{'case':<16}" + "".join(f"{c:>14}" for c in columns))
+    for name, params, prepay in CASES:
+        result = simulate(params, prepay)
+        schedules = (result.base_schedule, result.reduced_schedule, result.shorten_schedule)
+
+        def pdf() -> bytes:
+            return report_pdf(
+                result=result,
+                prepayment=prepay,
+                original_principal=params.principal,
+                original_annual_rate=params.annual_rate,
+                original_term_months=params.term_months,
+                original_method=params.method,
+            )
+
+        def export() -> None:
+            for schedule in schedules:
+                schedule_to_xlsx(schedule)
+            pdf()
+
+        def full_chart() -> None:
+            max_points = charts.CHART_MAX_POINTS
+            charts.CHART_MAX_POINTS = 0
+            try:
+                charts.render_chart(schedules)
+            finally:
+                charts.CHART_MAX_POINTS = max_points
+
+        # (列名, 是否含走势图, 执行前是否清空走势图缓存, 计时的函数)
+        variants = (
+            ("pdf off", False, False, pdf),
+            ("pdf hit", True, False, pdf),
+            ("pdf miss", True, True, pdf),
+            ("export off", False, False, export),
+            ("export miss", True, True, export),
+            ("chart", True, False, lambda: charts.render_chart(schedules)),
+            ("chart full", True, False, full_chart),
+        )
+        best = {column: float("inf") for column in columns}
+        for round_no in range(args.repeat + 1):
+            for column, enabled, clear, fn in variants:
+                charts.REPORT_CHARTS = enabled
+                if clear:
+                    charts.CHART_CACHE.clear()
+                start = time.perf_counter()
+                fn()
+                elapsed = (time.perf_counter() - start) * 1000
+                if round_no:  # 第 0 轮预热
+                    best[column] = min(best[column], elapsed)
+        print(f"{name:<16}" + "".join(f"{best[c]:>14.2f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""导出渲染进程池基准：导出并发时计算接口的延迟（EXPORT_PROCESS_WORKERS=0 vs >0）。
+
+使用方式（仓库根目录）：
+    EXPORT_PROCESS_WORKERS=0 python scripts/bench_export_pool.py
+    EXPORT_PROCESS_WORKERS=4 python scripts/bench_export_pool.py [--exporters 3 --requests 200]
+
+关闭响应缓存与导出缓存，后台若干线程持续请求 prepayment:export-zip（每次金额不同，强制重新渲染），
+同时串行请求 prepayment:calc，输出其 p50 / p99 延迟与期间完成的导出数。
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import mortgage_agent.api as api  # noqa: E402
+
+
+BODY = {
+    "principal": 1_000_000,
+    "annual_rate": 3.5,
+    "term_months": 600,
+    "method": "equal_payment",
+    "paid_periods": 24,
+    "prepay_amount": 100_000,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--exporters", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    api.export_store.max_bytes = 0
+    api.response_cache.max_entries = 0
+    api.limiter.enabled = False
+    client = TestClient(api.app)
+    client.post("/v1/mortgages/prepayment:export-zip", json=BODY)  # 预热（含子进程启动）
+
+    stop = threading.Event()
+    exported = [0]
+
+    def exporter(offset: int) -> None:
+        i = offset
+        while not stop.is_set():
+            i += args.exporters
+            client.post("/v1/mortgages/prepayment:export-zip", json=dict(BODY, prepay_amount=100_000 + i))
+            exported[0] += 1
+
+    threads = [threading.Thread(target=exporter, args=(n,)) for n in range(args.exporters)]
+    for t in threads:
+        t.start()
+    time.sleep(1)
+
+    latencies = []
+    for i in range(args.requests):
+        start = time.perf_counter()
+        client.post("/v1/mortgages/prepayment:calc", json=dict(BODY, prepay_amount=1_000 + i))
+        latencies.append((time.perf_counter() - start) * 1000)
+    stop.set()
+    for t in threads:
+        t.join()
+    api.render_pool.shutdown()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"workers={api.render_pool.workers} calc p50={p50:.1f}ms p99={p99:.1f}ms exports={exported[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""PDF 报告生成基准：单份报告耗时。
+
+使用方式（仓库根目录）：
+    python scripts/bench_pdf.py [--repeat 50] [--mode flowables|fragments]
+
+覆盖三种典型报告（未填理财收益率、填写理财收益率、带临界点提示的长期限贷款），
+每种先生成一次预热（字体注册、模板构建），再统计 repeat 次的中位数与 p95（毫秒）。
+--mode 指定静态内容的绘制方式（见 REPORT_STATIC_MODE），默认取环境变量。
+最后单独给出构建一次 ReportTemplate（样式、表格样式、静态段落）的耗时，即每份报告因复用模板省下的部分。
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mortgage_agent.calculator import LoanParams, Prepayment, simulate  # noqa: E402
+from mortgage_agent import report  # noqa: E402
+from mortgage_agent.report import ReportTemplate, generate_pdf  # noqa: E402
+
+
+CASES = [
+    ("no-invest-rate", LoanParams(principal=1_000_000, annual_rate=3.5, term_months=360, method="equal_payment", paid_periods=24), Prepayment(amount=100_000)),
+    ("invest-rate", LoanParams(principal=1_000_000, annual_rate=3.5, term_months=360, method="equal_payment", paid_periods=24), Prepayment(amount=100_000, invest_annual_rate=2.5)),
+    ("long-term", LoanParams(principal=3_000_000, annual_rate=4.9, term_months=600, method="equal_principal", paid_periods=60), Prepayment(amount=500_000, invest_annual_rate=3.0)),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--mode", choices=("flowables", "fragments"), default=report.REPORT_STATIC_MODE)
+    args = parser.parse_args()
+    report._TEMPLATE = ReportTemplate(args.mode)
+
+    print(f"{'case':<18}{'p50(ms)':>10}{'p95(ms)':>10}{'bytes':>10}")
+    for name, params, prepay in CASES:
+        result = simulate(params, prepay)
+
+        def render() -> bytes:
+            return generate_pdf(
+                result=result,
+                prepayment=prepay,
+                original_principal=params.principal,
+                original_annual_rate=params.annual_rate,
+                original_term_months=params.term_months,
+                original_method=params.method,
+            )
+
+        size = len(render())  # 预热
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            render()
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        print(f"{name:<18}{statistics.median(samples):>10.2f}{p95:>10.2f}{size:>10}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        ReportTemplate(args.mode)
+    print(f"{'template build':<18}{(time.perf_counter() - start) / args.repeat * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""启动开销基准：导入 mortgage_agent.api 的耗时与常驻内存（RSS）。
+
+使用方式（仓库根目录）：
+    python scripts/bench_startup.py [--repeat 10]
+
+每次在全新的子进程中测量，输出中位数：
+    api            只导入 mortgage_agent.api（只处理计算接口的 worker 的实际开销）
+    api+export     导入后再生成一次 Excel 与 PDF（即首次导出时才加载的导出依赖：reportlab、字体等）
+    api+openpyxl   同上，另加载 openpyxl（XLSX_WRITER=openpyxl 时）
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = r"""
+import json, os, time
+t0 = time.perf_counter()
+import mortgage_agent.api
+import_ms = (time.perf_counter() - t0) * 1000
+mode = os.environ["BENCH_MODE"]
+if mode != "api":
+    from mortgage_agent.calculator import LoanParams, Prepayment, simulate
+    from mortgage_agent import exports
+    params = LoanParams(principal=1_000_000, annual_rate=3.5, term_months=360, method="equal_payment", paid_periods=24)
+    prepay = Prepayment(amount=100_000)
+    result = simulate(params, prepay)
+    if mode == "api+openpyxl":
+        exports.schedule_to_xlsx_openpyxl(result.base_schedule)
+    exports.schedule_to_xlsx(result.base_schedule)
+    exports.report_pdf(
+        result=result,
+        prepayment=prepay,
+        original_principal=params.principal,
+        original_annual_rate=params.annual_rate,
+        original_term_months=params.term_months,
+        original_method=params.method,
+    )
+with open("/proc/self/status") as f:
+    rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+print(json.dumps({"import_ms": import_ms, "rss_mb": rss_kb / 1024}))
+"""
+
+
+def _measure(mode: str) -> dict:
+    env = dict(os.environ, BENCH_MODE=mode, PYTHONPATH=ROOT, OUTPUT_DIR=os.path.join(ROOT, "output"))
+    out = subprocess.run([sys.executable, "-c", _PROBE], env=env, cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'mode':<16}{'import(ms)':>12}{'RSS(MiB)':>12}")
+    for mode in ("api", "api+export", "api+openpyxl"):
+        samples = [_measure(mode) for _ in range(args.repeat)]
+        import_ms = statistics.median(s["import_ms"] for s in samples)
+        rss_mb = statistics.median(s["rss_mb"] for s in samples)
+        print(f"{mode:<16}{import_ms:>12.1f}{rss_mb:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
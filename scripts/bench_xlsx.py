@@ -0,0 +1,66 @@
+"""Excel 导出基准：openpyxl 常规模式 vs xlsx 模块快速写出。
+
+使用方式（仓库根目录）：
+    python scripts/bench_xlsx.py [--repeat 20]
+
+分别测 360 期、600 期的单笔明细与组合贷明细（商贷 + 公积金，13 列），输出每次耗时与加速比。
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mortgage_agent.calculator import Schedule, build_schedule, monthly_rate  # noqa: E402
+from mortgage_agent.exports import combined_schedule_to_xlsx_openpyxl, schedule_to_xlsx_openpyxl  # noqa: E402
+from mortgage_agent.xlsx import combined_schedule_xlsx, schedule_xlsx  # noqa: E402
+
+
+def _timeit(fn, repeat: int) -> float:
+    fn()  # 预热
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'case':<24}{'openpyxl(ms)':>14}{'fast(ms)':>12}{'speedup':>10}{'bytes(op/fast)':>20}")
+    for months in (360, 600):
+        commercial = build_schedule(1_000_000, monthly_rate(3.9), months, "equal_payment")
+        fund = build_schedule(600_000, monthly_rate(3.1), months, "equal_payment")
+        combined = Schedule(
+            commercial.payment + fund.payment,
+            commercial.principal + fund.principal,
+            commercial.interest + fund.interest,
+            commercial.balance + fund.balance,
+        )
+        cases = [
+            (
+                f"schedule-{months}",
+                lambda: schedule_to_xlsx_openpyxl(commercial),
+                lambda: schedule_xlsx(commercial),
+            ),
+            (
+                f"combined-{months}",
+                lambda: combined_schedule_to_xlsx_openpyxl(combined, commercial, fund, True, True),
+                lambda: combined_schedule_xlsx(combined, commercial, fund, include_commercial=True, include_fund=True),
+            ),
+        ]
+        for name, slow, fast in cases:
+            slow_ms = _timeit(slow, args.repeat)
+            fast_ms = _timeit(fast, args.repeat)
+            sizes = f"{len(slow())}/{len(fast())}"
+            print(f"{name:<24}{slow_ms:>14.1f}{fast_ms:>12.1f}{slow_ms / fast_ms:>9.1f}x{sizes:>20}")
+
+
+if __name__ == "__main__":
+    main()
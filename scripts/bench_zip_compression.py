@@ -0,0 +1,88 @@
+"""导出 ZIP 压缩方式基准：全部 DEFLATED vs 按成员选择（xlsx/pdf 用 STORED），以及三份 Excel vs 单个多工作表 Excel。
+
+使用方式（仓库根目录）：
+    python scripts/bench_zip_compression.py [--repeat 20]
+
+“打包 CPU”只统计把已生成好的成员写进 ZIP 的 CPU 时间（time.process_time）；
+“合计 CPU”包含生成 Excel（快速写出）的时间。PDF 事先生成一次，各方案共用。
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mortgage_agent.calculator import LoanParams, Prepayment, simulate  # noqa: E402
+from mortgage_agent.report import generate_pdf  # noqa: E402
+from mortgage_agent.xlsx import multi_schedule_xlsx, schedule_xlsx  # noqa: E402
+from mortgage_agent.zipstream import member_compression, stream_zip  # noqa: E402
+
+
+def _cpu_ms(fn, repeat: int):
+    result = fn()
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) / repeat * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'case':<34}{'pack CPU(ms)':>14}{'total CPU(ms)':>15}{'bytes':>10}")
+    for months in (360, 600):
+        params = LoanParams(principal=1_500_000, annual_rate=3.9, term_months=months, method="equal_payment", paid_periods=24)
+        prepay = Prepayment(amount=200_000)
+        result = simulate(params, prepay)
+        pdf = generate_pdf(
+            result=result,
+            prepayment=prepay,
+            original_principal=params.principal,
+            original_annual_rate=params.annual_rate,
+            original_term_months=params.term_months,
+            original_method=params.method,
+        )
+        schedules = [
+            ("原方案", result.base_schedule),
+            ("减少月供", result.reduced_schedule),
+            ("缩短年限", result.shorten_schedule),
+        ]
+
+        def render_three():
+            return [(f"{title}.xlsx", schedule_xlsx(s)) for title, s in schedules] + [("报告.pdf", pdf)]
+
+        def render_single():
+            return [("月供明细.xlsx", multi_schedule_xlsx(schedules)), ("报告.pdf", pdf)]
+
+        def deflate_all(_name):
+            return zipfile.ZIP_DEFLATED
+
+        cases = [
+            ("three xlsx, all DEFLATED", render_three, deflate_all),
+            ("three xlsx, per-member", render_three, member_compression),
+            ("single workbook, per-member", render_single, member_compression),
+        ]
+        for name, render, compression in cases:
+            members = render()
+            pack_ms, archive = _cpu_ms(lambda: _pack(members, compression), args.repeat)
+            total_ms, _ = _cpu_ms(lambda: _pack(render(), compression), args.repeat)
+            print(f"{f'{months}m ' + name:<34}{pack_ms:>14.2f}{total_ms:>15.2f}{len(archive):>10}")
+
+
+def _pack(members, compression) -> bytes:
+    return b"".join(stream_zip(
+        [(name, (lambda data=data: data)) for name, data in members],
+        max_bytes=1 << 40,
+        compression=compression,
+    ))
+
+
+if __name__ == "__main__":
+    main()